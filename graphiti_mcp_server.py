@@ -5,16 +5,18 @@ Graphiti MCP Server - Exposes Graphiti functionality through the Model Context P
 
 import argparse
 import asyncio
+import functools
 import importlib
 import importlib.util
 import json
 import logging
 import os
 import sys
+import time
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TypedDict, Union, cast
+from typing import Any, Callable, Dict, List, Optional, TypedDict, Union, cast
 
 import traceback  # Added for detailed error logging
 from dotenv import load_dotenv
@@ -44,6 +46,42 @@ except ImportError:
 
 from graphiti_core.prompts import prompt_library
 from graphiti_core.prompts.models import Message
+from mcp_server.context_bundle import CONTEXT_SECTIONS, dedupe_results, pack_context
+from mcp_server.embedding_batcher import EmbeddingBatcher
+from mcp_server.embedding_cache import CachingEmbedder
+from mcp_server.embedding_profile import DimensionedOpenAIEmbedder, EmbeddingProfile, reembed_groups
+from mcp_server.http_pool import HttpPoolConfig, SharedHttpPool
+from mcp_server.llm_metrics import InstrumentedLLMClient, LLMStats, parse_pricing
+from mcp_server.llm_routing import ModelRouter, get_prompt_type, parse_model_overrides
+from mcp_server.metrics import join_exposition
+from mcp_server.fact_lookup import facts_between
+from mcp_server.neighborhood import expand_neighborhood
+from mcp_server.node_lookup import LOOKUP_INDEX_STATEMENTS, fetch_nodes_by_uuids, match_nodes_by_name
+from mcp_server.pagination import EPISODE_INDEX_STATEMENTS, InvalidCursorError, RankedResultStore, get_episode_page
+from mcp_server.projection import EPISODE_FIELDS, FULL_PROJECTION, Projection, build_projection
+from mcp_server.search_cache import RedisSearchCacheBackend, SearchCacheKeys, SearchResultCache, SemanticQueryIndex
+from mcp_server.search_decay import DecayPolicy, rescore
+from mcp_server.search_filters import (
+    TEMPORAL_INDEX_STATEMENTS,
+    build_edge_filters,
+    build_node_filters,
+    ensure_attribute_indexes,
+    ensure_indexes,
+    install_filter_pushdown,
+    parse_time,
+)
+from mcp_server.search_recipes import RerankPolicy, RerankStats, get_search_config, parse_rerankers, ranking_depth
+from mcp_server.search_stream import ProgressiveResults, StreamStats, install_candidate_streaming, stream_candidates
+from mcp_server.search_timing import (
+    SearchLatencyStats,
+    TimedCrossEncoder,
+    collect_timings,
+    install_search_timing,
+    stage,
+)
+from mcp_server.stub_clients import LatencyModel, StubCrossEncoder, StubEmbedder, StubLLMClient
+from mcp_server.token_budget import DEFAULT_CONTEXT_WINDOW, PromptBudget, TokenCounter, parse_context_windows
+from mcp_server.vector_index import VectorIndexMirror, install_vector_index
 
 # Add typing imports for custom client
 import typing
@@ -72,27 +110,35 @@ class OpenRouterClient(BaseClientClass):
         config: LLMConfig | None = None, 
         cache: bool = False, 
         client: typing.Any = None,
-        provider: dict[str, typing.Any] | None = None
+        provider: dict[str, typing.Any] | None = None,
+        model_overrides: dict[str, str] | None = None,
     ):
         """Initialize OpenRouterClient with provider routing support.
         
         Args:
-            config: LLM configuration
+            config: LLM configuration (config.small_model is used for calls tagged small)
             cache: Whether to use caching
             client: Optional pre-configured client
             provider: Provider routing configuration (e.g., {"only": ["cerebras"]})
+            model_overrides: Optional per-prompt-type model overrides (e.g., {"dedupe_nodes": "small"})
         """
         super().__init__(config, cache, client)
         self.provider = provider
+        self.model_router = ModelRouter(
+            model=self.model or 'gpt-4o-mini',
+            small_model=self.small_model,
+            overrides=model_overrides,
+        )
+        logger.info(f"OpenRouterClient: Model routing configured: {self.model_router.describe()}")
         
     async def _generate_response(
         self,
         messages: list[Message],
         response_model: type[BaseModel] | None = None,
         max_tokens: int = 2048,
-        model_size: typing.Any = None,  # Accept but ignore model_size parameter
+        model_size: typing.Any = None,
     ) -> dict[str, typing.Any]:
-        """Generate response with provider routing support for OpenRouter."""
+        """Generate response with provider routing and small/large model tiering."""
         openai_messages: list[ChatCompletionMessageParam] = []
         
         # Check if we're using Cerebras and need JSON output
@@ -119,8 +165,10 @@ class OpenRouterClient(BaseClientClass):
         
         try:
             # Build request parameters
+            model = self.model_router.select(model_size, response_model)
+            logger.debug(f"OpenRouterClient: Routing prompt '{get_prompt_type(response_model)}' (size: {model_size}) to model '{model}'")
             request_params = {
-                'model': self.model or 'gpt-4o-mini',
+                'model': model,
                 'messages': openai_messages,
                 'temperature': self.temperature,
                 'max_tokens': max_tokens or self.max_tokens,
@@ -141,7 +189,7 @@ class OpenRouterClient(BaseClientClass):
                 
             # Log the full request parameters (excluding messages for brevity)
             debug_params = {k: v for k, v in request_params.items() if k != 'messages'}
-            logger.info(f"OpenRouterClient: Final request parameters: {debug_params}")
+            logger.debug(f"OpenRouterClient: Final request parameters: {debug_params}")
                 
             # Use standard chat completions endpoint for OpenRouter compatibility
             response = await self.client.chat.completions.create(**request_params)
@@ -178,12 +226,11 @@ class OpenRouterClient(BaseClientClass):
 
 
 # Additional imports for Graphiti
-from graphiti_core.embedder.openai import OpenAIEmbedder, OpenAIEmbedderConfig
-from graphiti_core.nodes import EpisodeType, EpisodicNode
-from graphiti_core.search.search_config_recipes import (
-    NODE_HYBRID_SEARCH_NODE_DISTANCE,
-    NODE_HYBRID_SEARCH_RRF,
-)
+from graphiti_core.cross_encoder.openai_reranker_client import OpenAIRerankerClient
+from graphiti_core.embedder.client import EMBEDDING_DIM, EmbedderClient
+from graphiti_core.embedder.openai import DEFAULT_EMBEDDING_MODEL, OpenAIEmbedder, OpenAIEmbedderConfig
+from graphiti_core.nodes import EntityNode, EpisodeType, EpisodicNode
+from graphiti_core.search.search import search as graphiti_search
 from graphiti_core.search.search_filters import SearchFilters
 from graphiti_core.utils.maintenance.graph_data_operations import clear_data
 from entities import get_entities, get_entity_subset, register_entity
@@ -211,7 +258,7 @@ class SuccessResponse(TypedDict):
     message: str
 
 
-class NodeResult(TypedDict):
+class NodeResult(TypedDict, total=False):
     uuid: str
     name: str
     summary: str
@@ -224,16 +271,79 @@ class NodeResult(TypedDict):
 class NodeSearchResponse(TypedDict):
     message: str
     nodes: list[NodeResult]
+    next_cursor: Optional[str]
+    reranker: Optional[str]
+    rerank_ms: Optional[float]
 
 
 class FactSearchResponse(TypedDict):
     message: str
     facts: list[dict[str, Any]]
+    next_cursor: Optional[str]
+    reranker: Optional[str]
+    rerank_ms: Optional[float]
 
 
 class EpisodeSearchResponse(TypedDict):
     message: str
     episodes: list[dict[str, Any]]
+    next_cursor: Optional[str]
+
+
+class NodeLookupResponse(TypedDict):
+    message: str
+    nodes: list[NodeResult]
+    missing_uuids: list[str]
+
+
+class NameLookupResponse(TypedDict):
+    message: str
+    matches: dict[str, list[NodeResult]]
+    unmatched: list[str]
+
+
+class FactsBetweenResponse(TypedDict, total=False):
+    message: str
+    source_nodes: list[NodeResult]
+    target_nodes: list[NodeResult]
+    facts: list[dict[str, Any]]
+    historical: list[dict[str, Any]]
+
+
+class NeighborhoodResponse(TypedDict):
+    message: str
+    nodes: list[dict[str, Any]]
+    facts: list[dict[str, Any]]
+    missing_uuids: list[str]
+
+
+class ContextResponse(TypedDict, total=False):
+    message: str
+    entities: list[NodeResult]
+    facts: list[dict[str, Any]]
+    episodes: list[dict[str, Any]]
+    tokens: int
+    max_tokens: int
+    dropped: dict[str, int]
+    errors: dict[str, str]
+    embedding_ms: float
+    elapsed_ms: float
+
+
+class BatchSearchResult(TypedDict, total=False):
+    index: int
+    type: str
+    query: str
+    elapsed_ms: float
+    result: Union[NodeSearchResponse, FactSearchResponse]
+    error: str
+
+
+class BatchSearchResponse(TypedDict):
+    message: str
+    results: list[BatchSearchResult]
+    embedding_ms: float
+    elapsed_ms: float
 
 
 class StatusResponse(TypedDict):
@@ -256,10 +366,73 @@ class GraphitiConfig(BaseModel):
     openai_api_key: Optional[str] = None
     openai_base_url: Optional[str] = None
     model_name: Optional[str] = None
+    # Cheaper/faster model for prompts graphiti-core tags as small (dedupe, attributes, ...)
+    small_model_name: Optional[str] = None
+    # Per-prompt-type model overrides, e.g. {'summarize_nodes': 'small'}
+    llm_model_overrides: dict[str, str] = Field(default_factory=dict)
+    # Extra/override LLM prices (USD per 1M tokens) used for cost estimates
+    llm_pricing: dict[str, tuple[float, float]] = Field(default_factory=dict)
+    # Token budget preflight: context windows by model (extends the built-in table)
+    llm_token_budget_enabled: bool = True
+    llm_context_windows: dict[str, int] = Field(default_factory=dict)
+    llm_default_context_window: int = DEFAULT_CONTEXT_WINDOW
     # Separate embedder configuration
     embedder_api_key: Optional[str] = None
     embedder_base_url: Optional[str] = None
     embedder_model: Optional[str] = None
+    # Vector dimension requested from the embedder and precision of the embedding cache disk store
+    embedding_profile: EmbeddingProfile = Field(default_factory=EmbeddingProfile)
+    # Content-addressed embedding cache (in-process LRU + optional memory-mapped disk store)
+    embedding_cache_enabled: bool = True
+    embedding_cache_size: int = 50_000
+    embedding_cache_dir: Optional[str] = None
+    # Cross-request micro-batching of embedding calls
+    embedding_batch_enabled: bool = True
+    embedding_batch_size: int = 64
+    embedding_batch_wait_ms: float = 5.0
+    # Search result cache (in-process LRU + optional shared Redis level), invalidated per group
+    search_cache_enabled: bool = True
+    search_cache_size: int = 1000
+    search_cache_ttl: float = 300.0
+    search_cache_redis_url: Optional[str] = None
+    # Serve paraphrased queries from the cached result of a near-duplicate recent query
+    search_semantic_reuse: bool = False
+    search_semantic_threshold: float = 0.95
+    search_semantic_recent: int = 256
+    # Cursor pagination: pages ranked per search (served page by page), at most search_page_depth
+    # results, and snapshot lifetime
+    search_pages_ranked: int = 3
+    search_page_depth: int = 50
+    search_page_ttl: float = 600.0
+    # Character budget of node summaries and episode content in compact responses
+    compact_text_chars: int = 300
+    # Create range indexes for the attributes of custom entity types (used by attribute filters)
+    search_filter_indexes: bool = True
+    # In-process vector index mirror of hot groups (similarity search in memory, Neo4j hydrates)
+    vector_index_enabled: bool = False
+    vector_index_memory_mb: int = 256
+    vector_index_max_group: int = 200_000
+    vector_index_ttl: float = 300.0
+    # Reranker of search calls that name none, and the rerankers clients may request (None for all)
+    search_reranker: str = 'rrf'
+    search_rerankers: Optional[list[str]] = None
+    # Searches at least this slow (milliseconds) are logged with their stage timings (0 disables)
+    search_slow_ms: float = 1000.0
+    # Default token budget of get_context bundles
+    context_max_tokens: int = 4000
+    # Recency/importance decay of searches called with decay=True
+    search_decay_half_life_days: float = 30.0
+    search_recency_weight: float = 0.3
+    search_importance_weight: float = 0.1
+    # Shared httpx pool injected into the LLM, embedder and reranker OpenAI SDK clients
+    http_pool_enabled: bool = True
+    http_pool: HttpPoolConfig = Field(default_factory=HttpPoolConfig)
+    # Deterministic local LLM/embedder stand-ins for offline benchmarking
+    stub_llm: bool = False
+    stub_embedder: bool = False
+    stub_llm_latency: Optional[str] = None
+    stub_embedder_latency: Optional[str] = None
+    stub_seed: int = 0
     group_id: Optional[str] = None
     use_custom_entities: bool = False
     # entity_subset: Optional[list[str]] = None # REMOVED: This is now controlled by loading mechanism via --entities arg
@@ -273,11 +446,70 @@ class GraphitiConfig(BaseModel):
         openai_api_key = os.environ.get('OPENAI_API_KEY')
         openai_base_url = os.environ.get('OPENAI_BASE_URL')
         model_name = os.environ.get('MODEL_NAME')
+        small_model_name = os.environ.get('SMALL_MODEL_NAME')
+        llm_model_overrides = parse_model_overrides(os.environ.get('LLM_MODEL_OVERRIDES'))
+        llm_pricing = parse_pricing(os.environ.get('LLM_PRICING'))
+        llm_token_budget_enabled = os.environ.get('LLM_TOKEN_BUDGET', 'true').lower() == 'true'
+        llm_context_windows = parse_context_windows(os.environ.get('LLM_CONTEXT_WINDOWS'))
+        llm_default_context_window = int(os.environ.get('LLM_DEFAULT_CONTEXT_WINDOW', DEFAULT_CONTEXT_WINDOW))
         
         # Embedder configuration (separate from LLM)
         embedder_api_key = os.environ.get('EMBEDDER_API_KEY')
         embedder_base_url = os.environ.get('EMBEDDER_BASE_URL')
         embedder_model = os.environ.get('EMBEDDER_MODEL')
+        embedding_dimensions = os.environ.get('EMBEDDING_DIMENSIONS')
+        embedding_profile = EmbeddingProfile(
+            dimensions=int(embedding_dimensions) if embedding_dimensions else None,
+            cache_dtype=os.environ.get('EMBEDDING_CACHE_DTYPE', 'float32').lower(),
+        )
+        embedding_cache_enabled = os.environ.get('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+        embedding_cache_size = int(os.environ.get('EMBEDDING_CACHE_SIZE', 50_000))
+        embedding_cache_dir = os.environ.get('EMBEDDING_CACHE_DIR') or None
+        embedding_batch_enabled = os.environ.get('EMBEDDING_BATCH_ENABLED', 'true').lower() == 'true'
+        embedding_batch_size = int(os.environ.get('EMBEDDING_BATCH_SIZE', 64))
+        embedding_batch_wait_ms = float(os.environ.get('EMBEDDING_BATCH_WAIT_MS', 5.0))
+
+        # Search result cache
+        search_cache_enabled = os.environ.get('SEARCH_CACHE_ENABLED', 'true').lower() == 'true'
+        search_cache_size = int(os.environ.get('SEARCH_CACHE_SIZE', 1000))
+        search_cache_ttl = float(os.environ.get('SEARCH_CACHE_TTL', 300.0))
+        search_cache_redis_url = os.environ.get('SEARCH_CACHE_REDIS_URL') or None
+        search_semantic_reuse = os.environ.get('SEARCH_SEMANTIC_REUSE', 'false').lower() == 'true'
+        search_semantic_threshold = float(os.environ.get('SEARCH_SEMANTIC_THRESHOLD', 0.95))
+        search_semantic_recent = int(os.environ.get('SEARCH_SEMANTIC_RECENT', 256))
+        search_pages_ranked = int(os.environ.get('SEARCH_PAGES_RANKED', 3))
+        search_page_depth = int(os.environ.get('SEARCH_PAGE_DEPTH', 50))
+        search_page_ttl = float(os.environ.get('SEARCH_PAGE_TTL', 600.0))
+        compact_text_chars = int(os.environ.get('COMPACT_TEXT_CHARS', 300))
+        search_filter_indexes = os.environ.get('SEARCH_FILTER_INDEXES', 'true').lower() == 'true'
+        vector_index_enabled = os.environ.get('VECTOR_INDEX_ENABLED', 'false').lower() == 'true'
+        vector_index_memory_mb = int(os.environ.get('VECTOR_INDEX_MEMORY_MB', 256))
+        vector_index_max_group = int(os.environ.get('VECTOR_INDEX_MAX_GROUP', 200_000))
+        vector_index_ttl = float(os.environ.get('VECTOR_INDEX_TTL', 300.0))
+        search_reranker = os.environ.get('SEARCH_RERANKER', 'rrf').lower()
+        search_rerankers = parse_rerankers(os.environ.get('SEARCH_RERANKERS'))
+        search_slow_ms = float(os.environ.get('SEARCH_SLOW_MS', 1000.0))
+        context_max_tokens = int(os.environ.get('CONTEXT_MAX_TOKENS', 4000))
+        search_decay_half_life_days = float(os.environ.get('SEARCH_DECAY_HALF_LIFE_DAYS', 30.0))
+        search_recency_weight = float(os.environ.get('SEARCH_RECENCY_WEIGHT', 0.3))
+        search_importance_weight = float(os.environ.get('SEARCH_IMPORTANCE_WEIGHT', 0.1))
+
+        # Shared HTTP connection pool tuning
+        http_pool_enabled = os.environ.get('HTTP_POOL_ENABLED', 'true').lower() == 'true'
+        http_pool = HttpPoolConfig(
+            http2=os.environ.get('HTTP_POOL_HTTP2', 'true').lower() == 'true',
+            max_connections=int(os.environ.get('HTTP_POOL_MAX_CONNECTIONS', 100)),
+            max_keepalive_connections=int(os.environ.get('HTTP_POOL_MAX_KEEPALIVE', 40)),
+            keepalive_expiry=float(os.environ.get('HTTP_POOL_KEEPALIVE_EXPIRY', 60.0)),
+            warmup=os.environ.get('HTTP_POOL_WARMUP', 'true').lower() == 'true',
+        )
+
+        # Stub clients (see mcp_server/stub_clients.py for the latency spec format)
+        stub_llm = os.environ.get('STUB_LLM', 'false').lower() == 'true'
+        stub_embedder = os.environ.get('STUB_EMBEDDER', 'false').lower() == 'true'
+        stub_llm_latency = os.environ.get('STUB_LLM_LATENCY')
+        stub_embedder_latency = os.environ.get('STUB_EMBEDDER_LATENCY')
+        stub_seed = int(os.environ.get('STUB_SEED', 0))
 
         # Environment context check for password hardening
         # Use GRAPHITI_ENV if set, else treat as non-dev
@@ -298,9 +530,52 @@ class GraphitiConfig(BaseModel):
             openai_api_key=openai_api_key,
             openai_base_url=openai_base_url,
             model_name=model_name,
+            small_model_name=small_model_name,
+            llm_model_overrides=llm_model_overrides,
+            llm_pricing=llm_pricing,
+            llm_token_budget_enabled=llm_token_budget_enabled,
+            llm_context_windows=llm_context_windows,
+            llm_default_context_window=llm_default_context_window,
             embedder_api_key=embedder_api_key,
             embedder_base_url=embedder_base_url,
             embedder_model=embedder_model,
+            embedding_profile=embedding_profile,
+            embedding_cache_enabled=embedding_cache_enabled,
+            embedding_cache_size=embedding_cache_size,
+            embedding_cache_dir=embedding_cache_dir,
+            embedding_batch_enabled=embedding_batch_enabled,
+            embedding_batch_size=embedding_batch_size,
+            embedding_batch_wait_ms=embedding_batch_wait_ms,
+            search_cache_enabled=search_cache_enabled,
+            search_cache_size=search_cache_size,
+            search_cache_ttl=search_cache_ttl,
+            search_cache_redis_url=search_cache_redis_url,
+            search_semantic_reuse=search_semantic_reuse,
+            search_semantic_threshold=search_semantic_threshold,
+            search_semantic_recent=search_semantic_recent,
+            search_pages_ranked=search_pages_ranked,
+            search_page_depth=search_page_depth,
+            search_page_ttl=search_page_ttl,
+            compact_text_chars=compact_text_chars,
+            search_filter_indexes=search_filter_indexes,
+            vector_index_enabled=vector_index_enabled,
+            vector_index_memory_mb=vector_index_memory_mb,
+            vector_index_max_group=vector_index_max_group,
+            vector_index_ttl=vector_index_ttl,
+            search_reranker=search_reranker,
+            search_rerankers=search_rerankers,
+            search_slow_ms=search_slow_ms,
+            context_max_tokens=context_max_tokens,
+            search_decay_half_life_days=search_decay_half_life_days,
+            search_recency_weight=search_recency_weight,
+            search_importance_weight=search_importance_weight,
+            http_pool_enabled=http_pool_enabled,
+            http_pool=http_pool,
+            stub_llm=stub_llm,
+            stub_embedder=stub_embedder,
+            stub_llm_latency=stub_llm_latency,
+            stub_embedder_latency=stub_embedder_latency,
+            stub_seed=stub_seed,
         )
 
 
@@ -308,6 +583,8 @@ class MCPConfig(BaseModel):
     """Configuration for MCP server."""
 
     transport: str
+    # False when the process was started for a one-off command (e.g. --reembed-groups)
+    serve: bool = True
 
 
 # Configure logging
@@ -402,8 +679,10 @@ The narrative preserves context while entities provide structured data for preci
    - Episodes are stored in graph namespaces identified by group_id (defaults to "global")
 2. **Search for nodes** (entities) using natural language queries with search_nodes
 3. **Find facts** (relationships between entities) with search_facts
-4. **Discover entity schemas** using resources at entity:// and entity_instruction://
-5. **Manage the knowledge graph** with delete_episode, delete_entity_edge, and clear_graph
+4. **Load the context of a task** (entities, facts and recent episodes) in one call with get_context,
+   and explore around known entities with get_neighborhood
+5. **Discover entity schemas** using resources at entity:// and entity_instruction://
+6. **Manage the knowledge graph** with delete_episode, delete_entity_edge, and clear_graph
 
 ## Best Practices
 
@@ -455,6 +734,233 @@ def get_default_group_ids() -> list[str]:
 # Initialize Graphiti client
 graphiti_client: Optional[Graphiti] = None
 
+# Upper bound on queries accepted by one search_batch call
+MAX_BATCH_QUERIES = 20
+# Upper bound on max_results of one search_batch query
+MAX_BATCH_RESULTS = 50
+
+# Upper bound on the token budget of one get_context bundle
+MAX_CONTEXT_TOKENS = 32_000
+
+# Per-prompt LLM metrics (latency, tokens, cost, retries, errors) collected by InstrumentedLLMClient
+llm_stats = LLMStats(pricing=config.llm_pricing)
+
+# Preflight token budget applied to every LLM request (None if disabled)
+prompt_budget: Optional[PromptBudget] = (
+    PromptBudget(
+        context_windows=config.llm_context_windows,
+        default_context_window=config.llm_default_context_window,
+    )
+    if config.llm_token_budget_enabled
+    else None
+)
+
+# Token counter of get_context bundles (shares the prompt budget's memoized counts)
+context_token_counter = prompt_budget.counter if prompt_budget is not None else TokenCounter()
+
+# Embedding cache and batcher wrapping the configured embedder (set in initialize_graphiti)
+embedding_cache: Optional[CachingEmbedder] = None
+embedding_batcher: Optional[EmbeddingBatcher] = None
+
+# Cache of search_nodes/search_facts responses (set in initialize_graphiti, None if disabled)
+search_cache: Optional[SearchResultCache] = None
+
+# In-process vector index of hot groups (set in initialize_graphiti, None if disabled)
+vector_index: Optional[VectorIndexMirror] = None
+
+# Reranker selection for search calls and rerank latency per reranker
+rerank_policy = RerankPolicy(default=config.search_reranker, allowed=config.search_rerankers)
+rerank_stats = RerankStats()
+
+# Half-life and weights of recency/importance decay scoring
+decay_policy = DecayPolicy(
+    half_life_days=config.search_decay_half_life_days,
+    recency_weight=config.search_recency_weight,
+    importance_weight=config.search_importance_weight,
+)
+
+# Time to first result and total time of streamed searches
+search_stream_stats = StreamStats()
+
+# Stage latencies of searches per tool and group, and the slow search log
+search_latency = SearchLatencyStats(slow_ms=config.search_slow_ms)
+
+# Ranked uuids of recent searches, served page by page through cursors
+ranked_results = RankedResultStore(ttl_seconds=config.search_page_ttl)
+
+# Shared HTTP pool for all OpenAI SDK clients (created lazily, see get_http_pool)
+http_pool: Optional[SharedHttpPool] = None
+
+
+def get_http_pool() -> Optional[SharedHttpPool]:
+    """Return the shared HTTP pool, creating it on first use (None if disabled)."""
+    global http_pool
+    if not config.http_pool_enabled:
+        return None
+    if http_pool is None:
+        http_pool = SharedHttpPool(config.http_pool)
+    return http_pool
+
+
+def create_openai_sdk_client(api_key: Optional[str], base_url: Optional[str] = None) -> Optional[openai.AsyncOpenAI]:
+    """Create an AsyncOpenAI client bound to the shared HTTP pool.
+
+    Returns None when the shared pool is disabled, so callers fall back to the
+    graphiti-core default of one client (and one pool) per component.
+    """
+    pool = get_http_pool()
+    if pool is None:
+        return None
+    return openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=pool.client)
+
+
+def create_embedding_batcher(embedder: EmbedderClient) -> EmbeddingBatcher:
+    """Wrap an embedder in the cross-request micro-batcher."""
+    global embedding_batcher
+    embedding_batcher = EmbeddingBatcher(
+        embedder,
+        max_batch_size=config.embedding_batch_size,
+        max_wait_ms=config.embedding_batch_wait_ms,
+    )
+    logger.info(
+        f'Embedding batching enabled (up to {config.embedding_batch_size} inputs, '
+        f'{config.embedding_batch_wait_ms} ms window)'
+    )
+    return embedding_batcher
+
+
+def create_embedding_cache(embedder: EmbedderClient) -> CachingEmbedder:
+    """Wrap an embedder in the content-addressed embedding cache."""
+    global embedding_cache
+    base = embedder.inner if isinstance(embedder, EmbeddingBatcher) else embedder
+    if isinstance(base, StubEmbedder):
+        model, embedding_dim = 'stub', base.embedding_dim
+    else:
+        model = config.embedder_model or DEFAULT_EMBEDDING_MODEL
+        embedding_dim = base.config.embedding_dim
+    embedding_cache = CachingEmbedder(
+        embedder,
+        model=model,
+        embedding_dim=embedding_dim,
+        max_entries=config.embedding_cache_size,
+        disk_dir=config.embedding_cache_dir,
+        disk_dtype=config.embedding_profile.cache_dtype,
+    )
+    logger.info(
+        f'Embedding cache enabled (model: {model}, {config.embedding_cache_size} entries in memory, '
+        f'disk: {config.embedding_cache_dir or "off"})'
+    )
+    return embedding_cache
+
+
+def create_search_cache() -> SearchResultCache:
+    """Create the search result cache, with the shared Redis level if configured."""
+    global search_cache
+    backend = RedisSearchCacheBackend(config.search_cache_redis_url) if config.search_cache_redis_url else None
+    semantic = (
+        SemanticQueryIndex(threshold=config.search_semantic_threshold, max_per_scope=config.search_semantic_recent)
+        if config.search_semantic_reuse
+        else None
+    )
+    search_cache = SearchResultCache(
+        max_entries=config.search_cache_size,
+        ttl_seconds=config.search_cache_ttl,
+        backend=backend,
+        semantic=semantic,
+    )
+    logger.info(
+        f'Search result cache enabled ({config.search_cache_size} entries, {config.search_cache_ttl}s TTL, '
+        f'shared backend: {"redis" if backend is not None else "off"}, '
+        f'near-duplicate reuse: {config.search_semantic_threshold if semantic is not None else "off"})'
+    )
+    return search_cache
+
+
+def create_vector_index() -> VectorIndexMirror:
+    """Create the vector index mirror and route graphiti-core similarity searches through it."""
+    global vector_index
+    vector_index = VectorIndexMirror(
+        memory_budget_bytes=config.vector_index_memory_mb * 1024 * 1024,
+        max_group_vectors=config.vector_index_max_group,
+        ttl_seconds=config.vector_index_ttl,
+    )
+    install_vector_index(vector_index)
+    logger.info(
+        f'Vector index mirror enabled ({config.vector_index_memory_mb} MB, groups up to '
+        f'{config.vector_index_max_group} vectors, {config.vector_index_ttl}s TTL)'
+    )
+    return vector_index
+
+
+def install_search_wrappers() -> None:
+    """Install the replacements and wrappers of graphiti-core's search functions.
+
+    The filter pushdown (node fulltext search) and the vector index mirror (similarity
+    searches) replace search functions, so they are installed first. Stage timing wraps the
+    replacements, and streaming wraps the timed functions so sending partial results is not
+    counted as search time.
+    """
+    # Searches apply created_at ranges, attribute filters and as_of in Cypher
+    install_filter_pushdown()
+    if config.vector_index_enabled:
+        create_vector_index()
+    install_search_timing()
+    install_candidate_streaming()
+
+
+async def embed_query(client: Graphiti, query: str) -> list[float]:
+    """Embed a search query, timed as the embed stage."""
+    with stage('embed'):
+        return await client.embedder.create(input_data=[query.replace('\n', ' ')])
+
+
+async def lookup_cached_search(
+    client: Graphiti, tool: str, params: dict[str, Any], query_vector: Optional[list[float]] = None
+) -> tuple[Optional[Any], Optional[SearchCacheKeys], Optional[list[float]]]:
+    """Look a search call up in the result cache.
+
+    Returns the cached response (None on a miss), the keys to store a fresh result under, and
+    the query embedding (the one passed in, or one computed for near-duplicate matching); pass
+    it on to the search so the query is not embedded twice.
+    """
+    if search_cache is None:
+        return None, None, query_vector
+    keys = await search_cache.make_keys(tool, params)
+    if keys is None:
+        return None, None, query_vector
+    # A cached first page whose cursor snapshot has expired is searched again
+    with stage('cache'):
+        cached = await search_cache.get(keys.key)
+    if cached is not None and ranked_results.is_live(cached.get('next_cursor')):
+        return cached, keys, query_vector
+    query = params.get('query') or ''
+    if search_cache.semantic is not None and client.embedder is not None and query.strip():
+        if query_vector is None:
+            query_vector = await embed_query(client, query)
+        with stage('cache'):
+            cached = await search_cache.get_similar(keys.scope, query_vector)
+        if cached is not None and ranked_results.is_live(cached.get('next_cursor')):
+            return cached, keys, query_vector
+    return None, keys, query_vector
+
+
+async def store_search_result(
+    keys: Optional[SearchCacheKeys], response: Any, query_vector: Optional[list[float]] = None
+) -> None:
+    """Store a search response under the keys returned by lookup_cached_search."""
+    if search_cache is not None and keys is not None:
+        await search_cache.put(keys.key, response, scope=keys.scope, query_vector=query_vector)
+
+
+async def invalidate_search_cache(group_ids: Optional[list[str]] = None) -> None:
+    """Invalidate cached search results of the given groups (all groups if None)."""
+    if search_cache is None:
+        return
+    if group_ids is None:
+        await search_cache.invalidate_all()
+    else:
+        await search_cache.invalidate(group_ids)
+
 
 async def initialize_graphiti(llm_client: Optional[LLMClient] = None, destroy_graph: bool = False):
     """Initialize the Graphiti client with the provided settings.
@@ -467,72 +973,187 @@ async def initialize_graphiti(llm_client: Optional[LLMClient] = None, destroy_gr
 
     # If no client is provided, create a default OpenAI client
     if not llm_client:
-        if config.openai_api_key:
+        if config.stub_llm:
+            llm_client = create_stub_llm_client()
+        elif config.openai_api_key:
             llm_config = LLMConfig(api_key=config.openai_api_key)
             if config.openai_base_url:
                 llm_config.base_url = config.openai_base_url
             if config.model_name:
                 llm_config.model = config.model_name
-            llm_client = OpenAIClient(config=llm_config)
+            if config.small_model_name:
+                llm_config.small_model = config.small_model_name
+            llm_client = OpenAIClient(
+                config=llm_config,
+                client=create_openai_sdk_client(config.openai_api_key, config.openai_base_url),
+            )
         else:
             raise ValueError('OPENAI_API_KEY must be set when not using a custom LLM client')
 
     if not config.neo4j_uri or not config.neo4j_user or not config.neo4j_password:
         raise ValueError('NEO4J_URI, NEO4J_USER, and NEO4J_PASSWORD must be set')
 
+    # Record per-prompt latency/token/cost metrics for every LLM call graphiti-core makes,
+    # and fit each request into the model's context window before it is sent
+    if not isinstance(llm_client, InstrumentedLLMClient):
+        llm_client = InstrumentedLLMClient(llm_client, llm_stats, budget=prompt_budget)
+
     # Create separate embedder client if configured
     embedder = None
     logger.info(f'Checking embedder configuration: embedder_api_key={"[SET]" if config.embedder_api_key else "[NOT SET]"}')
-    if config.embedder_api_key:
+    embedding_dimensions = config.embedding_profile.dimensions
+    if config.stub_embedder:
+        embedder = StubEmbedder(
+            embedding_dim=embedding_dimensions or EMBEDDING_DIM,
+            latency=LatencyModel.parse(config.stub_embedder_latency, seed=config.stub_seed),
+            seed=config.stub_seed,
+        )
+    elif config.embedder_api_key:
         logger.info('Creating separate OpenAI embedder client')
         embedder_config = OpenAIEmbedderConfig(
             api_key=config.embedder_api_key,
-            embedding_model=config.embedder_model or "text-embedding-3-small"
+            embedding_model=config.embedder_model or "text-embedding-3-small",
+            embedding_dim=embedding_dimensions or EMBEDDING_DIM,
         )
         if config.embedder_base_url:
             embedder_config.base_url = config.embedder_base_url
         
-        embedder = OpenAIEmbedder(config=embedder_config)
+        # Requests shortened vectors from text-embedding-3 models when EMBEDDING_DIMENSIONS is set
+        embedder = DimensionedOpenAIEmbedder(
+            config=embedder_config,
+            client=create_openai_sdk_client(config.embedder_api_key, config.embedder_base_url),
+            dimensions=embedding_dimensions,
+        )
         logger.info(f'Configured separate embedder: {config.embedder_model or "text-embedding-3-small"} at {config.embedder_base_url or "https://api.openai.com/v1"}')
     else:
         logger.warning('No embedder API key configured - search functions will not work!')
 
+    # Coalesce concurrent embedding calls into batched provider requests
+    if embedder is not None and config.embedding_batch_enabled:
+        embedder = create_embedding_batcher(embedder)
+
+    # Serve repeated entity names, facts and queries from the embedding cache (in front of the batcher)
+    if embedder is not None and config.embedding_cache_enabled:
+        embedder = create_embedding_cache(embedder)
+
+    # Reranker shares the LLM endpoint (and the shared HTTP pool) when an API key is configured
+    cross_encoder = None
+    if config.stub_llm:
+        cross_encoder = StubCrossEncoder()
+    elif config.openai_api_key:
+        cross_encoder = OpenAIRerankerClient(
+            config=LLMConfig(api_key=config.openai_api_key, base_url=config.openai_base_url),
+            client=create_openai_sdk_client(config.openai_api_key, config.openai_base_url),
+        )
+
+    # Rerank time is reported per search; without a cross encoder that reranker is unavailable
+    if cross_encoder is not None:
+        cross_encoder = TimedCrossEncoder(cross_encoder)
+    else:
+        rerank_policy.disable('cross_encoder')
+    install_search_wrappers()
+
     graphiti_client = Graphiti(
         uri=config.neo4j_uri,
         user=config.neo4j_user,
         password=config.neo4j_password,
         llm_client=llm_client,
         embedder=embedder,
+        cross_encoder=cross_encoder,
     )
 
+    # Open connections to the LLM/embedder origins up front so the first calls skip TCP/TLS setup
+    pool = get_http_pool()
+    if pool is not None:
+        endpoints = []
+        if not config.stub_llm:
+            endpoints.append((config.openai_base_url, config.openai_api_key))
+        if config.embedder_api_key and not config.stub_embedder:
+            endpoints.append((config.embedder_base_url, config.embedder_api_key))
+        if endpoints:
+            await pool.warm_up(endpoints)
+
     if destroy_graph:
         logger.info('Destroying graph...')
         await clear_data(graphiti_client.driver)
 
+    if config.search_cache_enabled:
+        create_search_cache()
+
     # Initialize the graph database with Graphiti's indices
     await graphiti_client.build_indices_and_constraints()
+    await build_extra_indexes(graphiti_client)
     logger.info('Graphiti client initialized successfully')
 
 
-def format_fact_result(edge: EntityEdge) -> dict[str, Any]:
+async def build_extra_indexes(client: Graphiti) -> None:
+    """Create the indexes the server's own queries use on top of graphiti-core's.
+
+    These are the (group_id, name) index of exact name lookups, the (group_id, validity)
+    indexes of as_of fact searches, the (group_id, created_at) index of episode pages and,
+    with custom entity types, the property indexes used by attribute filters.
+    """
+    await ensure_indexes(
+        client.driver, LOOKUP_INDEX_STATEMENTS + TEMPORAL_INDEX_STATEMENTS + EPISODE_INDEX_STATEMENTS
+    )
+    if not (config.use_custom_entities and config.search_filter_indexes and ENTITIES):
+        return
+    created = await ensure_attribute_indexes(client.driver, ENTITIES)
+    logger.info(f'Ensured {created} attribute indexes for {len(ENTITIES)} entity types')
+
+
+# Serializers of the node result fields, so fields left out of a projection are never built
+NODE_RESULT_FIELDS: dict[str, Callable[[EntityNode], Any]] = {
+    'uuid': lambda node: node.uuid,
+    'name': lambda node: node.name,
+    'summary': lambda node: node.summary if hasattr(node, 'summary') else '',
+    'labels': lambda node: node.labels if hasattr(node, 'labels') else [],
+    'group_id': lambda node: node.group_id,
+    'created_at': lambda node: node.created_at.isoformat(),
+    'attributes': lambda node: node.attributes if hasattr(node, 'attributes') else {},
+}
+
+
+def format_node_result(node: EntityNode, projection: Projection = FULL_PROJECTION) -> NodeResult:
+    """Format an entity node into a search result (without its embedding)."""
+    result = cast(
+        NodeResult,
+        {field: serialize(node) for field, serialize in NODE_RESULT_FIELDS.items() if projection.includes(field)},
+    )
+    if 'summary' in result:
+        result['summary'] = projection.truncate(result['summary'])
+    return result
+
+
+def format_fact_result(edge: EntityEdge, projection: Projection = FULL_PROJECTION) -> dict[str, Any]:
     """Format an entity edge into a readable result.
 
     Since EntityEdge is a Pydantic BaseModel, we can use its built-in serialization capabilities.
 
     Args:
         edge: The EntityEdge to format
+        projection: Fields to include (all but the embedding by default)
 
     Returns:
         A dictionary representation of the edge with serialized dates and excluded embeddings
     """
     return edge.model_dump(
         mode='json',
+        include=projection.include_set(),
         exclude={
             'fact_embedding',
         },
     )
 
 
+def format_episode_result(episode: EpisodicNode, projection: Projection = FULL_PROJECTION) -> dict[str, Any]:
+    """Format an episode, serializing only the projected fields and truncating its content."""
+    result = episode.model_dump(mode='json', include=projection.include_set())
+    if 'content' in result:
+        result['content'] = projection.truncate(result['content'])
+    return result
+
+
 # Dictionary to store queues for each group_id
 # Each queue is a list of tasks to be processed sequentially
 episode_queues: dict[str, asyncio.Queue] = {}
@@ -677,16 +1298,27 @@ async def add_episode(
                 # Call the core library function
                 # Always pass the string version - Graphiti expects strings for all episode types
                 
-                await client.add_episode(
-                    name=name,
-                    episode_body=episode_body_str,
-                    source=source_type,
-                    source_description=source_description,
-                    group_id=group_id_str,
-                    uuid=uuid,
-                    reference_time=datetime.now(timezone.utc),
-                    entity_types=entities_to_use,
-                )
+                episode_results = None
+                try:
+                    episode_results = await client.add_episode(
+                        name=name,
+                        episode_body=episode_body_str,
+                        source=source_type,
+                        source_description=source_description,
+                        group_id=group_id_str,
+                        uuid=uuid,
+                        reference_time=datetime.now(timezone.utc),
+                        entity_types=entities_to_use,
+                    )
+                finally:
+                    # Cached searches of this group are stale now, even if ingestion failed part-way
+                    await invalidate_search_cache([group_id_str])
+                    if vector_index is not None:
+                        if episode_results is not None:
+                            vector_index.apply_episode(group_id_str, episode_results.nodes, episode_results.edges)
+                        else:
+                            # Rows committed before the failure are unknown; reload the group lazily
+                            vector_index.invalidate(group_id_str)
                 logger.info(f"Episode '{name}' added successfully to graph")
 
                 logger.info(f"Building communities after episode '{name}'")
@@ -742,6 +1374,309 @@ async def add_episode(
 
 
 
+def create_result_stream(
+    tool: str, kind: str, format_result: Callable[[Any], dict[str, Any]], limit: int
+) -> Optional[ProgressiveResults]:
+    """Create the candidate listener of a streamed search call (None outside an MCP request).
+
+    Partial results are sent as log message notifications (logger graphiti.<tool>) and
+    progress as progress notifications when the client sent a progress token.
+    """
+    try:
+        ctx = mcp.get_context()
+        session = ctx.session
+    except (LookupError, ValueError):
+        return None
+
+    async def send(partial: dict[str, Any]) -> None:
+        await session.send_log_message(level='info', data=partial, logger=f'graphiti.{tool}')
+
+    return ProgressiveResults(kind, format_result, limit, send, ctx.report_progress)
+
+
+async def finish_result_stream(tool: str, stream: Optional[ProgressiveResults]) -> None:
+    """Report the final progress of a streamed search and record its latencies."""
+    if stream is not None:
+        total_ms = await stream.finish()
+        search_stream_stats.observe(tool, stream.first_result_ms, total_ms)
+
+
+def traced_search(tool: str):
+    """Decorator recording the stage timings of a perform_*_search function.
+
+    The decorated function takes an extra debug_timings keyword; when set, the response
+    includes the stage timings of the call (milliseconds, with the total) under timings.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(
+            client: Graphiti, query: str, group_ids: list[str], *args: Any, debug_timings: bool = False, **kwargs: Any
+        ) -> Any:
+            started = time.perf_counter()
+            with collect_timings() as timings:
+                response = await func(client, query, group_ids, *args, **kwargs)
+            total_ms = (time.perf_counter() - started) * 1000
+            search_latency.observe(tool, group_ids, timings, total_ms, query)
+            if debug_timings:
+                stages = {name: round(elapsed_ms, 3) for name, elapsed_ms in timings.items()}
+                cast(dict, response)['timings'] = {**stages, 'total': round(total_ms, 3)}
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def search_pages(paged: bool, decay: Optional[DecayPolicy]) -> int:
+    """Return the pages a first search ranks: several for cursors or decay re-scoring, else one."""
+    return config.search_pages_ranked if paged or decay is not None else 1
+
+
+@traced_search('search_nodes')
+async def perform_node_search(
+    client: Graphiti,
+    query: str,
+    group_ids: list[str],
+    max_nodes: int = 10,
+    center_node_uuid: Optional[str] = None,
+    entity: str = '',
+    cursor: Optional[str] = None,
+    query_vector: Optional[list[float]] = None,
+    projection: Projection = FULL_PROJECTION,
+    search_filter: Optional[SearchFilters] = None,
+    reranker: Optional[str] = None,
+    stream: Optional[ProgressiveResults] = None,
+    decay: Optional[DecayPolicy] = None,
+    paged: bool = True,
+) -> NodeSearchResponse:
+    """Run a node search (or serve a page of an earlier one); see the search_nodes tool.
+
+    Args:
+        query_vector: Precomputed query embedding (e.g. from a batch), used instead of embedding
+            the query again
+        projection: Fields and text budget of the returned nodes
+        search_filter: Label, attribute and time filters (see build_node_filters); when given,
+            entity is ignored
+        reranker: Reranker name (the rerank policy default if None)
+        stream: Listener receiving the candidates of each search method before reranking
+        decay: Re-score the ranked results by age and importance with this policy (None for none)
+        paged: Rank further pages and return a next_cursor; callers that cannot hand the cursor
+            back rank only the page (or the decay candidates) and keep no snapshot
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or expired
+        ValueError: If the reranker is unknown or not allowed
+    """
+    # Follow-up pages come from the ranked snapshot of the first search
+    if cursor:
+        page_uuids, next_cursor = ranked_results.page('search_nodes', cursor, max_nodes)
+        with stage('hydrate'):
+            nodes_by_uuid = {node.uuid: node for node in await EntityNode.get_by_uuids(client.driver, page_uuids)}
+        with stage('format'):
+            page_nodes = [format_node_result(nodes_by_uuid[u], projection) for u in page_uuids if u in nodes_by_uuid]
+        return NodeSearchResponse(
+            message='Nodes retrieved successfully',
+            nodes=page_nodes,
+            next_cursor=next_cursor,
+            reranker=None,
+            rerank_ms=None,
+        )
+
+    # Shared recipe of the reranker, ranking enough nodes for a few pages so later pages need no new search
+    reranker = rerank_policy.resolve(reranker, center_node_uuid)
+    depth = ranking_depth(reranker, max_nodes, search_pages(paged, decay), config.search_page_depth)
+    search_config = get_search_config('nodes', reranker, depth)
+
+    filters = search_filter if search_filter is not None else SearchFilters(node_labels=[entity] if entity else None)
+
+    cached, cache_keys, query_vector = await lookup_cached_search(
+        client,
+        'search_nodes',
+        {
+            'query': query,
+            'group_ids': group_ids,
+            'max_nodes': max_nodes,
+            'center_node_uuid': center_node_uuid,
+            'filters': filters.model_dump(mode='json'),
+            'projection': projection.cache_params(),
+            'reranker': reranker,
+            'decay': decay.describe() if decay is not None else None,
+            'paged': paged,
+        },
+        query_vector=query_vector,
+    )
+    if cached is not None:
+        return cached
+
+    # Perform the search (reusing the query embedding if one was computed already)
+    if query_vector is None and query.strip():
+        query_vector = await embed_query(client, query)
+    if stream is not None:
+        stream.expect_stages(len(search_config.node_config.search_methods))
+    with collect_timings() as timings, stream_candidates(stream):
+        search_results = await graphiti_search(
+            client.clients,
+            query,
+            group_ids,
+            search_config,
+            filters,
+            center_node_uuid,
+            query_vector=query_vector,
+        )
+    rerank_ms = round(timings.get('rerank', 0.0), 3)
+    rerank_stats.observe(reranker, rerank_ms)
+    if decay is not None:
+        with stage('decay'):
+            search_results.nodes = rescore(
+                search_results.nodes, lambda node: node.created_at, lambda node: node.attributes, decay
+            )
+
+    if not search_results.nodes:
+        response = NodeSearchResponse(
+            message='No relevant nodes found', nodes=[], next_cursor=None, reranker=reranker, rerank_ms=None
+        )
+    else:
+        # Format the first page of node results
+        with stage('format'):
+            formatted_nodes: list[NodeResult] = [
+                format_node_result(node, projection) for node in search_results.nodes[:max_nodes]
+            ]
+        next_cursor = (
+            ranked_results.first_page('search_nodes', [node.uuid for node in search_results.nodes], max_nodes)
+            if paged
+            else None
+        )
+        response = NodeSearchResponse(
+            message='Nodes retrieved successfully',
+            nodes=formatted_nodes,
+            next_cursor=next_cursor,
+            reranker=reranker,
+            rerank_ms=None,
+        )
+    # Cached copies carry no rerank time; they are served without reranking
+    await store_search_result(cache_keys, response, query_vector)
+    response['rerank_ms'] = rerank_ms
+    return response
+
+
+@traced_search('search_facts')
+async def perform_fact_search(
+    client: Graphiti,
+    query: str,
+    group_ids: list[str],
+    max_facts: int = 10,
+    center_node_uuid: Optional[str] = None,
+    cursor: Optional[str] = None,
+    query_vector: Optional[list[float]] = None,
+    projection: Projection = FULL_PROJECTION,
+    search_filter: Optional[SearchFilters] = None,
+    reranker: Optional[str] = None,
+    stream: Optional[ProgressiveResults] = None,
+    decay: Optional[DecayPolicy] = None,
+    paged: bool = True,
+) -> FactSearchResponse:
+    """Run a fact search (or serve a page of an earlier one); see the search_facts tool.
+
+    Args:
+        query_vector: Precomputed query embedding (e.g. from a batch), used instead of embedding
+            the query again
+        projection: Fields of the returned facts
+        search_filter: created_at/valid_at filters and as_of (see build_edge_filters)
+        reranker: Reranker name (the rerank policy default if None)
+        stream: Listener receiving the candidates of each search method before reranking
+        decay: Re-score the ranked results by age and importance with this policy (None for none)
+        paged: Rank further pages and return a next_cursor; callers that cannot hand the cursor
+            back rank only the page (or the decay candidates) and keep no snapshot
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or expired
+        ValueError: If the reranker is unknown or not allowed
+    """
+    # Follow-up pages come from the ranked snapshot of the first search
+    if cursor:
+        page_uuids, next_cursor = ranked_results.page('search_facts', cursor, max_facts)
+        with stage('hydrate'):
+            edges_by_uuid = {edge.uuid: edge for edge in await EntityEdge.get_by_uuids(client.driver, page_uuids)}
+        with stage('format'):
+            page_facts = [format_fact_result(edges_by_uuid[u], projection) for u in page_uuids if u in edges_by_uuid]
+        return {
+            'message': 'Facts retrieved successfully',
+            'facts': page_facts,
+            'next_cursor': next_cursor,
+            'reranker': None,
+            'rerank_ms': None,
+        }
+
+    reranker = rerank_policy.resolve(reranker, center_node_uuid)
+    filters = search_filter if search_filter is not None else SearchFilters()
+    cached, cache_keys, query_vector = await lookup_cached_search(
+        client,
+        'search_facts',
+        {
+            'query': query,
+            'group_ids': group_ids,
+            'max_facts': max_facts,
+            'center_node_uuid': center_node_uuid,
+            'filters': filters.model_dump(mode='json'),
+            'projection': projection.cache_params(),
+            'reranker': reranker,
+            'decay': decay.describe() if decay is not None else None,
+            'paged': paged,
+        },
+        query_vector=query_vector,
+    )
+    if cached is not None:
+        return cached
+
+    # Shared recipe of the reranker (graphiti_search does not modify it, unlike Graphiti.search)
+    depth = ranking_depth(reranker, max_facts, search_pages(paged, decay), config.search_page_depth)
+    search_config = get_search_config('facts', reranker, depth)
+
+    # Embed here rather than in graphiti_search so the embedding is timed as its own stage
+    if query_vector is None and query.strip():
+        query_vector = await embed_query(client, query)
+    if stream is not None:
+        stream.expect_stages(len(search_config.edge_config.search_methods))
+    with collect_timings() as timings, stream_candidates(stream):
+        relevant_edges = (
+            await graphiti_search(
+                client.clients,
+                query,
+                group_ids,
+                search_config,
+                filters,
+                center_node_uuid,
+                query_vector=query_vector,
+            )
+        ).edges
+    rerank_ms = round(timings.get('rerank', 0.0), 3)
+    rerank_stats.observe(reranker, rerank_ms)
+    if decay is not None:
+        # Facts decay from when they became true, falling back to when they were recorded
+        with stage('decay'):
+            relevant_edges = rescore(
+                relevant_edges, lambda edge: edge.valid_at or edge.created_at, lambda edge: edge.attributes, decay
+            )
+
+    if not relevant_edges:
+        response = {'message': 'No relevant facts found', 'facts': [], 'next_cursor': None}
+    else:
+        with stage('format'):
+            facts = [format_fact_result(edge, projection) for edge in relevant_edges[:max_facts]]
+        next_cursor = (
+            ranked_results.first_page('search_facts', [edge.uuid for edge in relevant_edges], max_facts)
+            if paged
+            else None
+        )
+        response = {'message': 'Facts retrieved successfully', 'facts': facts, 'next_cursor': next_cursor}
+    response.update(reranker=reranker, rerank_ms=None)
+    # Cached copies carry no rerank time; they are served without reranking
+    await store_search_result(cache_keys, response, query_vector)
+    response['rerank_ms'] = rerank_ms
+    return response
+
+
 @mcp.tool()
 async def search_nodes(
     query: str,
@@ -749,24 +1684,97 @@ async def search_nodes(
     max_nodes: int = 10,
     center_node_uuid: Optional[str] = None,
     entity: str = '',  # cursor seems to break with None
+    cursor: Optional[str] = None,
+    fields: Optional[list[str]] = None,
+    compact: bool = False,
+    entity_types: Optional[list[str]] = None,
+    attribute_filters: Optional[list[dict[str, Any]]] = None,
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+    rerank: Optional[str] = None,
+    decay: bool = False,
+    half_life_days: Optional[float] = None,
+    stream: bool = False,
+    debug_timings: bool = False,
 ) -> Union[NodeSearchResponse, ErrorResponse]:
     """Search the Graphiti knowledge graph for relevant node summaries.
     These contain a summary of all of a node's relationships with other nodes.
 
-    Note: entity is a single entity to filter results (permitted: "Preference", "Procedure").
+    Filters are applied inside the graph query before results are limited, so nodes that
+    do not match cannot crowd out those that do: entity_types keeps nodes with any of the
+    given entity types (entity is a single-type shorthand); attribute_filters compare node
+    attributes, each an object with property, op (=, !=, <, <=, >, >=, in, contains,
+    starts_with) and value, e.g.
+    {"entity": "BugReport", "property": "severity", "op": "=", "value": "high"}. When an
+    entity type is named the node must have it and the value is checked against that type's
+    attribute. created_after/created_before bound node creation time (ISO 8601).
+
+    rerank picks how candidates are ordered: "rrf" (fast, default), "mmr" (diverse results),
+    "cross_encoder" (most precise, slowest), "node_distance" (closest to center_node_uuid,
+    the default when one is given) or "episode_mentions" (most mentioned). The response
+    reports the reranker used and its rerank_ms. cross_encoder makes one model call per
+    distinct candidate name, up to about 4 x max_nodes calls (fulltext and similarity each
+    fetch 2 x max_nodes), and ranks only this page, so its results have no next_cursor.
+
+    decay=True favours recent and important nodes: the ranked candidates are re-scored by
+    blending relevance with an exponential decay of their age (half_life_days, default from
+    the server) and their importance level (e.g. Insight.importance_level), so a small
+    max_nodes still returns relevant recent nodes.
+
+    stream=True sends the candidates of each search method (fulltext, similarity, ...) as
+    soon as they are found, as log message notifications with "partial": true (logger
+    graphiti.search_nodes), and reports progress; the response is the final reranked set.
+
+    debug_timings=True adds timings to the response: milliseconds spent per stage (cache,
+    embed, fulltext, similarity, bfs, rerank, decay, hydrate, format; concurrent stages overlap)
+    and the total.
+
+    Results are paged: when more ranked nodes are available the response includes a
+    next_cursor; pass it back as cursor (with the same or another max_nodes) to get the next
+    page without searching again. With a cursor, query and filters are ignored.
+
+    Use fields to return only some node fields (uuid, name, summary, labels, group_id,
+    created_at, attributes). compact=True returns uuid, name, summary and labels (unless
+    fields are given) and shortens long summaries.
 
     Args:
         query: The search query
         group_ids: Optional list of group IDs to filter results (defaults to ["global"] if not provided)
-        max_nodes: Maximum number of nodes to return (default: 10)
+        max_nodes: Maximum number of nodes to return per page (default: 10)
         center_node_uuid: Optional UUID of a node to center the search around
-        entity: Optional single entity to filter results (permitted: "Preference", "Procedure")
+        entity: Optional single entity type to filter results
+        cursor: Optional next_cursor from a previous response
+        fields: Optional node fields to return (default: all)
+        compact: Return a compact result with truncated summaries (default: False)
+        entity_types: Optional entity types, any of which a node must have
+        attribute_filters: Optional attribute predicates, all of which a node must match
+        created_after: Optional ISO 8601 timestamp; only nodes created at or after it
+        created_before: Optional ISO 8601 timestamp; only nodes created before it
+        rerank: Optional reranker (defaults to the server policy)
+        decay: Re-score results by recency and importance (default: False)
+        half_life_days: Optional half-life of the recency decay in days (with decay)
+        stream: Send unranked candidates while searching (default: False)
+        debug_timings: Include per-stage timings in the response (default: False)
     """
     global graphiti_client
 
     if graphiti_client is None:
         return ErrorResponse(error='Graphiti client not initialized')
 
+    try:
+        projection = build_projection('nodes', fields, compact, config.compact_text_chars)
+        search_filter = build_node_filters(
+            labels=[*(entity_types or []), *([entity] if entity else [])],
+            attribute_filters=attribute_filters,
+            created_after=created_after,
+            created_before=created_before,
+            entity_types=ENTITIES,
+        )
+        reranker = rerank_policy.resolve(rerank, center_node_uuid)
+        decay_setting = decay_policy.with_half_life(half_life_days) if decay else None
+    except ValueError as e:
+        return ErrorResponse(error=str(e))
+
     try:
         # TEMPORARY PATCH: Ensure group_ids always has a valid value
         # Default to ["global"] if None or empty list
@@ -777,50 +1785,37 @@ async def search_nodes(
         
         effective_group_ids = group_ids
 
-        # Configure the search
-        if center_node_uuid is not None:
-            search_config = NODE_HYBRID_SEARCH_NODE_DISTANCE.model_copy(deep=True)
-        else:
-            search_config = NODE_HYBRID_SEARCH_RRF.model_copy(deep=True)
-        search_config.limit = max_nodes
-
-        filters = SearchFilters()
-        if entity != '':
-            filters.node_labels = [entity]
-
         # We've already checked that graphiti_client is not None above
         assert graphiti_client is not None
 
         # Use cast to help the type checker understand that graphiti_client is not None
         client = cast(Graphiti, graphiti_client)
 
-        # Perform the search using the _search method
-        search_results = await client._search(
-            query=query,
-            config=search_config,
-            group_ids=effective_group_ids,
-            center_node_uuid=center_node_uuid,
-            search_filter=filters,
+        result_stream = (
+            create_result_stream(
+                'search_nodes', 'nodes', lambda node: dict(format_node_result(node, projection)), max_nodes
+            )
+            if stream and not cursor
+            else None
         )
-
-        if not search_results.nodes:
-            return NodeSearchResponse(message='No relevant nodes found', nodes=[])
-
-        # Format the node results
-        formatted_nodes: list[NodeResult] = [
-            {
-                'uuid': node.uuid,
-                'name': node.name,
-                'summary': node.summary if hasattr(node, 'summary') else '',
-                'labels': node.labels if hasattr(node, 'labels') else [],
-                'group_id': node.group_id,
-                'created_at': node.created_at.isoformat(),
-                'attributes': node.attributes if hasattr(node, 'attributes') else {},
-            }
-            for node in search_results.nodes
-        ]
-
-        return NodeSearchResponse(message='Nodes retrieved successfully', nodes=formatted_nodes)
+        response = await perform_node_search(
+            client,
+            query,
+            effective_group_ids,
+            max_nodes,
+            center_node_uuid,
+            cursor=cursor,
+            projection=projection,
+            search_filter=search_filter,
+            reranker=reranker,
+            stream=result_stream,
+            decay=decay_setting,
+            debug_timings=debug_timings,
+        )
+        await finish_result_stream('search_nodes', result_stream)
+        return response
+    except InvalidCursorError as e:
+        return ErrorResponse(error=str(e))
     except Exception as e:
         error_msg = str(e)
         logger.error(f'Error searching nodes: {error_msg}')
@@ -833,20 +1828,82 @@ async def search_facts(
     group_ids: Optional[list[str]] = None,  # Default to ["global"] handled in function body
     max_facts: int = 10,
     center_node_uuid: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[list[str]] = None,
+    compact: bool = False,
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+    valid_after: Optional[str] = None,
+    valid_before: Optional[str] = None,
+    as_of: Optional[str] = None,
+    rerank: Optional[str] = None,
+    decay: bool = False,
+    half_life_days: Optional[float] = None,
+    stream: bool = False,
+    debug_timings: bool = False,
 ) -> Union[FactSearchResponse, ErrorResponse]:
     """Search the Graphiti knowledge graph for relevant facts.
 
+    Results are paged: when more ranked facts are available the response includes a
+    next_cursor; pass it back as cursor to get the next page without searching again. With a
+    cursor, query and filters are ignored.
+
+    Use fields to return only some fact fields (uuid, group_id, source_node_uuid,
+    target_node_uuid, created_at, name, fact, episodes, expired_at, valid_at, invalid_at,
+    attributes). compact=True returns uuid, fact, the endpoint uuids and the validity range
+    (unless fields are given).
+
+    created_after/created_before bound when a fact was recorded and valid_after/valid_before
+    when it became true (ISO 8601); as_of keeps only the facts that were true at that time
+    (e.g. "who owned the service on 2024-06-01"). Bounds are applied inside the graph query.
+
+    rerank picks how candidates are ordered (see search_nodes); the response reports the
+    reranker used and its rerank_ms. cross_encoder makes one model call per candidate fact,
+    up to max_facts calls, and ranks only this page, so its results have no next_cursor.
+
+    decay=True favours recent facts: the ranked candidates are re-scored by blending
+    relevance with an exponential decay of the time since each fact became valid
+    (half_life_days, default from the server) and any importance level, so old facts no
+    longer crowd recent ones out of a small max_facts.
+
+    stream=True sends fulltext, similarity and BFS candidates as soon as each is found (log
+    message notifications with "partial": true, logger graphiti.search_facts) and reports
+    progress, so a client can start on them before the final reranked response arrives.
+
+    debug_timings=True adds the milliseconds spent per stage and in total (see search_nodes).
+
     Args:
         query: The search query
         group_ids: Optional list of group IDs to filter results (defaults to ["global"] if not provided)
-        max_facts: Maximum number of facts to return (default: 10)
+        max_facts: Maximum number of facts to return per page (default: 10)
         center_node_uuid: Optional UUID of a node to center the search around
+        cursor: Optional next_cursor from a previous response
+        fields: Optional fact fields to return (default: all)
+        compact: Return a compact result (default: False)
+        created_after: Optional ISO 8601 timestamp; only facts created at or after it
+        created_before: Optional ISO 8601 timestamp; only facts created before it
+        valid_after: Optional ISO 8601 timestamp; only facts valid from it or later
+        valid_before: Optional ISO 8601 timestamp; only facts valid from before it
+        as_of: Optional ISO 8601 timestamp; only facts valid at that time
+        rerank: Optional reranker (defaults to the server policy)
+        decay: Re-score results by recency and importance (default: False)
+        half_life_days: Optional half-life of the recency decay in days (with decay)
+        stream: Send unranked candidates while searching (default: False)
+        debug_timings: Include per-stage timings in the response (default: False)
     """
     global graphiti_client
 
     if graphiti_client is None:
         return {'error': 'Graphiti client not initialized'}
 
+    try:
+        projection = build_projection('facts', fields, compact, config.compact_text_chars)
+        search_filter = build_edge_filters(created_after, created_before, valid_after, valid_before, as_of)
+        reranker = rerank_policy.resolve(rerank, center_node_uuid)
+        decay_setting = decay_policy.with_half_life(half_life_days) if decay else None
+    except ValueError as e:
+        return {'error': str(e)}
+
     try:
         # TEMPORARY PATCH: Ensure group_ids always has a valid value
         # Default to ["global"] if None or empty list
@@ -863,24 +1920,330 @@ async def search_facts(
         # Use cast to help the type checker understand that graphiti_client is not None
         client = cast(Graphiti, graphiti_client)
 
-        relevant_edges = await client.search(
-            group_ids=effective_group_ids,
-            query=query,
-            num_results=max_facts,
-            center_node_uuid=center_node_uuid,
+        result_stream = (
+            create_result_stream('search_facts', 'facts', lambda edge: format_fact_result(edge, projection), max_facts)
+            if stream and not cursor
+            else None
         )
-
-        if not relevant_edges:
-            return {'message': 'No relevant facts found', 'facts': []}
-
-        facts = [format_fact_result(edge) for edge in relevant_edges]
-        return {'message': 'Facts retrieved successfully', 'facts': facts}
+        response = await perform_fact_search(
+            client,
+            query,
+            effective_group_ids,
+            max_facts,
+            center_node_uuid,
+            cursor,
+            projection=projection,
+            search_filter=search_filter,
+            reranker=reranker,
+            stream=result_stream,
+            decay=decay_setting,
+            debug_timings=debug_timings,
+        )
+        await finish_result_stream('search_facts', result_stream)
+        return response
+    except InvalidCursorError as e:
+        return {'error': str(e)}
     except Exception as e:
         error_msg = str(e)
         logger.error(f'Error searching facts: {error_msg}')
         return {'error': f'Error searching facts: {error_msg}'}
 
 
+@mcp.tool()
+async def search_batch(
+    queries: list[dict[str, Any]],
+    group_ids: Optional[list[str]] = None,  # Default to ["global"] handled in function body
+) -> Union[BatchSearchResponse, ErrorResponse]:
+    """Run several node and/or fact searches in one call, e.g. to load context at session start.
+
+    All queries are embedded in a single embedder call and the searches run concurrently.
+    Each result reports its own elapsed time; a failing query does not fail the batch.
+
+    Each entry of queries is an object with:
+        type: "nodes" or "facts" (default: "facts")
+        query: The search query
+        max_results: Maximum number of results, 1 to 50 (default: 10)
+        group_ids: Optional list of group IDs for this query (defaults to the batch group_ids)
+        center_node_uuid: Optional UUID of a node to center the search around
+        entity, entity_types, attribute_filters: Optional node filters (see search_nodes)
+        created_after, created_before: Optional creation time bounds
+        valid_after, valid_before, as_of: Optional validity bounds and time (fact searches only)
+        rerank: Optional reranker (see search_nodes)
+        decay, half_life_days: Optional recency/importance re-scoring (see search_facts)
+        paged: Rank further pages and return a next_cursor for search_nodes / search_facts
+            (default: False; batch results are usually used as they are)
+        fields: Optional fields to return (see search_nodes / search_facts)
+        compact: Return a compact result (default: False)
+        debug_timings: Include per-stage timings in the result (default: False)
+
+    Args:
+        queries: The searches to run (at most 20)
+        group_ids: Optional list of group IDs used by queries without their own (defaults to ["global"])
+    """
+    global graphiti_client
+
+    if graphiti_client is None:
+        return ErrorResponse(error='Graphiti client not initialized')
+    if not queries:
+        return ErrorResponse(error='At least one query is required')
+    if len(queries) > MAX_BATCH_QUERIES:
+        return ErrorResponse(error=f'At most {MAX_BATCH_QUERIES} queries are allowed per batch')
+
+    if group_ids is None or not group_ids:
+        group_ids = ["global"]
+
+    client = cast(Graphiti, graphiti_client)
+    started = time.perf_counter()
+
+    projections: list[Projection] = []
+    search_filters: list[SearchFilters] = []
+    rerankers: list[str] = []
+    decays: list[Optional[DecayPolicy]] = []
+    limits: list[int] = []
+    for index, spec in enumerate(queries):
+        if not isinstance(spec, dict) or not isinstance(spec.get('query'), str):
+            return ErrorResponse(error=f'Query {index} must be an object with a "query" string')
+        search_type = spec.get('type', 'facts')
+        if search_type not in ('nodes', 'facts'):
+            return ErrorResponse(error=f'Query {index} has an unknown type {spec.get("type")!r} (expected "nodes" or "facts")')
+        try:
+            max_results = spec.get('max_results', 10)
+            if isinstance(max_results, bool) or not isinstance(max_results, int):
+                raise ValueError('max_results must be an integer')
+            if not 1 <= max_results <= MAX_BATCH_RESULTS:
+                raise ValueError(f'max_results must be between 1 and {MAX_BATCH_RESULTS}')
+            limits.append(max_results)
+            query_groups = spec.get('group_ids')
+            if query_groups is not None and (
+                not isinstance(query_groups, list) or not all(isinstance(group, str) for group in query_groups)
+            ):
+                raise ValueError('group_ids must be a list of strings')
+            projections.append(
+                build_projection(search_type, spec.get('fields'), bool(spec.get('compact')), config.compact_text_chars)
+            )
+            rerankers.append(rerank_policy.resolve(spec.get('rerank'), spec.get('center_node_uuid')))
+            decays.append(decay_policy.with_half_life(spec.get('half_life_days')) if spec.get('decay') else None)
+            if search_type == 'nodes':
+                labels = spec.get('entity_types') or []
+                if not isinstance(labels, list):
+                    raise ValueError('entity_types must be a list')
+                search_filters.append(
+                    build_node_filters(
+                        labels=[*labels, *([spec['entity']] if spec.get('entity') else [])],
+                        attribute_filters=spec.get('attribute_filters'),
+                        created_after=spec.get('created_after'),
+                        created_before=spec.get('created_before'),
+                        entity_types=ENTITIES,
+                    )
+                )
+            else:
+                search_filters.append(
+                    build_edge_filters(
+                        spec.get('created_after'),
+                        spec.get('created_before'),
+                        spec.get('valid_after'),
+                        spec.get('valid_before'),
+                        spec.get('as_of'),
+                    )
+                )
+        except ValueError as e:
+            return ErrorResponse(error=f'Query {index}: {e}')
+
+    # One embedder call for all distinct queries; on failure each search embeds its own query
+    vectors: dict[str, list[float]] = {}
+    texts = list(dict.fromkeys(spec['query'] for spec in queries if spec['query'].strip()))
+    if texts and client.embedder is not None:
+        try:
+            embedded = await client.embedder.create_batch([text.replace('\n', ' ') for text in texts])
+            vectors = dict(zip(texts, embedded))
+        except Exception as e:
+            logger.warning(f'Batch query embedding failed, embedding queries individually: {e}')
+    embedding_ms = (time.perf_counter() - started) * 1000
+
+    async def run_query(index: int, spec: dict[str, Any]) -> BatchSearchResult:
+        query_started = time.perf_counter()
+        search_type = spec.get('type', 'facts')
+        entry: BatchSearchResult = {'index': index, 'type': search_type, 'query': spec['query']}
+        try:
+            common = {
+                'client': client,
+                'query': spec['query'],
+                'group_ids': spec.get('group_ids') or group_ids,
+                'center_node_uuid': spec.get('center_node_uuid'),
+                'query_vector': vectors.get(spec['query']),
+                'projection': projections[index],
+                'search_filter': search_filters[index],
+                'reranker': rerankers[index],
+                'decay': decays[index],
+                'paged': bool(spec.get('paged')),
+                'debug_timings': bool(spec.get('debug_timings')),
+            }
+            if search_type == 'nodes':
+                entry['result'] = await perform_node_search(max_nodes=limits[index], **common)
+            else:
+                entry['result'] = await perform_fact_search(max_facts=limits[index], **common)
+        except Exception as e:
+            logger.error(f'Error in batch {search_type} search {index}: {e}')
+            entry['error'] = f'Error searching {search_type}: {e}'
+        entry['elapsed_ms'] = round((time.perf_counter() - query_started) * 1000, 3)
+        return entry
+
+    results = await asyncio.gather(*(run_query(index, spec) for index, spec in enumerate(queries)))
+    return BatchSearchResponse(
+        message=f'Ran {len(results)} searches',
+        results=list(results),
+        embedding_ms=round(embedding_ms, 3),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
+
+
+@mcp.tool()
+async def get_context(
+    query: str,
+    group_ids: Optional[list[str]] = None,  # Default to ["global"] handled in function body
+    max_nodes: int = 10,
+    max_facts: int = 20,
+    max_episodes: int = 5,
+    max_tokens: Optional[int] = None,
+    center_node_uuid: Optional[str] = None,
+    rerank: Optional[str] = None,
+    compact: bool = True,
+) -> Union[ContextResponse, ErrorResponse]:
+    """Get the context for a task in one call: relevant entities, relevant facts and recent episodes.
+
+    Use this instead of separate search_nodes, search_facts and get_episodes calls, e.g. at the
+    start of a task. The query is embedded once and the three retrievals run concurrently.
+    Duplicate entities (same name) and facts (same text) are returned once, and the bundle is
+    packed into max_tokens: every section keeps its best results first, and the response
+    reports how many items were left out per section in dropped.
+
+    Episodes are the most recent ones of the groups, newest first. compact=True (the default)
+    returns the compact fields of each item and shortens summaries and episode content.
+
+    Args:
+        query: What the context is needed for
+        group_ids: Optional list of group IDs (defaults to ["global"] if not provided)
+        max_nodes: Maximum number of entities to retrieve (default: 10)
+        max_facts: Maximum number of facts to retrieve (default: 20)
+        max_episodes: Maximum number of recent episodes to retrieve, 0 for none (default: 5)
+        max_tokens: Optional token budget of the bundle (defaults to the server setting)
+        center_node_uuid: Optional UUID of a node to center the entity and fact searches around
+        rerank: Optional reranker (see search_nodes)
+        compact: Return compact items (default: True)
+    """
+    global graphiti_client
+
+    if graphiti_client is None:
+        return ErrorResponse(error='Graphiti client not initialized')
+
+    budget = max_tokens if max_tokens is not None else config.context_max_tokens
+    if not 1 <= budget <= MAX_CONTEXT_TOKENS:
+        return ErrorResponse(error=f'max_tokens must be between 1 and {MAX_CONTEXT_TOKENS}')
+    if max_nodes < 0 or max_facts < 0 or max_episodes < 0:
+        return ErrorResponse(error='max_nodes, max_facts and max_episodes must not be negative')
+    try:
+        reranker = rerank_policy.resolve(rerank, center_node_uuid)
+        projections = {
+            kind: build_projection(kind, None, compact, config.compact_text_chars)
+            for kind in ('nodes', 'facts', 'episodes')
+        }
+    except ValueError as e:
+        return ErrorResponse(error=str(e))
+
+    if group_ids is None or not group_ids:
+        group_ids = ["global"]
+
+    client = cast(Graphiti, graphiti_client)
+    started = time.perf_counter()
+
+    # Embed the query once for both searches; on failure each search embeds it itself
+    query_vector: Optional[list[float]] = None
+    if query.strip() and client.embedder is not None and (max_nodes or max_facts):
+        try:
+            query_vector = await embed_query(client, query)
+        except Exception as e:
+            logger.warning(f'Context query embedding failed, embedding per search: {e}')
+    embedding_ms = (time.perf_counter() - started) * 1000
+
+    async def retrieve_entities() -> list[dict[str, Any]]:
+        if not max_nodes:
+            return []
+        response = await perform_node_search(
+            client,
+            query,
+            group_ids,
+            max_nodes,
+            center_node_uuid,
+            query_vector=query_vector,
+            projection=projections['nodes'],
+            reranker=reranker,
+            paged=False,
+        )
+        return cast(list[dict[str, Any]], response['nodes'])
+
+    async def retrieve_facts() -> list[dict[str, Any]]:
+        if not max_facts:
+            return []
+        response = await perform_fact_search(
+            client,
+            query,
+            group_ids,
+            max_facts,
+            center_node_uuid,
+            query_vector=query_vector,
+            projection=projections['facts'],
+            reranker=reranker,
+            paged=False,
+        )
+        return response['facts']
+
+    async def retrieve_episodes() -> list[dict[str, Any]]:
+        if not max_episodes:
+            return []
+        pages = await asyncio.gather(
+            *(get_episode_page(client.driver, group_id, max_episodes) for group_id in dict.fromkeys(group_ids))
+        )
+        episodes = sorted(
+            (episode for page, _ in pages for episode in page), key=lambda episode: episode.created_at, reverse=True
+        )
+        return [format_episode_result(episode, projections['episodes']) for episode in episodes[:max_episodes]]
+
+    results = await asyncio.gather(
+        retrieve_entities(), retrieve_facts(), retrieve_episodes(), return_exceptions=True
+    )
+    sections: dict[str, list[dict[str, Any]]] = {}
+    errors: dict[str, str] = {}
+    for name, result in zip(CONTEXT_SECTIONS, results):
+        if isinstance(result, BaseException):
+            logger.error(f'Error retrieving context {name}: {result}')
+            errors[name] = f'Error retrieving {name}: {result}'
+            result = []
+        sections[name] = result
+    if len(errors) == len(CONTEXT_SECTIONS):
+        return ErrorResponse(error='; '.join(errors.values()))
+
+    sections['entities'] = dedupe_results(sections['entities'], 'name')
+    sections['facts'] = dedupe_results(sections['facts'], 'fact')
+
+    model = config.model_name or DEFAULT_LLM_MODEL
+    packed = pack_context(sections, budget, lambda text: context_token_counter.count(text, model))
+
+    response = ContextResponse(
+        message='Context retrieved successfully',
+        entities=cast(list[NodeResult], packed.sections['entities']),
+        facts=packed.sections['facts'],
+        episodes=packed.sections['episodes'],
+        tokens=packed.tokens,
+        max_tokens=budget,
+        dropped=packed.dropped,
+        embedding_ms=round(embedding_ms, 3),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
+    if errors:
+        response['errors'] = errors
+    return response
+
+
 @mcp.tool()
 async def delete_entity_edge(uuid: str) -> Union[SuccessResponse, ErrorResponse]:
     """Delete an entity edge from the Graphiti knowledge graph.
@@ -904,6 +2267,9 @@ async def delete_entity_edge(uuid: str) -> Union[SuccessResponse, ErrorResponse]
         entity_edge = await EntityEdge.get_by_uuid(client.driver, uuid)
         # Delete the edge using its delete method
         await entity_edge.delete(client.driver)
+        await invalidate_search_cache([entity_edge.group_id])
+        if vector_index is not None:
+            vector_index.remove(entity_edge.group_id, 'edges', [uuid])
         return {'message': f'Entity edge with UUID {uuid} deleted successfully'}
     except Exception as e:
         error_msg = str(e)
@@ -934,6 +2300,7 @@ async def delete_episode(uuid: str) -> Union[SuccessResponse, ErrorResponse]:
         episodic_node = await EpisodicNode.get_by_uuid(client.driver, uuid)
         # Delete the node using its delete method
         await episodic_node.delete(client.driver)
+        await invalidate_search_cache([episodic_node.group_id])
         return {'message': f'Episode with UUID {uuid} deleted successfully'}
     except Exception as e:
         error_msg = str(e)
@@ -972,21 +2339,338 @@ async def get_entity_edge(uuid: str) -> Union[dict[str, Any], ErrorResponse]:
         return {'error': f'Error getting entity edge: {error_msg}'}
 
 
+@mcp.tool()
+async def get_nodes_by_uuids(
+    uuids: list[str],
+    fields: Optional[list[str]] = None,
+    compact: bool = False,
+) -> Union[NodeLookupResponse, ErrorResponse]:
+    """Get entities by their UUIDs in one indexed lookup, without searching.
+
+    Nodes are returned in the order of uuids; UUIDs without an entity are listed in
+    missing_uuids. fields and compact select node fields as in search_nodes.
+
+    Args:
+        uuids: UUIDs of the entities to get (at most 100)
+        fields: Optional node fields to return (default: all)
+        compact: Return compact nodes (default: False)
+    """
+    global graphiti_client
+
+    if graphiti_client is None:
+        return ErrorResponse(error='Graphiti client not initialized')
+
+    try:
+        projection = build_projection('nodes', fields, compact, config.compact_text_chars)
+        client = cast(Graphiti, graphiti_client)
+        nodes, missing = await fetch_nodes_by_uuids(client.driver, uuids)
+    except ValueError as e:
+        return ErrorResponse(error=str(e))
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f'Error getting nodes by UUID: {error_msg}')
+        return ErrorResponse(error=f'Error getting nodes by UUID: {error_msg}')
+
+    return NodeLookupResponse(
+        message=f'Found {len(nodes)} of {len(nodes) + len(missing)} nodes',
+        nodes=[format_node_result(node, projection) for node in nodes],
+        missing_uuids=missing,
+    )
+
+
+@mcp.tool()
+async def find_nodes_by_name(
+    names: list[str],
+    group_ids: Optional[list[str]] = None,  # Default to ["global"] handled in function body
+    case_insensitive: bool = False,
+    prefix: bool = False,
+    max_per_name: int = 10,
+    fields: Optional[list[str]] = None,
+    compact: bool = False,
+) -> Union[NameLookupResponse, ErrorResponse]:
+    """Find entities by exact name, without embedding or reranking.
+
+    Use this instead of search_nodes when you know the entity's name, e.g.
+    "Authentication Service". All names are looked up in one indexed query. By default the
+    name must match exactly; case_insensitive=True ignores case and prefix=True matches
+    names starting with the given text. matches maps each name to its entities (shortest
+    names first); names without any entity are listed in unmatched.
+
+    Args:
+        names: Entity names to look up (at most 100)
+        group_ids: Optional list of group IDs to search (defaults to ["global"] if not provided)
+        case_insensitive: Ignore case when comparing names (default: False)
+        prefix: Match names starting with the given text (default: False)
+        max_per_name: Maximum number of entities per name (default: 10)
+        fields: Optional node fields to return (default: all)
+        compact: Return compact nodes (default: False)
+    """
+    global graphiti_client
+
+    if graphiti_client is None:
+        return ErrorResponse(error='Graphiti client not initialized')
+
+    if group_ids is None or not group_ids:
+        group_ids = ["global"]
+
+    try:
+        projection = build_projection('nodes', fields, compact, config.compact_text_chars)
+        client = cast(Graphiti, graphiti_client)
+        matches = await match_nodes_by_name(
+            client.driver,
+            names,
+            group_ids,
+            case_insensitive=case_insensitive,
+            prefix=prefix,
+            limit=max_per_name,
+        )
+    except ValueError as e:
+        return ErrorResponse(error=str(e))
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f'Error finding nodes by name: {error_msg}')
+        return ErrorResponse(error=f'Error finding nodes by name: {error_msg}')
+
+    unmatched = [name for name, nodes in matches.items() if not nodes]
+    return NameLookupResponse(
+        message=f'Matched {len(matches) - len(unmatched)} of {len(matches)} names',
+        matches={
+            name: [format_node_result(node, projection) for node in nodes] for name, nodes in matches.items() if nodes
+        },
+        unmatched=unmatched,
+    )
+
+
+@mcp.tool()
+async def get_facts_between(
+    entity_a: str,
+    entity_b: str,
+    group_ids: Optional[list[str]] = None,  # Default to ["global"] handled in function body
+    relation: Optional[str] = None,
+    as_of: Optional[str] = None,
+    include_historical: bool = False,
+    max_facts: int = 50,
+    fields: Optional[list[str]] = None,
+    compact: bool = False,
+) -> Union[FactsBetweenResponse, ErrorResponse]:
+    """Get the facts connecting two entities, without a semantic search.
+
+    Use this for "what do we know about X and Y together?". Each entity is given by UUID
+    or by name (ignoring case, in group_ids); a name matching several entities uses all of
+    them. Facts in either direction are returned newest first, optionally only those of one
+    relation type (e.g. "WORKS_AT"; "works at" is normalized to that form).
+
+    By default only facts valid now are returned; as_of (ISO 8601) returns the facts valid
+    at that time instead. With include_historical=True the other facts are returned too, in
+    historical. fields and compact select fact fields as in search_facts.
+
+    Args:
+        entity_a: UUID or name of the first entity
+        entity_b: UUID or name of the second entity
+        group_ids: Optional list of group IDs in which names are resolved (defaults to ["global"])
+        relation: Optional relation type the facts must have
+        as_of: Optional ISO 8601 timestamp at which the facts must be valid (default: now)
+        include_historical: Also return facts not valid at that time (default: False)
+        max_facts: Maximum number of facts looked up (default: 50)
+        fields: Optional fact fields to return (default: all)
+        compact: Return compact facts and entities (default: False)
+    """
+    global graphiti_client
+
+    if graphiti_client is None:
+        return ErrorResponse(error='Graphiti client not initialized')
+
+    if group_ids is None or not group_ids:
+        group_ids = ["global"]
+
+    try:
+        fact_projection = build_projection('facts', fields, compact, config.compact_text_chars)
+        node_projection = build_projection('nodes', None, compact, config.compact_text_chars)
+        as_of_time = parse_time(as_of, 'as_of') if as_of else None
+
+        client = cast(Graphiti, graphiti_client)
+        found = await facts_between(
+            client.driver,
+            entity_a,
+            entity_b,
+            group_ids,
+            relation=relation,
+            as_of=as_of_time,
+            include_historical=include_historical,
+            max_facts=max_facts,
+        )
+    except ValueError as e:
+        return ErrorResponse(error=str(e))
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f'Error getting facts between entities: {error_msg}')
+        return ErrorResponse(error=f'Error getting facts between entities: {error_msg}')
+
+    endpoints = ((entity_a, found.source_nodes), (entity_b, found.target_nodes))
+    unresolved = [entity for entity, nodes in endpoints if not nodes]
+    if unresolved:
+        return ErrorResponse(error=f'No entity found for {", ".join(repr(entity) for entity in unresolved)}')
+
+    response = FactsBetweenResponse(
+        message=f'Found {len(found.facts)} facts' if found.facts else 'No facts found between the entities',
+        source_nodes=[format_node_result(node, node_projection) for node in found.source_nodes],
+        target_nodes=[format_node_result(node, node_projection) for node in found.target_nodes],
+        facts=[format_fact_result(edge, fact_projection) for edge in found.facts],
+    )
+    if include_historical:
+        response['historical'] = [format_fact_result(edge, fact_projection) for edge in found.historical]
+    return response
+
+
+@mcp.tool()
+async def get_neighborhood(
+    node_uuids: list[str],
+    depth: int = 1,
+    max_per_node: Union[int, list[int]] = 10,
+    max_nodes: int = 100,
+    as_of: Optional[str] = None,
+    include_invalid: bool = False,
+    fields: Optional[list[str]] = None,
+    compact: bool = False,
+) -> Union[NeighborhoodResponse, ErrorResponse]:
+    """Get the entities and facts within a few hops of known entities, in one graph query.
+
+    Use this instead of repeated searches to explore around entities whose UUIDs you already
+    have (e.g. from search_nodes). Each hop follows at most max_per_node facts of every
+    entity reached (most recently valid first), and the walk stops once max_nodes entities
+    were found. Nodes are returned nearest first, each with its hop (0 for the seeds); facts
+    connect returned nodes and appear once.
+
+    By default only facts valid now are followed; as_of (ISO 8601) follows the facts valid
+    at that time instead, and include_invalid=True follows all facts.
+
+    fields and compact select the node fields as in search_nodes; facts are returned with
+    the compact fact fields when compact=True.
+
+    Args:
+        node_uuids: UUIDs of the entities to start from
+        depth: Number of hops to expand (1-3, default: 1)
+        max_per_node: Facts followed per entity and hop; one number, or one per hop (default: 10)
+        max_nodes: Maximum number of entities returned, seeds included (default: 100)
+        as_of: Optional ISO 8601 timestamp; follow only facts valid at that time
+        include_invalid: Follow facts regardless of validity (default: False)
+        fields: Optional node fields to return (default: all)
+        compact: Return compact nodes and facts (default: False)
+    """
+    global graphiti_client
+
+    if graphiti_client is None:
+        return {'error': 'Graphiti client not initialized'}
+
+    try:
+        node_projection = build_projection('nodes', fields, compact, config.compact_text_chars)
+        fact_projection = build_projection('facts', None, compact, config.compact_text_chars)
+        as_of_time = parse_time(as_of, 'as_of') if as_of else None
+    except ValueError as e:
+        return {'error': str(e)}
+
+    try:
+        # Use cast to help the type checker understand that graphiti_client is not None
+        client = cast(Graphiti, graphiti_client)
+
+        neighborhood = await expand_neighborhood(
+            client.driver,
+            node_uuids,
+            depth=depth,
+            max_per_node=max_per_node,
+            max_nodes=max_nodes,
+            as_of=as_of_time,
+            include_invalid=include_invalid,
+        )
+    except ValueError as e:
+        return {'error': str(e)}
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f'Error getting neighborhood: {error_msg}')
+        return {'error': f'Error getting neighborhood: {error_msg}'}
+
+    if not neighborhood.nodes:
+        return {
+            'message': 'No matching entities found',
+            'nodes': [],
+            'facts': [],
+            'missing_uuids': neighborhood.missing_uuids,
+        }
+
+    return {
+        'message': f'Found {len(neighborhood.nodes)} entities and {len(neighborhood.edges)} facts',
+        'nodes': [
+            {**format_node_result(node, node_projection), 'hop': neighborhood.hops[node.uuid]}
+            for node in neighborhood.nodes
+        ],
+        'facts': [format_fact_result(edge, fact_projection) for edge in neighborhood.edges],
+        'missing_uuids': neighborhood.missing_uuids,
+    }
+
+
 @mcp.tool()
 async def get_episodes(
-    group_id: str = "global", last_n: int = 10
-) -> Union[list[dict[str, Any]], EpisodeSearchResponse, ErrorResponse]:
+    group_id: str = "global",
+    last_n: int = 10,
+    cursor: Optional[str] = None,
+    fields: Optional[list[str]] = None,
+    compact: bool = False,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    sources: Optional[list[str]] = None,
+    source_descriptions: Optional[list[str]] = None,
+    include_content: bool = True,
+) -> Union[EpisodeSearchResponse, ErrorResponse]:
     """Get the most recent episodes for a specific group.
 
+    Each page is in chronological order. When older episodes exist the response includes a
+    next_cursor; pass it back as cursor (with the same filters) to get the preceding page.
+
+    start/end (ISO 8601) restrict the episodes to those created in [start, end), e.g. to
+    audit one day's ingestion page by page. sources keeps only episodes of the given source
+    types (message, json, text) and source_descriptions those with one of the given source
+    descriptions.
+
+    Use fields to return only some episode fields (uuid, name, group_id, labels, created_at,
+    source, source_description, content, valid_at, entity_edges). compact=True returns uuid,
+    name, created_at and content (unless fields are given) and shortens long content.
+    include_content=False leaves the episode bodies out for lightweight listings.
+
     Args:
         group_id: ID of the group to retrieve episodes from. Defaults to "global".
-        last_n: Number of most recent episodes to retrieve (default: 10)
+        last_n: Number of most recent episodes to retrieve per page (default: 10)
+        cursor: Optional next_cursor from a previous response
+        fields: Optional episode fields to return (default: all)
+        compact: Return compact episodes with truncated content (default: False)
+        start: Optional ISO 8601 timestamp; only episodes created at or after it
+        end: Optional ISO 8601 timestamp; only episodes created before it
+        sources: Optional source types to keep (message, json, text)
+        source_descriptions: Optional source descriptions to keep
+        include_content: Return the episode content (default: True)
     """
     global graphiti_client
 
     if graphiti_client is None:
         return {'error': 'Graphiti client not initialized'}
 
+    try:
+        projection = build_projection('episodes', fields, compact, config.compact_text_chars)
+        if not include_content:
+            projection = Projection(
+                fields=(projection.fields or frozenset(EPISODE_FIELDS)) - {'content'},
+                text_limit=projection.text_limit,
+            )
+        start_time = parse_time(start, 'start') if start else None
+        end_time = parse_time(end, 'end') if end else None
+        if start_time is not None and end_time is not None and start_time >= end_time:
+            raise ValueError('start must be before end')
+        source_types = [episode_type.value for episode_type in EpisodeType]
+        unknown_sources = sorted(set(sources or []) - set(source_types))
+        if unknown_sources:
+            raise ValueError(f'Unknown episode sources {unknown_sources}; available sources: {", ".join(source_types)}')
+    except ValueError as e:
+        return {'error': str(e)}
+
     try:
         # Use the provided group_id (defaults to "global")
         effective_group_id = group_id
@@ -1000,22 +2684,32 @@ async def get_episodes(
         # Use cast to help the type checker understand that graphiti_client is not None
         client = cast(Graphiti, graphiti_client)
 
-        episodes = await client.retrieve_episodes(
-            group_ids=[effective_group_id], last_n=last_n, reference_time=datetime.now(timezone.utc)
+        # Keyset pagination on (created_at, uuid), newest first
+        episodes, next_cursor = await get_episode_page(
+            client.driver,
+            effective_group_id,
+            last_n,
+            cursor,
+            start=start_time,
+            end=end_time,
+            sources=sources,
+            source_descriptions=source_descriptions,
+            include_content=projection.includes('content'),
         )
 
         if not episodes:
-            return {'message': f'No episodes found for group {effective_group_id}', 'episodes': []}
+            return {'message': f'No episodes found for group {effective_group_id}', 'episodes': [], 'next_cursor': None}
 
-        # Use Pydantic's model_dump method for EpisodicNode serialization
-        formatted_episodes = [
-            # Use mode='json' to handle datetime serialization
-            episode.model_dump(mode='json')
-            for episode in episodes
-        ]
+        # Serialize only the projected fields of each episode
+        formatted_episodes = [format_episode_result(episode, projection) for episode in reversed(episodes)]
 
-        # Return the Python list directly - MCP will handle serialization
-        return formatted_episodes
+        return {
+            'message': 'Episodes retrieved successfully',
+            'episodes': formatted_episodes,
+            'next_cursor': next_cursor,
+        }
+    except InvalidCursorError as e:
+        return {'error': str(e)}
     except Exception as e:
         error_msg = str(e)
         logger.error(f'Error getting episodes: {error_msg}')
@@ -1088,6 +2782,10 @@ async def clear_graph(auth: str = None) -> Union[SuccessResponse, ErrorResponse]
         # clear_data is already imported at the top
         await clear_data(client.driver)
         await client.build_indices_and_constraints()
+        await build_extra_indexes(client)
+        await invalidate_search_cache()
+        if vector_index is not None:
+            vector_index.clear()
         
         # Generate a new code after successful operation for future security
         graph_clear_auth_code = str(uuid.uuid4())[:8]
@@ -1126,15 +2824,121 @@ async def get_status() -> StatusResponse:
         }
 
 
-def create_llm_client(api_key: Optional[str] = None, model: Optional[str] = None) -> LLMClient:
-    """Create an OpenAI LLM client with support for extra_body parameters.
+@mcp.tool()
+async def get_llm_stats(reset: bool = False) -> dict[str, Any]:
+    """Get per-prompt LLM statistics: call counts, latency, tokens, estimated cost, retries and errors.
+
+    Also reports shared HTTP pool and token budget (clamped/truncated prompts) counters.
+
+    Prompts are keyed by graphiti-core prompt type (e.g. extract_nodes, dedupe_edges,
+    summarize_nodes) and the model that served them, sorted by total latency.
+
+    Args:
+        reset: If true, clear the statistics after returning them
+    """
+    stats = llm_stats.snapshot()
+    pool = get_http_pool()
+    if pool is not None:
+        stats['http_pool'] = pool.stats()
+    if prompt_budget is not None:
+        stats['token_budget'] = prompt_budget.stats()
+    if reset:
+        llm_stats.reset()
+    return stats
+
+
+@mcp.tool()
+async def get_embedding_stats(reset: bool = False) -> dict[str, Any]:
+    """Get embedding statistics: cache hits/misses and how requests were batched into provider calls.
+
+    Args:
+        reset: If true, reset the counters after returning them
+    """
+    stats: dict[str, Any] = {
+        'embedding_cache': embedding_cache.stats() if embedding_cache is not None else None,
+        'batcher': embedding_batcher.stats() if embedding_batcher is not None else None,
+    }
+    if reset:
+        if embedding_cache is not None:
+            embedding_cache.reset_stats()
+        if embedding_batcher is not None:
+            embedding_batcher.reset_stats()
+    return stats
+
+
+@mcp.tool()
+async def get_search_stats(reset: bool = False) -> dict[str, Any]:
+    """Get search statistics: result cache hits/misses, stores and per-group invalidations,
+    ranked snapshots kept for cursor pagination, rerank latency per reranker with the rerank
+    policy, the decay scoring policy, the in-process vector index (groups, memory, searches served and Neo4j
+    fallbacks), the time to first result and total time of streamed searches, and the time
+    spent per search stage by tool and group with the most recent slow searches.
+
+    Args:
+        reset: If true, reset the counters after returning them
+    """
+    stats: dict[str, Any] = {
+        'result_cache': search_cache.stats() if search_cache is not None else None,
+        'pagination': ranked_results.stats(),
+        'rerank': {**rerank_stats.stats(), 'policy': rerank_policy.describe()},
+        'decay': decay_policy.describe(),
+        'vector_index': vector_index.stats() if vector_index is not None else None,
+        'streaming': search_stream_stats.stats(),
+        'stages': search_latency.stats(),
+    }
+    if reset:
+        if search_cache is not None:
+            search_cache.reset_stats()
+        ranked_results.reset_stats()
+        rerank_stats.reset_stats()
+        if vector_index is not None:
+            vector_index.reset_stats()
+        search_stream_stats.reset_stats()
+        search_latency.reset_stats()
+    return stats
+
+
+@mcp.resource('http://graphiti/metrics', mime_type='text/plain')
+async def get_metrics() -> str:
+    """Get server metrics in Prometheus text exposition format."""
+    sections = [llm_stats.prometheus_lines()]
+    if http_pool is not None:
+        sections.append(http_pool.prometheus_lines())
+    if embedding_cache is not None:
+        sections.append(embedding_cache.prometheus_lines())
+    if embedding_batcher is not None:
+        sections.append(embedding_batcher.prometheus_lines())
+    if search_cache is not None:
+        sections.append(search_cache.prometheus_lines())
+    sections.append(rerank_stats.prometheus_lines())
+    if vector_index is not None:
+        sections.append(vector_index.prometheus_lines())
+    sections.append(search_stream_stats.prometheus_lines())
+    sections.append(search_latency.prometheus_lines())
+    return join_exposition(sections)
+
+
+def create_stub_llm_client() -> LLMClient:
+    """Create the deterministic stub LLM client configured by STUB_LLM_LATENCY/STUB_SEED."""
+    return StubLLMClient(latency=LatencyModel.parse(config.stub_llm_latency, seed=config.stub_seed))
+
+
+def create_llm_client(
+    api_key: Optional[str] = None,
+    model: Optional[str] = None,
+    small_model: Optional[str] = None,
+    model_overrides: Optional[dict[str, str]] = None,
+) -> LLMClient:
+    """Create an OpenAI LLM client with support for extra_body parameters and model tiering.
 
     Args:
         api_key: API key for the OpenAI service
-        model: Model name to use
+        model: Model name to use (large tier, used for extraction prompts)
+        small_model: Model name for calls graphiti-core tags as small (dedupe, attributes, ...)
+        model_overrides: Per-prompt-type model overrides (values may be 'small'/'large' or a model name)
 
     Returns:
-        An instance of the OpenAI LLM client (custom OpenRouterClient if extra_body needed)
+        An instance of the OpenAI LLM client (custom OpenRouterClient if extra_body or overrides needed)
     """
     # Create config with provided API key and model
     llm_config = LLMConfig(api_key=api_key)
@@ -1142,6 +2946,14 @@ def create_llm_client(api_key: Optional[str] = None, model: Optional[str] = None
     # Set model if provided
     if model:
         llm_config.model = model
+    if small_model:
+        llm_config.small_model = small_model
+        logger.info(f"Routing small LLM calls to model: {small_model}")
+    if model_overrides:
+        logger.info(f"Per-prompt LLM model overrides: {model_overrides}")
+
+    # All clients below share one tuned HTTP pool with the embedder (None if the pool is disabled)
+    sdk_client = create_openai_sdk_client(api_key, config.openai_base_url)
     
     # Check for OpenRouter provider configuration first
     openrouter_provider = os.environ.get('OPENROUTER_PROVIDER')
@@ -1180,23 +2992,35 @@ def create_llm_client(api_key: Optional[str] = None, model: Optional[str] = None
         if provider_config:
             base_client = "OpenAIGenericClient" if HAS_OPENAI_GENERIC_CLIENT else "OpenAIClient"
             logger.info(f"Using custom OpenRouterClient (based on {base_client}) with provider routing support")
-            return OpenRouterClient(config=llm_config, provider=provider_config)
+            return OpenRouterClient(
+                config=llm_config, client=sdk_client, provider=provider_config, model_overrides=model_overrides
+            )
+
+        # OpenAIGenericClient ignores model_size, so use OpenRouterClient whenever tiering is configured
+        if small_model or model_overrides:
+            logger.info("Using custom OpenRouterClient for small/large model tiering")
+            return OpenRouterClient(config=llm_config, client=sdk_client, model_overrides=model_overrides)
         
         # Try OpenAIGenericClient first if available
         if HAS_OPENAI_GENERIC_CLIENT:
             logger.info("Using OpenAIGenericClient for OpenRouter compatibility")
-            return OpenAIGenericClient(config=llm_config)
+            return OpenAIGenericClient(config=llm_config, client=sdk_client)
         else:
             logger.info("Using standard OpenAIClient for OpenRouter")
-            return OpenAIClient(config=llm_config)
+            return OpenAIClient(config=llm_config, client=sdk_client)
     
     # Set base URL for any other custom endpoint
     if base_url:
         llm_config.base_url = base_url
         logger.info(f"Using custom API endpoint: {base_url}")
 
+    # OpenAIClient honors small_model natively; per-prompt overrides need the custom client
+    if model_overrides:
+        logger.info("Using custom OpenRouterClient for per-prompt model overrides")
+        return OpenRouterClient(config=llm_config, client=sdk_client, model_overrides=model_overrides)
+
     # Create and return the standard client
-    return OpenAIClient(config=llm_config)
+    return OpenAIClient(config=llm_config, client=sdk_client)
 
 
 async def initialize_server() -> MCPConfig:
@@ -1219,6 +3043,10 @@ async def initialize_server() -> MCPConfig:
     )
     # OpenAI is the only supported LLM client
     parser.add_argument('--model', help='Model name to use with the LLM client')
+    parser.add_argument(
+        '--small-model',
+        help='Cheaper/faster model for prompts graphiti-core tags as small (overrides SMALL_MODEL_NAME)',
+    )
     parser.add_argument('--destroy-graph', action='store_true', help='Destroy all Graphiti graphs')
     parser.add_argument(
         '--use-custom-entities',
@@ -1255,6 +3083,17 @@ async def initialize_server() -> MCPConfig:
         help='Set to "false" to prevent loading entities from the root /app/entities directory.'
     )
     # --- End NEW ---
+    parser.add_argument(
+        '--reembed-groups',
+        help='Re-embed entity names and facts of the given comma-separated group IDs ("all" for every group) '
+        'with the current embedding profile, then exit instead of serving',
+    )
+    parser.add_argument(
+        '--reembed-batch-size',
+        type=int,
+        default=200,
+        help='Elements embedded and written per batch by --reembed-groups (default: 200)',
+    )
 
     args = parser.parse_args()
 
@@ -1337,35 +3176,90 @@ async def initialize_server() -> MCPConfig:
 
     llm_client = None
 
-    # Create OpenAI client if model is specified or if OPENAI_API_KEY is available
-    if args.model or config.openai_api_key:
+    # Use the stub LLM for offline benchmarking, otherwise create OpenAI client if model
+    # is specified or if OPENAI_API_KEY is available
+    if config.stub_llm:
+        llm_client = create_stub_llm_client()
+    elif args.model or config.openai_api_key:
         # Override model from command line if specified
 
         config.model_name = args.model or config.model_name or DEFAULT_LLM_MODEL
+        config.small_model_name = args.small_model or config.small_model_name
 
         # Create the OpenAI client
-        llm_client = create_llm_client(api_key=config.openai_api_key, model=config.model_name)
+        llm_client = create_llm_client(
+            api_key=config.openai_api_key,
+            model=config.model_name,
+            small_model=config.small_model_name,
+            model_overrides=config.llm_model_overrides,
+        )
 
     # Initialize Graphiti with the specified LLM client
     await initialize_graphiti(llm_client, destroy_graph=args.destroy_graph)
 
+    if args.reembed_groups:
+        await reembed_existing_groups(args.reembed_groups, args.reembed_batch_size)
+        return MCPConfig(transport=args.transport, serve=False)
+
     return MCPConfig(transport=args.transport)
 
 
+async def reembed_existing_groups(group_spec: str, batch_size: int) -> None:
+    """Bring stored embeddings of existing groups to the current embedding dimension.
+
+    Args:
+        group_spec: Comma-separated group IDs, or "all" for every group in the graph
+        batch_size: Elements embedded and written per round trip
+    """
+    client = cast(Graphiti, graphiti_client)
+    group_ids = None if group_spec.strip().lower() == 'all' else [
+        group_id.strip() for group_id in group_spec.split(',') if group_id.strip()
+    ]
+    dimension = config.embedding_profile.dimensions or EMBEDDING_DIM
+    logger.info(f'Re-embedding groups {group_ids or "(all)"} to {dimension} dimensions')
+    results = await reembed_groups(client.driver, client.embedder, group_ids, dimension, batch_size=batch_size)
+    for group_id, counts in results.items():
+        logger.info(f"Re-embedded group '{group_id}': {counts}")
+
+
 async def run_mcp_server():
     """Run the MCP server in the current event loop."""
-    # Initialize the server
-    mcp_config = await initialize_server()
-
-    # Run the server with stdio transport for MCP in the same event loop
-    logger.info(f'Starting MCP server with transport: {mcp_config.transport}')
-    if mcp_config.transport == 'stdio':
-        await mcp.run_stdio_async()
-    elif mcp_config.transport == 'sse':
-        logger.info(
-            f'Running MCP server with SSE transport on {mcp.settings.host}:{mcp.settings.port}'
-        )
-        await mcp.run_sse_async()
+    try:
+        # Initialize the server
+        mcp_config = await initialize_server()
+        if not mcp_config.serve:
+            return
+
+        # Run the server with stdio transport for MCP in the same event loop
+        logger.info(f'Starting MCP server with transport: {mcp_config.transport}')
+        if mcp_config.transport == 'stdio':
+            await mcp.run_stdio_async()
+        elif mcp_config.transport == 'sse':
+            logger.info(
+                f'Running MCP server with SSE transport on {mcp.settings.host}:{mcp.settings.port}'
+            )
+            await mcp.run_sse_async()
+    finally:
+        await close_connections()
+
+
+async def close_connections() -> None:
+    """Close the graph driver, the shared HTTP pool and the search cache's Redis client."""
+    global graphiti_client, http_pool
+    closers: list[tuple[str, Any]] = []
+    if graphiti_client is not None:
+        closers.append(('Neo4j driver', graphiti_client.close))
+    if search_cache is not None:
+        closers.append(('search cache', search_cache.close))
+    if http_pool is not None:
+        closers.append(('HTTP pool', http_pool.aclose))
+    for name, close in closers:
+        try:
+            await close()
+        except Exception as e:
+            logger.warning(f'Error closing the {name}: {e}')
+    graphiti_client = None
+    http_pool = None
 
 
 def main():
@@ -0,0 +1,4 @@
+"""MCP server support package.
+
+Helper modules used by graphiti_mcp_server.py (LLM client routing and related plumbing).
+"""
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Deduplication and token-budgeted packing of get_context bundles.
+
+A context bundle combines the entities, facts and recent episodes retrieved for one query.
+Graphiti often holds several entity nodes for the same name and several edges stating the
+same fact, so duplicates are dropped first (keeping the best-ranked copy). The remaining
+items are then packed round-robin by rank, so every section keeps its best results when the
+token budget is tight, and an item that does not fit is skipped in favour of smaller ones.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+CONTEXT_SECTIONS = ('entities', 'facts', 'episodes')
+
+
+@dataclass
+class PackedContext:
+    """The items kept per section, their token count and the number of items left out per section."""
+
+    sections: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    tokens: int = 0
+    dropped: Dict[str, int] = field(default_factory=dict)
+
+
+def _normalized(text: Any) -> str:
+    return ' '.join(str(text).split()).casefold()
+
+
+def dedupe_results(items: List[Dict[str, Any]], text_key: str) -> List[Dict[str, Any]]:
+    """Drop repeated items by uuid and by normalized text (e.g. the entity name), keeping the first.
+
+    Items without the text field are compared by uuid only.
+    """
+    seen_uuids = set()
+    seen_texts = set()
+    unique = []
+    for item in items:
+        uuid = item.get('uuid')
+        text = _normalized(item[text_key]) if item.get(text_key) else None
+        if (uuid is not None and uuid in seen_uuids) or (text is not None and text in seen_texts):
+            continue
+        if uuid is not None:
+            seen_uuids.add(uuid)
+        if text is not None:
+            seen_texts.add(text)
+        unique.append(item)
+    return unique
+
+
+def item_tokens(item: Dict[str, Any], count: Callable[[str], int]) -> int:
+    """Return the tokens of an item as it appears in the JSON response."""
+    return count(json.dumps(item, ensure_ascii=False, separators=(',', ':')))
+
+
+def pack_context(
+    sections: Dict[str, List[Dict[str, Any]]],
+    max_tokens: int,
+    count: Callable[[str], int],
+) -> PackedContext:
+    """Fill the token budget with the best-ranked items of every section.
+
+    Sections take turns: the first item of each section, then the second, and so on. An item
+    that would exceed the budget is dropped, while later (smaller) items may still fit.
+
+    Args:
+        sections: Ranked items per section name
+        max_tokens: Token budget of all items together
+        count: Token counter for a text
+    """
+    packed = PackedContext(
+        sections={name: [] for name in sections},
+        dropped={name: 0 for name in sections},
+    )
+    longest = max((len(items) for items in sections.values()), default=0)
+    for rank in range(longest):
+        for name, items in sections.items():
+            if rank >= len(items):
+                continue
+            tokens = item_tokens(items[rank], count)
+            if packed.tokens + tokens > max_tokens:
+                packed.dropped[name] += 1
+                continue
+            packed.sections[name].append(items[rank])
+            packed.tokens += tokens
+    return packed
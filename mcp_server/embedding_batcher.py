@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Cross-request micro-batching for embedding calls made by the Graphiti MCP server.
+
+Concurrent episodes and searches each embed one or a few strings, and each of those calls is a
+separate HTTP request. EmbeddingBatcher queues the texts of all callers for at most a few
+milliseconds (or until a batch is full), sends them as one ``create_batch`` call and fans the
+vectors back out to the waiting callers. A batch the provider rejects (e.g. because of one
+empty or oversized input) is retried text by text, so only the callers of the failing texts
+get the error.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from graphiti_core.embedder.client import EmbedderClient
+
+from mcp_server.metrics import Histogram, format_labels, prometheus_header, prometheus_histogram_lines
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+
+
+class EmbeddingBatcher(EmbedderClient):
+    """EmbedderClient wrapper that coalesces concurrent embedding requests into batches."""
+
+    def __init__(self, inner: EmbedderClient, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        """Wrap an embedder.
+
+        Args:
+            inner: The embedder doing the actual work (must implement create_batch)
+            max_batch_size: Inputs per provider call; a full batch is sent immediately
+            max_wait_ms: Longest time a request waits for other requests to join its batch
+        """
+        self.inner = inner
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.inputs = 0
+        self.provider_calls = 0
+        self.split_batches = 0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait = Histogram()
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped embedder's config/client for code that inspects them
+        if name == 'inner':
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def _submit(self, texts: List[str]) -> List[asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        now = time.perf_counter()
+        futures = [loop.create_future() for _ in texts]
+        self._pending.extend((text, future, now) for text, future in zip(texts, futures))
+        self.requests += 1
+        self.inputs += len(texts)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return futures
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.max_batch_size):
+            task = asyncio.ensure_future(self._run_batch(pending[start:start + self.max_batch_size]))
+            # Keep a reference so the task is not garbage collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        now = time.perf_counter()
+        for _, _, queued_at in batch:
+            self.queue_wait.observe((now - queued_at) * 1000)
+        # Identical texts from different callers are embedded once
+        unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+        # Raised into the callers left waiting if the batch ends without results (e.g. cancelled)
+        error: Exception = RuntimeError('Embedding batch ended without a result')
+        try:
+            results: Dict[str, Any]
+            try:
+                results = await self._embed(unique_texts)
+            except Exception as e:
+                if len(unique_texts) == 1:
+                    raise
+                # The texts come from unrelated callers; one bad input must not fail the others
+                logger.warning(f'Embedding batch of {len(unique_texts)} texts failed, retrying each text: {e}')
+                self.split_batches += 1
+                embedded = await asyncio.gather(*(self._embed([text]) for text in unique_texts), return_exceptions=True)
+                results = {}
+                for text, result in zip(unique_texts, embedded):
+                    results[text] = result[text] if isinstance(result, dict) else result
+            for text, future, _ in batch:
+                if future.done():
+                    continue
+                result = results[text]
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                elif isinstance(result, BaseException):
+                    future.set_exception(RuntimeError(f'Embedding request ended with {result!r}'))
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            error = e
+        finally:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _embed(self, texts: List[str]) -> Dict[str, List[float]]:
+        """Embed distinct texts in one provider call and return the vector of each text."""
+        self.provider_calls += 1
+        self.batch_sizes.observe(len(texts))
+        vectors = await self.inner.create_batch(texts)
+        if len(vectors) != len(texts):
+            raise ValueError(f'Embedder returned {len(vectors)} vectors for {len(texts)} texts')
+        return dict(zip(texts, vectors))
+
+    async def create(
+        self, input_data: str | list[str] | Iterable[int] | Iterable[Iterable[int]]
+    ) -> list[float]:
+        if isinstance(input_data, str):
+            text = input_data
+        elif isinstance(input_data, list) and len(input_data) == 1 and isinstance(input_data[0], str):
+            text = input_data[0]
+        else:
+            # Token inputs and multi-string inputs keep their own request
+            return await self.inner.create(input_data=input_data)
+        (future,) = self._submit([text])
+        return await future
+
+    async def create_batch(self, input_data_list: list[str]) -> list[list[float]]:
+        if not input_data_list:
+            return []
+        if len(input_data_list) >= self.max_batch_size:
+            # Already a full batch on its own; waiting would only add latency
+            self.requests += 1
+            self.inputs += len(input_data_list)
+            self.provider_calls += 1
+            self.batch_sizes.observe(len(input_data_list))
+            return await self.inner.create_batch(input_data_list)
+        return list(await asyncio.gather(*self._submit(list(input_data_list))))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the batcher."""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'requests': self.requests,
+            'inputs': self.inputs,
+            'provider_calls': self.provider_calls,
+            'split_batches': self.split_batches,
+            'requests_per_provider_call': round(self.requests / self.provider_calls, 2) if self.provider_calls else None,
+            'batch_size': self.batch_sizes.snapshot(),
+            'queue_wait': self.queue_wait.snapshot(),
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the counters and histograms."""
+        self.requests = 0
+        self.inputs = 0
+        self.provider_calls = 0
+        self.split_batches = 0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait = Histogram()
+
+    def prometheus_lines(self) -> List[str]:
+        """Render the batcher statistics in Prometheus text exposition format."""
+        lines: List[str] = []
+        for name, help_text, value in (
+            ('graphiti_embedding_requests_total', 'Embedding requests from callers', self.requests),
+            ('graphiti_embedding_provider_calls_total', 'Batched embedding calls sent to the provider', self.provider_calls),
+            ('graphiti_embedding_split_batches_total', 'Failed batches retried text by text', self.split_batches),
+        ):
+            lines.extend(prometheus_header(name, 'counter', help_text))
+            lines.append(f'{name}{format_labels({})} {value}')
+        lines.extend(prometheus_header('graphiti_embedding_batch_size', 'histogram', 'Inputs per provider call'))
+        lines.extend(prometheus_histogram_lines('graphiti_embedding_batch_size', {}, self.batch_sizes))
+        lines.extend(prometheus_header('graphiti_embedding_queue_wait_ms', 'histogram', 'Time requests wait for their batch'))
+        lines.extend(prometheus_histogram_lines('graphiti_embedding_queue_wait_ms', {}, self.queue_wait))
+        return lines
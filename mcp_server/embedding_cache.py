@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Content-addressed embedding cache for the Graphiti MCP server.
+
+Entity names, edge facts and search queries repeat constantly, and graphiti-core embeds each
+of them over the network every time. CachingEmbedder wraps any EmbedderClient and keys
+vectors on (model, dimension, normalized text hash). Lookups go to an in-process LRU first,
+then to an optional memory-mapped store on disk, so vectors survive restarts and are read
+straight from the page cache without parsing. The disk store keeps float32, float16 or int8
+vectors (see EmbeddingProfile.cache_dtype).
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from graphiti_core.embedder.client import EmbedderClient
+
+from mcp_server.metrics import format_labels, prometheus_header
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+KEY_BYTES = 32  # sha256 digest
+DTYPES = {'float32': np.float32, 'float16': np.float16, 'int8': np.int8}
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text before hashing and embedding (NFC, collapsed whitespace, stripped)."""
+    return _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def cache_key(model: str, dim: int, text: str) -> bytes:
+    """Return the content address of a text's embedding for a model and dimension."""
+    return hashlib.sha256(f'{model}\x1f{dim}\x1f{text}'.encode('utf-8')).digest()
+
+
+class DiskVectorStore:
+    """Append-only store of vectors in a memory-mapped file.
+
+    Two files per (model, dimension, dtype): ``<name>.<dtype>`` holds the vectors as a
+    row-major matrix, ``<name>.<dtype>.keys`` holds the 32-byte content keys in row order. A
+    vector is written before its key, so a crash never leaves a key pointing at an unwritten
+    row. The store is meant for a single server process.
+
+    int8 rows are scaled so their largest component is 127 and read back with that component
+    at 1.0: the direction (and so every cosine similarity) is kept, the magnitude is not.
+    """
+
+    def __init__(
+        self, directory: str, name: str, dim: int, max_entries: int = 1_000_000, dtype: str = 'float32'
+    ):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported embedding cache dtype '{dtype}' (expected one of {list(DTYPES)})")
+        self.dim = dim
+        self.max_entries = max_entries
+        self.dtype = dtype
+        self._np_dtype = DTYPES[dtype]
+        self._itemsize = np.dtype(self._np_dtype).itemsize
+        base = Path(directory)
+        base.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+        self.vectors_path = base / f'{slug}-{dim}.{dtype}'
+        self.keys_path = base / f'{slug}-{dim}.{dtype}.keys'
+        self._lock = threading.Lock()
+        self._rows: Dict[bytes, int] = {}
+        self._full_warned = False
+
+        if self.keys_path.exists():
+            raw = self.keys_path.read_bytes()
+            usable = len(raw) - len(raw) % KEY_BYTES
+            for row in range(usable // KEY_BYTES):
+                self._rows[raw[row * KEY_BYTES:(row + 1) * KEY_BYTES]] = row
+        self._count = len(self._rows)
+        self._keys_file = open(self.keys_path, 'ab')
+
+        existing_rows = (
+            self.vectors_path.stat().st_size // (dim * self._itemsize) if self.vectors_path.exists() else 0
+        )
+        self._capacity = 0
+        self._matrix: Optional[np.memmap] = None
+        self._ensure_capacity(max(existing_rows, self._count, 1024))
+        logger.info(f'Embedding disk cache opened at {self.vectors_path} ({self._count} vectors)')
+
+    def _ensure_capacity(self, rows: int) -> None:
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, self._capacity * 2)
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(capacity * self.dim * self._itemsize)
+        self._matrix = np.memmap(self.vectors_path, dtype=self._np_dtype, mode='r+', shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Return the stored vector, or None.
+
+        float32/float16 rows are views into the mapped file (no copy); int8 rows are dequantized.
+        """
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        if self.dtype == 'int8':
+            return self._matrix[row].astype(np.float32) / 127.0
+        return self._matrix[row]
+
+    def put(self, key: bytes, vector: List[float]) -> None:
+        """Append a vector (ignored if the key is already stored or the store is full)."""
+        with self._lock:
+            if key in self._rows:
+                return
+            if self._count >= self.max_entries:
+                if not self._full_warned:
+                    logger.warning(f'Embedding disk cache is full ({self.max_entries} vectors); new vectors stay in memory only')
+                    self._full_warned = True
+                return
+            self._ensure_capacity(self._count + 1)
+            if self.dtype == 'int8':
+                values = np.asarray(vector, dtype=np.float32)
+                scale = float(np.abs(values).max()) or 1.0
+                self._matrix[self._count] = np.round(values / scale * 127.0)
+            else:
+                self._matrix[self._count] = vector
+            self._keys_file.write(key)
+            self._keys_file.flush()
+            self._rows[key] = self._count
+            self._count += 1
+
+    def close(self) -> None:
+        """Flush the mapped vectors and close the key log."""
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._keys_file.close()
+
+
+class CachingEmbedder(EmbedderClient):
+    """EmbedderClient wrapper serving repeated texts from an LRU and an optional disk store."""
+
+    def __init__(
+        self,
+        inner: EmbedderClient,
+        model: str,
+        embedding_dim: int,
+        max_entries: int = 50_000,
+        disk_dir: Optional[str] = None,
+        disk_dtype: str = 'float32',
+    ):
+        """Wrap an embedder.
+
+        Args:
+            inner: The embedder doing the actual work
+            model: Embedding model name (part of the cache key)
+            embedding_dim: Dimension of the returned vectors (part of the cache key)
+            max_entries: Capacity of the in-process LRU
+            disk_dir: Directory for the memory-mapped store (memory-only cache if omitted)
+            disk_dtype: Precision of the disk store ('float32', 'float16' or 'int8')
+        """
+        self.inner = inner
+        self.model = model
+        self.embedding_dim = embedding_dim
+        self.max_entries = max_entries
+        self._lru: 'OrderedDict[bytes, List[float]]' = OrderedDict()
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self.disk = DiskVectorStore(disk_dir, model, embedding_dim, dtype=disk_dtype) if disk_dir else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped embedder's config/client for code that inspects them
+        if name == 'inner':
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def _lookup(self, key: bytes) -> Optional[List[float]]:
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+        if self.disk is not None:
+            stored = self.disk.get(key)
+            if stored is not None:
+                # graphiti-core and the Neo4j driver need plain lists
+                vector = stored.tolist()
+                self._remember(key, vector)
+                self.disk_hits += 1
+                return vector
+        return None
+
+    def _remember(self, key: bytes, vector: List[float]) -> None:
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _store(self, key: bytes, vector: List[float]) -> None:
+        self._remember(key, vector)
+        if self.disk is not None:
+            self.disk.put(key, vector)
+
+    async def _embed_missing(self, keyed_texts: Dict[bytes, str]) -> Dict[bytes, List[float]]:
+        """Embed texts not in any cache level, sharing in-flight requests for the same key."""
+        results: Dict[bytes, List[float]] = {}
+        waiting: Dict[bytes, asyncio.Future] = {}
+        to_embed: Dict[bytes, str] = {}
+        for key, text in keyed_texts.items():
+            if key in self._inflight:
+                waiting[key] = self._inflight[key]
+            else:
+                to_embed[key] = text
+
+        if to_embed:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in to_embed}
+            self._inflight.update(futures)
+            self.misses += len(to_embed)
+            try:
+                texts = list(to_embed.values())
+                if len(texts) == 1:
+                    vectors = [await self.inner.create(input_data=texts)]
+                else:
+                    vectors = await self.inner.create_batch(texts)
+                for key, vector in zip(to_embed, vectors):
+                    vector = list(vector)
+                    self._store(key, vector)
+                    results[key] = vector
+                    futures[key].set_result(vector)
+            except BaseException as e:
+                for future in futures.values():
+                    if not future.done():
+                        future.set_exception(e)
+                        # Mark retrieved so unawaited futures do not log "exception never retrieved"
+                        future.exception()
+                raise
+            finally:
+                for key in to_embed:
+                    self._inflight.pop(key, None)
+
+        for key, future in waiting.items():
+            results[key] = await future
+        return results
+
+    async def create(
+        self, input_data: str | list[str] | Iterable[int] | Iterable[Iterable[int]]
+    ) -> list[float]:
+        if isinstance(input_data, str):
+            text = input_data
+        elif isinstance(input_data, list) and len(input_data) == 1 and isinstance(input_data[0], str):
+            text = input_data[0]
+        else:
+            # Token inputs and multi-string inputs are rare; pass them through uncached
+            return await self.inner.create(input_data=input_data)
+
+        text = normalize_text(text)
+        key = cache_key(self.model, self.embedding_dim, text)
+        vector = self._lookup(key)
+        if vector is not None:
+            return vector
+        return (await self._embed_missing({key: text}))[key]
+
+    async def create_batch(self, input_data_list: list[str]) -> list[list[float]]:
+        texts = [normalize_text(text) for text in input_data_list]
+        keys = [cache_key(self.model, self.embedding_dim, text) for text in texts]
+        found: Dict[bytes, List[float]] = {}
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            vector = self._lookup(key)
+            if vector is not None:
+                found[key] = vector
+            else:
+                missing[key] = text
+        if missing:
+            found.update(await self._embed_missing(missing))
+        return [found[key] for key in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the cache."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'model': self.model,
+            'embedding_dim': self.embedding_dim,
+            'memory_entries': len(self._lru),
+            'memory_capacity': self.max_entries,
+            'disk_entries': len(self.disk) if self.disk is not None else None,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else None,
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the hit/miss counters (cached vectors are kept)."""
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def prometheus_lines(self) -> List[str]:
+        """Render the cache counters in Prometheus text exposition format."""
+        labels = format_labels({'model': self.model})
+        lines = prometheus_header('graphiti_embedding_cache_lookups_total', 'counter', 'Embedding cache lookups by result')
+        for result, value in (('memory_hit', self.memory_hits), ('disk_hit', self.disk_hits), ('miss', self.misses)):
+            result_labels = format_labels({'model': self.model, 'result': result})
+            lines.append(f'graphiti_embedding_cache_lookups_total{result_labels} {value}')
+        lines.extend(prometheus_header('graphiti_embedding_cache_entries', 'gauge', 'Vectors held in the in-process cache'))
+        lines.append(f'graphiti_embedding_cache_entries{labels} {len(self._lru)}')
+        return lines
+
+    def close(self) -> None:
+        """Flush and close the disk store, if any."""
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Embedding profiles (vector dimension and cache precision) and the re-embed migration.
+
+Node name and fact embeddings dominate store size on large groups. graphiti-core writes them
+with ``db.create.setNodeVectorProperty``, so Neo4j already keeps them as float32 arrays and
+the biggest remaining lever is the dimension: ``text-embedding-3`` models can return shortened
+vectors through the ``dimensions`` request parameter. Lower-precision copies (float16, int8)
+are kept in the local embedding cache, where the store format is ours.
+
+Vectors of different dimensions cannot be compared, so changing the profile requires
+re-embedding existing groups; ``reembed_groups`` does that in batches.
+"""
+import logging
+from collections.abc import Iterable
+from typing import Any, Dict, List, Literal, Optional
+
+from graphiti_core.embedder.client import EmbedderClient
+from graphiti_core.embedder.openai import OpenAIEmbedder
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Models that accept the 'dimensions' request parameter
+DIMENSIONS_MODEL_PREFIXES = ('text-embedding-3',)
+
+
+class EmbeddingProfile(BaseModel):
+    """Dimension and cache precision of the server's embeddings."""
+
+    dimensions: Optional[int] = None
+    cache_dtype: Literal['float32', 'float16', 'int8'] = 'float32'
+
+
+def supports_dimensions(model: str) -> bool:
+    """Return True if the embedding model can shorten vectors server-side."""
+    return model.rsplit('/', 1)[-1].startswith(DIMENSIONS_MODEL_PREFIXES)
+
+
+class DimensionedOpenAIEmbedder(OpenAIEmbedder):
+    """OpenAIEmbedder that requests shortened vectors via the ``dimensions`` parameter.
+
+    For models without server-side shortening the vectors are truncated locally, as
+    OpenAIEmbedder already does with ``embedding_dim``.
+    """
+
+    def __init__(self, *args: Any, dimensions: Optional[int] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.dimensions = dimensions if dimensions and supports_dimensions(str(self.config.embedding_model)) else None
+        if dimensions and self.dimensions is None:
+            logger.warning(
+                f"Embedding model '{self.config.embedding_model}' does not support the dimensions parameter; "
+                f"vectors are truncated to {self.config.embedding_dim} locally"
+            )
+
+    def _extra(self) -> Dict[str, Any]:
+        return {'dimensions': self.dimensions} if self.dimensions else {}
+
+    async def create(
+        self, input_data: str | list[str] | Iterable[int] | Iterable[Iterable[int]]
+    ) -> list[float]:
+        result = await self.client.embeddings.create(
+            input=input_data, model=self.config.embedding_model, **self._extra()
+        )
+        return result.data[0].embedding[: self.config.embedding_dim]
+
+    async def create_batch(self, input_data_list: list[str]) -> list[list[float]]:
+        result = await self.client.embeddings.create(
+            input=input_data_list, model=self.config.embedding_model, **self._extra()
+        )
+        return [embedding.embedding[: self.config.embedding_dim] for embedding in result.data]
+
+
+# (label/type, text property, embedding property, match pattern, variable, vector setter procedure)
+_EMBEDDED_ELEMENTS = (
+    ('Entity', 'name', 'name_embedding', '(e:Entity)', 'e', 'db.create.setNodeVectorProperty'),
+    ('Community', 'name', 'name_embedding', '(e:Community)', 'e', 'db.create.setNodeVectorProperty'),
+    ('RELATES_TO', 'fact', 'fact_embedding', '(:Entity)-[e:RELATES_TO]->(:Entity)', 'e', 'db.create.setRelationshipVectorProperty'),
+)
+
+
+async def list_group_ids(driver: Any) -> List[str]:
+    """Return every group_id that has entities in the graph."""
+    records, _, _ = await driver.execute_query(
+        'MATCH (n:Entity) RETURN DISTINCT n.group_id AS group_id',
+        routing_='r',
+    )
+    return [record['group_id'] for record in records if record['group_id'] is not None]
+
+
+async def reembed_group(
+    driver: Any,
+    embedder: EmbedderClient,
+    group_id: str,
+    dimension: int,
+    batch_size: int = 200,
+    only_mismatched: bool = True,
+) -> Dict[str, int]:
+    """Re-embed the entity names, community names and facts of one group in batches.
+
+    Elements are visited in uuid order (keyset pagination), so an interrupted run can simply
+    be restarted; with only_mismatched, elements already at the target dimension are skipped.
+
+    Args:
+        driver: The Neo4j async driver
+        embedder: Embedder producing vectors of the target profile
+        group_id: The group to migrate
+        dimension: Target vector dimension
+        batch_size: Elements embedded and written per round trip
+        only_mismatched: Skip elements whose embedding already has the target dimension
+
+    Returns:
+        Number of re-embedded elements per element type
+    """
+    counts: Dict[str, int] = {}
+    for element, text_prop, embedding_prop, pattern, var, setter in _EMBEDDED_ELEMENTS:
+        mismatch = (
+            f'AND ({var}.{embedding_prop} IS NULL OR size({var}.{embedding_prop}) <> $dimension)'
+            if only_mismatched
+            else ''
+        )
+        select_query = f"""
+            MATCH {pattern}
+            WHERE {var}.group_id = $group_id AND {var}.uuid > $after AND {var}.{text_prop} IS NOT NULL {mismatch}
+            RETURN {var}.uuid AS uuid, {var}.{text_prop} AS text
+            ORDER BY {var}.uuid
+            LIMIT $batch_size
+        """
+        match_by_uuid = (
+            f'MATCH ()-[{var}:RELATES_TO {{uuid: row.uuid}}]->()'
+            if element == 'RELATES_TO'
+            else f'MATCH ({var}:{element} {{uuid: row.uuid}})'
+        )
+        write_query = f"""
+            UNWIND $rows AS row
+            {match_by_uuid}
+            CALL {setter}({var}, "{embedding_prop}", row.embedding)
+            RETURN count(*) AS updated
+        """
+
+        after = ''
+        total = 0
+        while True:
+            records, _, _ = await driver.execute_query(
+                select_query,
+                group_id=group_id,
+                after=after,
+                dimension=dimension,
+                batch_size=batch_size,
+                routing_='r',
+            )
+            if not records:
+                break
+            texts = [record['text'].replace('\n', ' ') for record in records]
+            vectors = await embedder.create_batch(texts)
+            rows = [{'uuid': record['uuid'], 'embedding': vector} for record, vector in zip(records, vectors)]
+            await driver.execute_query(write_query, rows=rows)
+            total += len(rows)
+            after = records[-1]['uuid']
+            logger.info(f"Re-embedded {total} {element} element(s) in group '{group_id}'")
+        counts[element] = total
+    return counts
+
+
+async def reembed_groups(
+    driver: Any,
+    embedder: EmbedderClient,
+    group_ids: Optional[List[str]],
+    dimension: int,
+    batch_size: int = 200,
+    only_mismatched: bool = True,
+) -> Dict[str, Dict[str, int]]:
+    """Re-embed several groups (all groups if group_ids is None or empty)."""
+    if not group_ids:
+        group_ids = await list_group_ids(driver)
+    results: Dict[str, Dict[str, int]] = {}
+    for group_id in group_ids:
+        results[group_id] = await reembed_group(
+            driver, embedder, group_id, dimension, batch_size=batch_size, only_mismatched=only_mismatched
+        )
+    return results
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Fact lookups between two known entities for the Graphiti MCP server.
+
+"What do we know about X and Y?" is a structural question: the answer is the RELATES_TO
+edges between two entities, not the facts most similar to a query. facts_between() seeks
+both endpoints through the entity UUID index and returns the edges connecting them, in
+either direction, optionally of one relation type. Endpoints given by name are resolved
+with the exact name lookups of node_lookup first.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from graphiti_core.edges import EntityEdge, get_entity_edge_from_record
+from graphiti_core.nodes import EntityNode
+
+from mcp_server.neighborhood import EDGE_MAP
+from mcp_server.node_lookup import MAX_MATCHES_PER_NAME, fetch_nodes_by_uuids, match_nodes_by_name
+from mcp_server.search_filters import edge_validity_clause
+
+MAX_FACTS = 200
+
+
+@dataclass
+class FactsBetween:
+    """The entities an endpoint resolved to, and the facts between them (newest first)."""
+
+    source_nodes: List[EntityNode] = field(default_factory=list)
+    target_nodes: List[EntityNode] = field(default_factory=list)
+    facts: List[EntityEdge] = field(default_factory=list)
+    historical: List[EntityEdge] = field(default_factory=list)
+
+
+def relation_name(relation: str) -> str:
+    """Normalize a relation to graphiti's edge name form, e.g. 'works at' -> 'WORKS_AT'."""
+    return '_'.join(relation.replace('-', ' ').replace('_', ' ').upper().split())
+
+
+def edge_valid_at(edge: EntityEdge, at: datetime, current_only: bool) -> bool:
+    """Python counterpart of edge_validity_clause() for an edge already loaded."""
+    if edge.valid_at is not None and edge.valid_at > at:
+        return False
+    if edge.invalid_at is not None and edge.invalid_at <= at:
+        return False
+    return not (current_only and edge.expired_at is not None)
+
+
+def facts_between_query(relation: bool, edge_filter: Optional[str]) -> str:
+    """Build the edge lookup between the entities in $source_uuids and $target_uuids."""
+    conditions = ['b.uuid IN $target_uuids']
+    if relation:
+        conditions.append('r.name = $relation')
+    if edge_filter:
+        conditions.append(edge_filter)
+    return f"""
+    MATCH (a:Entity)
+    WHERE a.uuid IN $source_uuids
+    MATCH (a)-[r:RELATES_TO]-(b:Entity)
+    WHERE {' AND '.join(conditions)}
+    WITH DISTINCT r
+    ORDER BY coalesce(r.valid_at, r.created_at) DESC
+    LIMIT $limit
+    RETURN r {EDGE_MAP} AS edge
+    """
+
+
+async def resolve_entities(
+    driver: Any, source: str, target: str, group_ids: Sequence[str]
+) -> Tuple[List[EntityNode], List[EntityNode]]:
+    """Resolve both endpoints, each given by UUID or, failing that, by name (ignoring case)."""
+    nodes, missing = await fetch_nodes_by_uuids(driver, [source, target])
+    resolved: Dict[str, List[EntityNode]] = {node.uuid: [node] for node in nodes}
+    if missing:
+        resolved.update(
+            await match_nodes_by_name(driver, missing, group_ids, case_insensitive=True, limit=MAX_MATCHES_PER_NAME)
+        )
+    return resolved.get(source, []), resolved.get(target, [])
+
+
+async def facts_between(
+    driver: Any,
+    source: str,
+    target: str,
+    group_ids: Sequence[str],
+    relation: Optional[str] = None,
+    as_of: Optional[datetime] = None,
+    include_historical: bool = False,
+    max_facts: int = 50,
+) -> FactsBetween:
+    """Return the facts between two entities, each given by UUID or name.
+
+    A name matching several entities (e.g. duplicates) uses all of them. Facts count as
+    valid when valid at as_of or, by default, valid now and not expired; the others are
+    only returned (in historical) with include_historical.
+
+    Args:
+        driver: Neo4j driver of the Graphiti client
+        source: UUID or name of the first entity
+        target: UUID or name of the second entity
+        group_ids: Groups in which names are resolved
+        relation: Optional relation type (edge name) the facts must have
+        as_of: Time at which facts must be valid (default: now)
+        include_historical: Also return the facts not valid at that time
+        max_facts: Maximum number of facts looked up
+
+    Raises:
+        ValueError: If an entity is empty or the limit is out of range
+    """
+    if not source.strip() or not target.strip():
+        raise ValueError('Both entities are required')
+    if not 1 <= max_facts <= MAX_FACTS:
+        raise ValueError(f'max_facts must be between 1 and {MAX_FACTS}')
+
+    result = FactsBetween()
+    result.source_nodes, result.target_nodes = await resolve_entities(driver, source, target, group_ids)
+    if not result.source_nodes or not result.target_nodes:
+        return result
+
+    at = as_of or datetime.now(timezone.utc)
+    current_only = as_of is None
+    params: Dict[str, Any] = {}
+    edge_filter = None
+    if not include_historical:
+        params['as_of'] = at
+        edge_filter = edge_validity_clause('r', 'as_of', current_only)
+    if relation:
+        params['relation'] = relation_name(relation)
+
+    records, _, _ = await driver.execute_query(
+        facts_between_query(bool(relation), edge_filter),
+        source_uuids=[node.uuid for node in result.source_nodes],
+        target_uuids=[node.uuid for node in result.target_nodes],
+        limit=max_facts,
+        routing_='r',
+        **params,
+    )
+    for record in records:
+        edge = get_entity_edge_from_record(record['edge'])
+        edge.attributes.pop('fact_embedding', None)
+        if edge_valid_at(edge, at, current_only):
+            result.facts.append(edge)
+        else:
+            result.historical.append(edge)
+    return result
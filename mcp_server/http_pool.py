@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP connection pool for the OpenAI SDK clients used by the Graphiti MCP server.
+
+The LLM client, the embedder and the reranker each build their own AsyncOpenAI client by
+default, and every AsyncOpenAI client owns a separate httpx pool with default limits. When
+they talk to the same gateway that means duplicate TLS handshakes and too few keep-alive
+connections under fan-out. SharedHttpPool owns a single tuned httpx.AsyncClient that is
+injected into all of them and records pool statistics.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel
+
+from mcp_server.metrics import Histogram, prometheus_header, prometheus_histogram_lines
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (HTTP/2 support for httpx is optional)
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+
+class HttpPoolConfig(BaseModel):
+    """Tuning knobs for the shared HTTP pool."""
+
+    http2: bool = True
+    max_connections: int = 100
+    max_keepalive_connections: int = 40
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    timeout: float = 600.0
+    warmup: bool = True
+
+
+class SharedHttpPool:
+    """Owns the shared httpx.AsyncClient and collects connection statistics."""
+
+    def __init__(self, pool_config: Optional[HttpPoolConfig] = None):
+        """Create the shared client.
+
+        Args:
+            pool_config: Pool tuning; defaults are sized for graphiti-core's concurrent fan-out
+        """
+        self.config = pool_config or HttpPoolConfig()
+        use_http2 = self.config.http2 and HAS_HTTP2
+        if self.config.http2 and not HAS_HTTP2:
+            logger.warning("HTTP/2 requested for the shared HTTP pool but 'h2' is not installed; using HTTP/1.1")
+        self.http2 = use_http2
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.request_errors = 0
+        self.connections_opened = 0
+        self.connection_setup = Histogram()
+
+        self.client = httpx.AsyncClient(
+            http2=use_http2,
+            limits=httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(self.config.timeout, connect=self.config.connect_timeout),
+            follow_redirects=True,
+            event_hooks={'request': [self._on_request], 'response': [self._on_response]},
+        )
+        logger.info(
+            f"Shared HTTP pool created (http2={use_http2}, max_connections={self.config.max_connections}, "
+            f"max_keepalive={self.config.max_keepalive_connections}, keepalive_expiry={self.config.keepalive_expiry}s)"
+        )
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+        # httpcore reports connection setup through the 'trace' extension
+        setup_started: Dict[str, float] = {}
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == 'connection.connect_tcp.started':
+                setup_started['t'] = time.perf_counter()
+            elif event_name in ('connection.start_tls.complete', 'connection.connect_tcp.complete'):
+                # For TLS origins the setup completes after the handshake; plain HTTP stops at TCP
+                if event_name == 'connection.connect_tcp.complete' and request.url.scheme == 'https':
+                    return
+                started = setup_started.pop('t', None)
+                if started is not None:
+                    with self._lock:
+                        self.connections_opened += 1
+                        self.connection_setup.observe((time.perf_counter() - started) * 1000)
+
+        request.extensions['trace'] = trace
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        if response.status_code >= 500:
+            with self._lock:
+                self.request_errors += 1
+
+    def _pool_connections(self) -> List[Any]:
+        transport = getattr(self.client, '_transport', None)
+        pool = getattr(transport, '_pool', None)
+        return list(getattr(pool, 'connections', []) or [])
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the pool."""
+        connections = self._pool_connections()
+        idle = sum(1 for conn in connections if _safe_call(conn, 'is_idle'))
+        with self._lock:
+            return {
+                'http2': self.http2,
+                'max_connections': self.config.max_connections,
+                'max_keepalive_connections': self.config.max_keepalive_connections,
+                'open_connections': len(connections),
+                'idle_connections': idle,
+                'active_connections': len(connections) - idle,
+                'requests': self.requests,
+                'server_errors': self.request_errors,
+                'connections_opened': self.connections_opened,
+                'connection_reuse_ratio': (
+                    round(1 - self.connections_opened / self.requests, 4) if self.requests else None
+                ),
+                'connection_setup': self.connection_setup.snapshot(),
+            }
+
+    def prometheus_lines(self) -> List[str]:
+        """Render the pool statistics in Prometheus text exposition format."""
+        stats = self.stats()
+        lines: List[str] = []
+        for name, metric_type, help_text, value in (
+            ('graphiti_http_pool_open_connections', 'gauge', 'Open connections in the shared pool', stats['open_connections']),
+            ('graphiti_http_pool_idle_connections', 'gauge', 'Idle keep-alive connections', stats['idle_connections']),
+            ('graphiti_http_requests_total', 'counter', 'Requests sent through the shared pool', stats['requests']),
+            ('graphiti_http_connections_opened_total', 'counter', 'New connections opened', stats['connections_opened']),
+        ):
+            lines.extend(prometheus_header(name, metric_type, help_text))
+            lines.append(f'{name} {value}')
+        lines.extend(prometheus_header('graphiti_http_connection_setup_ms', 'histogram', 'TCP+TLS setup time in milliseconds'))
+        with self._lock:
+            lines.extend(prometheus_histogram_lines('graphiti_http_connection_setup_ms', {}, self.connection_setup))
+        return lines
+
+    async def warm_up(self, endpoints: Iterable[Tuple[Optional[str], Optional[str]]]) -> None:
+        """Open a connection to each distinct origin so the first real call skips TCP/TLS setup.
+
+        Sends a cheap GET to ``<base_url>/models`` per origin; responses and errors are ignored.
+
+        Args:
+            endpoints: (base_url, api_key) pairs; a None base_url means the default OpenAI endpoint
+        """
+        if not self.config.warmup:
+            return
+        targets: Dict[str, Tuple[str, Optional[str]]] = {}
+        for base_url, api_key in endpoints:
+            url = (base_url or 'https://api.openai.com/v1').rstrip('/')
+            origin = '{0.scheme}://{0.netloc}'.format(urlsplit(url))
+            targets.setdefault(origin, (url, api_key))
+
+        async def _touch(url: str, api_key: Optional[str]) -> None:
+            # Authenticate when possible to avoid 401 noise in provider logs
+            headers = {'Authorization': f'Bearer {api_key}'} if api_key else {}
+            try:
+                await self.client.get(f'{url}/models', headers=headers, timeout=self.config.connect_timeout)
+            except Exception as e:
+                logger.debug(f'HTTP pool warm-up for {url} failed: {e}')
+
+        await asyncio.gather(*(_touch(url, api_key) for url, api_key in targets.values()))
+        logger.info(f'HTTP pool warmed up for origins: {list(targets.keys())}')
+
+    async def aclose(self) -> None:
+        """Close the shared client and all pooled connections."""
+        await self.client.aclose()
+
+
+def _safe_call(obj: Any, method: str) -> bool:
+    try:
+        return bool(getattr(obj, method)())
+    except Exception:
+        return False
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Per-prompt LLM instrumentation for the Graphiti MCP server.
+
+InstrumentedLLMClient wraps any graphiti-core LLMClient and records, per prompt type and
+model, call counts, latency histograms, token usage, estimated cost, retries and error
+classes. Token usage is captured by proxying the wrapped client's OpenAI SDK client, so it
+works for OpenAIClient, OpenAIGenericClient and OpenRouterClient alike. The same proxy
+applies the optional token budget preflight (see token_budget.py) to every request.
+"""
+import logging
+import threading
+import time
+import typing
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from graphiti_core.llm_client import LLMClient
+from graphiti_core.llm_client.config import ModelSize
+from graphiti_core.prompts.models import Message
+from pydantic import BaseModel
+
+from mcp_server.llm_routing import get_prompt_type
+from mcp_server.token_budget import PromptBudget, send_with_budget
+from mcp_server.metrics import (
+    Histogram,
+    format_labels,
+    prometheus_header,
+    prometheus_histogram_lines,
+)
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens as (prompt, completion). Extend/override with LLM_PRICING.
+DEFAULT_LLM_PRICING: Dict[str, Tuple[float, float]] = {
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4.1': (2.00, 8.00),
+    'gpt-4.1-mini': (0.40, 1.60),
+    'gpt-4.1-nano': (0.10, 0.40),
+    'o3-mini': (1.10, 4.40),
+    'o4-mini': (1.10, 4.40),
+}
+
+
+def parse_pricing(spec: Optional[str]) -> Dict[str, Tuple[float, float]]:
+    """Parse an LLM pricing spec into a model -> (prompt, completion) USD-per-1M-token map.
+
+    The spec is a comma-separated list of ``model=prompt_price:completion_price`` entries,
+    e.g. ``qwen/qwen-3-32b=0.10:0.30,gpt-4o=2.5:10``.
+
+    Args:
+        spec: The raw pricing string (typically from LLM_PRICING)
+
+    Returns:
+        A dictionary of model name to (prompt, completion) prices
+    """
+    pricing: Dict[str, Tuple[float, float]] = {}
+    if not spec:
+        return pricing
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            model, prices = entry.rsplit('=', 1)
+            prompt_price, completion_price = prices.split(':', 1)
+            pricing[model.strip()] = (float(prompt_price), float(completion_price))
+        except ValueError:
+            logger.warning(f"Ignoring malformed LLM pricing entry '{entry}' (expected model=prompt:completion)")
+    return pricing
+
+
+@dataclass
+class LLMCallRecord:
+    """Usage collected for one logical LLM call (across all of its attempts)."""
+    attempts: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    model: Optional[str] = None
+
+
+# The record for the LLM call currently executing in this task (set by InstrumentedLLMClient)
+_current_call: ContextVar[Optional[LLMCallRecord]] = ContextVar('graphiti_llm_call', default=None)
+
+
+@dataclass
+class _PromptModelStats:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    unpriced_calls: int = 0
+    latency: Histogram = field(default_factory=Histogram)
+    error_classes: Dict[str, int] = field(default_factory=dict)
+
+
+class LLMStats:
+    """Thread-safe aggregation of LLM call metrics keyed by (prompt type, model)."""
+
+    def __init__(self, pricing: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.pricing: Dict[str, Tuple[float, float]] = dict(DEFAULT_LLM_PRICING)
+        self.pricing.update(pricing or {})
+        self._stats: Dict[Tuple[str, str], _PromptModelStats] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def _price_for(self, model: str) -> Optional[Tuple[float, float]]:
+        if model in self.pricing:
+            return self.pricing[model]
+        # OpenRouter-style names carry a provider prefix (e.g. 'openai/gpt-4o')
+        short_name = model.rsplit('/', 1)[-1]
+        return self.pricing.get(short_name)
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        """Estimate the USD cost of a call, or None if the model has no known price."""
+        price = self._price_for(model)
+        if price is None:
+            return None
+        return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+    def record(
+        self,
+        prompt_type: str,
+        model: str,
+        latency_ms: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        retries: int = 0,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Record one logical LLM call."""
+        cost = self.estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            stats = self._stats.setdefault((prompt_type, model), _PromptModelStats())
+            stats.calls += 1
+            stats.retries += retries
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.latency.observe(latency_ms)
+            if cost is None:
+                stats.unpriced_calls += 1
+            else:
+                stats.cost_usd += cost
+            if error is not None:
+                stats.errors += 1
+                error_class = type(error).__name__
+                stats.error_classes[error_class] = stats.error_classes.get(error_class, 0) + 1
+
+    def reset(self) -> None:
+        """Drop all collected metrics."""
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot, sorted by total latency (most expensive first)."""
+        with self._lock:
+            items = list(self._stats.items())
+            entries: List[Dict[str, Any]] = [
+                {
+                    'prompt_type': prompt_type,
+                    'model': model,
+                    'calls': stats.calls,
+                    'errors': stats.errors,
+                    'error_classes': dict(stats.error_classes),
+                    'retries': stats.retries,
+                    'prompt_tokens': stats.prompt_tokens,
+                    'completion_tokens': stats.completion_tokens,
+                    'estimated_cost_usd': round(stats.cost_usd, 6),
+                    'unpriced_calls': stats.unpriced_calls,
+                    'latency': stats.latency.snapshot(),
+                }
+                for (prompt_type, model), stats in items
+            ]
+        entries.sort(key=lambda entry: entry['latency']['sum_ms'], reverse=True)
+        return {
+            'since': self.started_at,
+            'totals': {
+                'calls': sum(entry['calls'] for entry in entries),
+                'errors': sum(entry['errors'] for entry in entries),
+                'retries': sum(entry['retries'] for entry in entries),
+                'prompt_tokens': sum(entry['prompt_tokens'] for entry in entries),
+                'completion_tokens': sum(entry['completion_tokens'] for entry in entries),
+                'estimated_cost_usd': round(sum(entry['estimated_cost_usd'] for entry in entries), 6),
+            },
+            'prompts': entries,
+        }
+
+    def prometheus_lines(self) -> List[str]:
+        """Render the collected metrics in Prometheus text exposition format."""
+        with self._lock:
+            items = list(self._stats.items())
+
+        counters = [
+            ('graphiti_llm_calls_total', 'LLM calls by prompt type and model', lambda s: s.calls),
+            ('graphiti_llm_retries_total', 'LLM retry attempts', lambda s: s.retries),
+            ('graphiti_llm_prompt_tokens_total', 'Prompt tokens sent', lambda s: s.prompt_tokens),
+            ('graphiti_llm_completion_tokens_total', 'Completion tokens received', lambda s: s.completion_tokens),
+            ('graphiti_llm_cost_usd_total', 'Estimated LLM cost in USD', lambda s: round(s.cost_usd, 6)),
+        ]
+        lines: List[str] = []
+        for name, help_text, getter in counters:
+            lines.extend(prometheus_header(name, 'counter', help_text))
+            for (prompt_type, model), stats in items:
+                labels = format_labels({'prompt': prompt_type, 'model': model})
+                lines.append(f'{name}{labels} {getter(stats)}')
+
+        lines.extend(prometheus_header('graphiti_llm_errors_total', 'counter', 'LLM call errors by class'))
+        for (prompt_type, model), stats in items:
+            for error_class, count in stats.error_classes.items():
+                labels = format_labels({'prompt': prompt_type, 'model': model, 'error': error_class})
+                lines.append(f'graphiti_llm_errors_total{labels} {count}')
+
+        lines.extend(prometheus_header('graphiti_llm_latency_ms', 'histogram', 'LLM call latency in milliseconds'))
+        for (prompt_type, model), stats in items:
+            lines.extend(
+                prometheus_histogram_lines(
+                    'graphiti_llm_latency_ms', {'prompt': prompt_type, 'model': model}, stats.latency
+                )
+            )
+        return lines
+
+
+def _record_usage(kwargs: Dict[str, Any], response: Any) -> None:
+    """Add the usage of a completion response to the current call record (if any)."""
+    record = _current_call.get()
+    if record is None:
+        return
+    record.model = kwargs.get('model') or record.model
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        record.prompt_tokens += getattr(usage, 'prompt_tokens', 0) or 0
+        record.completion_tokens += getattr(usage, 'completion_tokens', 0) or 0
+
+
+class _CompletionsProxy:
+    """Wraps ``chat.completions`` to count attempts, capture token usage and apply the budget."""
+
+    def __init__(self, completions: Any, budget: Optional[PromptBudget] = None):
+        self._completions = completions
+        self._budget = budget
+
+    async def _send(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        record = _current_call.get()
+        if record is not None:
+            record.attempts += 1
+        response = await getattr(self._completions, method)(*args, **kwargs)
+        _record_usage(kwargs, response)
+        return response
+
+    async def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        if self._budget is None:
+            return await self._send(method, *args, **kwargs)
+        return await send_with_budget(
+            self._budget, lambda **request: self._send(method, *args, **request), kwargs
+        )
+
+    async def create(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._call('create', *args, **kwargs)
+
+    async def parse(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._call('parse', *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._completions, name)
+
+
+class _ChatProxy:
+    def __init__(self, chat: Any, budget: Optional[PromptBudget] = None):
+        self._chat = chat
+        self.completions = _CompletionsProxy(chat.completions, budget)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._chat, name)
+
+
+class _BetaProxy:
+    def __init__(self, beta: Any, budget: Optional[PromptBudget] = None):
+        self._beta = beta
+        self.chat = _ChatProxy(beta.chat, budget)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._beta, name)
+
+
+class UsageRecordingClient:
+    """Proxy for an AsyncOpenAI client that reports usage to the current LLM call record."""
+
+    def __init__(self, client: Any, budget: Optional[PromptBudget] = None):
+        self._client = client
+        self.chat = _ChatProxy(client.chat, budget)
+        if hasattr(client, 'beta'):
+            self.beta = _BetaProxy(client.beta, budget)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class InstrumentedLLMClient(LLMClient):
+    """LLMClient wrapper that records per-prompt metrics into an LLMStats instance."""
+
+    def __init__(self, inner: LLMClient, stats: LLMStats, budget: Optional[PromptBudget] = None):
+        """Wrap an LLM client.
+
+        Args:
+            inner: The LLM client doing the actual work
+            stats: The stats registry to record into
+            budget: Optional token budget applied to every request before it is sent
+        """
+        super().__init__(inner.config, cache=False)
+        self.inner = inner
+        self.stats = stats
+        self.budget = budget
+        inner_client = getattr(inner, 'client', None)
+        if inner_client is not None and hasattr(inner_client, 'chat'):
+            inner.client = UsageRecordingClient(inner_client, budget)
+        else:
+            logger.warning(
+                f'{type(inner).__name__} has no OpenAI-compatible client; token usage will not be recorded'
+            )
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper (e.g. provider, model_router)
+        if name == 'inner':
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    async def _generate_response(
+        self,
+        messages: list[Message],
+        response_model: type[BaseModel] | None = None,
+        max_tokens: int | None = None,
+        model_size: ModelSize = ModelSize.medium,
+    ) -> dict[str, typing.Any]:
+        return await self.inner._generate_response(messages, response_model, max_tokens, model_size)
+
+    async def generate_response(
+        self,
+        messages: list[Message],
+        response_model: type[BaseModel] | None = None,
+        max_tokens: int | None = None,
+        model_size: ModelSize = ModelSize.medium,
+    ) -> dict[str, typing.Any]:
+        prompt_type = get_prompt_type(response_model)
+        record = LLMCallRecord()
+        token = _current_call.set(record)
+        error: Optional[BaseException] = None
+        start = time.perf_counter()
+        try:
+            return await self.inner.generate_response(messages, response_model, max_tokens, model_size)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            _current_call.reset(token)
+            model = record.model or self.inner.model or 'unknown'
+            self.stats.record(
+                prompt_type=prompt_type,
+                model=model,
+                latency_ms=latency_ms,
+                prompt_tokens=record.prompt_tokens,
+                completion_tokens=record.completion_tokens,
+                retries=max(record.attempts - 1, 0),
+                error=error,
+            )
+            logger.debug(
+                f"LLM call '{prompt_type}' on '{model}' took {latency_ms:.0f} ms "
+                f"({record.prompt_tokens} prompt / {record.completion_tokens} completion tokens, "
+                f"{record.attempts} attempt(s))"
+            )
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Model tiering for the Graphiti MCP server LLM clients.
+
+graphiti-core tags cheap prompts (dedupe, attribute extraction, invalidation) with
+``ModelSize.small``. This module resolves those tags, plus optional per-prompt-type
+overrides, into concrete model names.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tier keywords that may be used as override values instead of a concrete model name
+TIER_SMALL = "small"
+TIER_LARGE = "large"
+
+# graphiti-core prompt response models mapped to the prompt type they belong to.
+# Response models that are not listed here are entity/edge type models, which
+# graphiti-core only passes for attribute extraction.
+PROMPT_TYPES_BY_RESPONSE_MODEL: Dict[str, str] = {
+    "ExtractedEntities": "extract_nodes",
+    "MissedEntities": "extract_nodes_reflexion",
+    "EntityClassification": "classify_nodes",
+    "NodeResolutions": "dedupe_nodes",
+    "NodeDuplicate": "dedupe_nodes",
+    "ExtractedEdges": "extract_edges",
+    "MissingFacts": "extract_edges_reflexion",
+    "EdgeDuplicate": "dedupe_edges",
+    "UniqueFacts": "dedupe_edge_list",
+    "InvalidatedEdges": "invalidate_edges",
+    "EdgeDates": "extract_edge_dates",
+    "Summary": "summarize_nodes",
+    "SummaryDescription": "summarize_description",
+}
+PROMPT_TYPE_TEXT = "text"                       # No response model (free-form completion)
+PROMPT_TYPE_ATTRIBUTES = "extract_attributes"   # Custom entity/edge type models
+
+
+def get_prompt_type(response_model: Optional[type]) -> str:
+    """Derive the graphiti-core prompt type from the response model of a call.
+
+    Args:
+        response_model: The Pydantic response model passed to the LLM client, or None
+
+    Returns:
+        The prompt type name (e.g. 'dedupe_nodes', 'extract_attributes')
+    """
+    if response_model is None:
+        return PROMPT_TYPE_TEXT
+    return PROMPT_TYPES_BY_RESPONSE_MODEL.get(response_model.__name__, PROMPT_TYPE_ATTRIBUTES)
+
+
+def parse_model_overrides(spec: Optional[str]) -> Dict[str, str]:
+    """Parse a per-prompt-type override spec.
+
+    The spec is a comma-separated list of ``prompt_type=model`` pairs, where model is
+    either a concrete model name or one of the tier keywords 'small' / 'large'.
+    Example: ``dedupe_nodes=small,summarize_nodes=small,extract_nodes=gpt-4o``
+
+    Args:
+        spec: The raw override string (typically from LLM_MODEL_OVERRIDES)
+
+    Returns:
+        A dictionary mapping prompt type to model name or tier keyword
+    """
+    overrides: Dict[str, str] = {}
+    if not spec:
+        return overrides
+
+    for pair in spec.split(','):
+        pair = pair.strip()
+        if not pair:
+            continue
+        if '=' not in pair:
+            logger.warning(f"Ignoring malformed LLM model override '{pair}' (expected prompt_type=model)")
+            continue
+        prompt_type, model = (part.strip() for part in pair.split('=', 1))
+        if not prompt_type or not model:
+            logger.warning(f"Ignoring malformed LLM model override '{pair}' (expected prompt_type=model)")
+            continue
+        overrides[prompt_type] = model
+    return overrides
+
+
+class ModelRouter:
+    """Resolves the model to use for a single LLM call.
+
+    Resolution order:
+        1. A per-prompt-type override (model name, or 'small'/'large' tier keyword)
+        2. The small model for calls tagged ``ModelSize.small``
+        3. The large (default) model
+    """
+
+    def __init__(
+        self,
+        model: str,
+        small_model: Optional[str] = None,
+        overrides: Optional[Dict[str, str]] = None,
+    ):
+        """Initialize the router.
+
+        Args:
+            model: The large/default model name
+            small_model: Model name for calls tagged small (falls back to model if not set)
+            overrides: Mapping of prompt type to model name or tier keyword
+        """
+        self.model = model
+        self.small_model = small_model or model
+        self.overrides = dict(overrides or {})
+
+    def _resolve_tier(self, value: str) -> str:
+        if value == TIER_SMALL:
+            return self.small_model
+        if value == TIER_LARGE:
+            return self.model
+        return value
+
+    def select(self, model_size: Any = None, response_model: Optional[type] = None) -> str:
+        """Select the model for a call.
+
+        Args:
+            model_size: The graphiti-core ModelSize the call was tagged with (or None)
+            response_model: The Pydantic response model of the call, used to derive the prompt type
+
+        Returns:
+            The model name to send to the provider
+        """
+        prompt_type = get_prompt_type(response_model)
+        override = self.overrides.get(prompt_type)
+        if override:
+            return self._resolve_tier(override)
+
+        # Compare by value so any ModelSize enum (or a plain string) is accepted
+        size = getattr(model_size, 'value', model_size)
+        if size == TIER_SMALL:
+            return self.small_model
+        return self.model
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the routing configuration as a plain dictionary (for logging/status)."""
+        return {
+            'model': self.model,
+            'small_model': self.small_model,
+            'overrides': dict(self.overrides),
+        }
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Lightweight in-process metric primitives for the Graphiti MCP server.
+
+Kept dependency-free on purpose: the server exposes snapshots through MCP tools and a
+Prometheus text resource, so there is no need for a full metrics client library.
+"""
+import bisect
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Default latency buckets in milliseconds (upper bounds, +Inf is implicit)
+DEFAULT_LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative bucket export and quantile estimates."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # One extra slot for observations above the last bucket (+Inf)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile (0..1) as the upper bound of the bucket containing it."""
+        if self.count == 0:
+            return None
+        target = q * self.count
+        running = 0
+        for i, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target and bucket_count:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (upper bound label, cumulative count) pairs in Prometheus order."""
+        result = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            result.append((_format_number(bound), running))
+        result.append(('+Inf', self.count))
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable summary of the histogram."""
+        return {
+            'count': self.count,
+            'sum_ms': round(self.sum, 3),
+            'avg_ms': round(self.sum / self.count, 3) if self.count else None,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'max_ms': round(self.max, 3),
+            'buckets': {label: count for label, count in self.cumulative()},
+        }
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels: Mapping[str, Any]) -> str:
+    """Format a label mapping as a Prometheus label set (``{a="1",b="2"}``)."""
+    if not labels:
+        return ''
+    inner = ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+    return '{' + inner + '}'
+
+
+def prometheus_histogram_lines(
+    name: str, labels: Mapping[str, Any], histogram: Histogram
+) -> List[str]:
+    """Render a histogram as Prometheus exposition lines (without HELP/TYPE headers)."""
+    lines = []
+    for bound, count in histogram.cumulative():
+        bucket_labels = dict(labels)
+        bucket_labels['le'] = bound
+        lines.append(f'{name}_bucket{format_labels(bucket_labels)} {count}')
+    lines.append(f'{name}_sum{format_labels(labels)} {histogram.sum}')
+    lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+    return lines
+
+
+def prometheus_header(name: str, metric_type: str, help_text: str) -> List[str]:
+    """Return the HELP/TYPE header lines for a metric family."""
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+
+
+def join_exposition(sections: Iterable[Iterable[str]]) -> str:
+    """Join several exposition sections into a single Prometheus text payload."""
+    lines: List[str] = []
+    for section in sections:
+        lines.extend(section)
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Bounded k-hop neighborhood expansion for the Graphiti MCP server.
+
+expand_neighborhood() walks RELATES_TO edges outward from seed entities in one Cypher query.
+Every hop is a correlated subquery that takes at most a fixed number of edges per frontier
+node (most recently valid first), so hub entities cannot blow up the result, and a visited
+list keeps nodes from being expanded twice and edges from being returned twice. The walk
+also stops growing once the node budget is spent.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from graphiti_core.edges import EntityEdge, get_entity_edge_from_record
+from graphiti_core.nodes import EntityNode, get_entity_node_from_record
+
+from mcp_server.search_filters import edge_validity_clause
+
+MAX_DEPTH = 3
+MAX_SEEDS = 50
+MAX_FANOUT = 100
+MAX_NODES = 500
+
+NODE_MAP = '{.uuid, .name, .group_id, .summary, .created_at, labels: labels(n), attributes: properties(n), hop: %d}'
+EDGE_MAP = (
+    '{.uuid, .group_id, .name, .fact, .episodes, .created_at, .expired_at, .valid_at, .invalid_at, '
+    'source_node_uuid: startNode(r).uuid, target_node_uuid: endNode(r).uuid, attributes: properties(r)}'
+)
+
+
+@dataclass
+class Neighborhood:
+    """A subgraph around seed entities: nodes in hop order, edges between them."""
+
+    nodes: List[EntityNode] = field(default_factory=list)
+    hops: Dict[str, int] = field(default_factory=dict)
+    edges: List[EntityEdge] = field(default_factory=list)
+    missing_uuids: List[str] = field(default_factory=list)
+
+
+def fanout_per_hop(max_per_node: Union[int, Sequence[int]], depth: int) -> List[int]:
+    """Expand a fan-out cap (one for all hops, or one per hop) to a list with one cap per hop.
+
+    A shorter list repeats its last cap for the remaining hops.
+
+    Raises:
+        ValueError: If the depth or a cap is out of range
+    """
+    if not 1 <= depth <= MAX_DEPTH:
+        raise ValueError(f'depth must be between 1 and {MAX_DEPTH}')
+    caps = [max_per_node] if isinstance(max_per_node, int) else list(max_per_node)
+    if not caps:
+        raise ValueError('max_per_node must not be empty')
+    if len(caps) > depth:
+        raise ValueError(f'max_per_node has {len(caps)} caps for {depth} hops')
+    for cap in caps:
+        if not isinstance(cap, int) or not 1 <= cap <= MAX_FANOUT:
+            raise ValueError(f'Fan-out caps must be integers between 1 and {MAX_FANOUT}')
+    return caps + [caps[-1]] * (depth - len(caps))
+
+
+def build_neighborhood_query(depth: int, edge_filter: Optional[str]) -> str:
+    """Build the traversal query for a depth; fan-out caps are the $fanout_<hop> parameters."""
+    where = f'AND {edge_filter}' if edge_filter else ''
+    lines = [
+        'MATCH (seed:Entity) WHERE seed.uuid IN $node_uuids',
+        'WITH collect(DISTINCT seed) AS frontier_0',
+        'WITH frontier_0, [n IN frontier_0 | n.uuid] AS visited_0, [] AS edges_0',
+    ]
+    carried = ['frontier_0']
+    for hop in range(1, depth + 1):
+        prev = hop - 1
+        kept = ', '.join(carried)
+        lines.append(
+            f"""CALL {{
+    WITH frontier_{prev}, edges_{prev}
+    UNWIND frontier_{prev} AS n
+    CALL {{
+        WITH n, edges_{prev}
+        MATCH (n)-[r:RELATES_TO]-(m:Entity)
+        WHERE r.group_id = n.group_id AND NOT r IN edges_{prev} {where}
+        RETURN r, m
+        ORDER BY coalesce(r.valid_at, r.created_at) DESC
+        LIMIT $fanout_{hop}
+    }}
+    RETURN collect(DISTINCT r) AS found_{hop}, collect(DISTINCT m) AS reached_{hop}
+}}
+WITH {kept}, visited_{prev}, edges_{prev} + found_{hop} AS edges_{hop},
+    [m IN reached_{hop} WHERE NOT m.uuid IN visited_{prev}] AS candidates_{hop},
+    $max_nodes - size(visited_{prev}) AS budget_{hop}
+WITH {kept}, visited_{prev}, edges_{hop},
+    candidates_{hop}[0..CASE WHEN budget_{hop} > 0 THEN budget_{hop} ELSE 0 END] AS frontier_{hop}
+WITH {kept}, frontier_{hop}, edges_{hop}, visited_{prev} + [m IN frontier_{hop} | m.uuid] AS visited_{hop}"""
+        )
+        carried.append(f'frontier_{hop}')
+    nodes = ' + '.join(f'[n IN frontier_{hop} | n {NODE_MAP % hop}]' for hop in range(depth + 1))
+    lines.append(
+        f"""RETURN {nodes} AS nodes,
+    [r IN edges_{depth} WHERE startNode(r).uuid IN visited_{depth} AND endNode(r).uuid IN visited_{depth}
+        | r {EDGE_MAP}] AS edges"""
+    )
+    return '\n'.join(lines)
+
+
+async def expand_neighborhood(
+    driver: Any,
+    node_uuids: Sequence[str],
+    depth: int = 1,
+    max_per_node: Union[int, Sequence[int]] = 10,
+    max_nodes: int = 100,
+    as_of: Optional[datetime] = None,
+    include_invalid: bool = False,
+) -> Neighborhood:
+    """Return the subgraph within depth hops of the seed entities.
+
+    Args:
+        driver: Neo4j driver of the Graphiti client
+        node_uuids: Seed entity UUIDs
+        depth: Number of hops (1 to MAX_DEPTH)
+        max_per_node: Edges followed per frontier node, one cap for all hops or one per hop
+        max_nodes: Maximum number of nodes, seeds included (seeds are always returned)
+        as_of: Only follow edges valid at this time (default: edges valid now and not expired)
+        include_invalid: Follow edges regardless of their validity (as_of is ignored)
+
+    Raises:
+        ValueError: If a bound is out of range
+    """
+    seeds = list(dict.fromkeys(node_uuids))
+    if not seeds:
+        raise ValueError('At least one node UUID is required')
+    if len(seeds) > MAX_SEEDS:
+        raise ValueError(f'At most {MAX_SEEDS} seed nodes are allowed')
+    if not 1 <= max_nodes <= MAX_NODES:
+        raise ValueError(f'max_nodes must be between 1 and {MAX_NODES}')
+    caps = fanout_per_hop(max_per_node, depth)
+
+    params: Dict[str, Any] = {f'fanout_{hop}': cap for hop, cap in enumerate(caps, start=1)}
+    edge_filter = None
+    if not include_invalid:
+        params['as_of'] = as_of or datetime.now(timezone.utc)
+        edge_filter = edge_validity_clause('r', 'as_of', current_only=as_of is None)
+
+    records, _, _ = await driver.execute_query(
+        build_neighborhood_query(depth, edge_filter),
+        node_uuids=seeds,
+        max_nodes=max_nodes,
+        routing_='r',
+        **params,
+    )
+    result = Neighborhood()
+    if not records:
+        result.missing_uuids = seeds
+        return result
+    record = records[0]
+    for node_record in record['nodes']:
+        node_record = dict(node_record)
+        hop = node_record.pop('hop')
+        node = get_entity_node_from_record(node_record)
+        result.nodes.append(node)
+        result.hops[node.uuid] = hop
+    for edge_record in record['edges']:
+        edge = get_entity_edge_from_record(edge_record)
+        edge.attributes.pop('fact_embedding', None)
+        result.edges.append(edge)
+    found = {node.uuid for node in result.nodes}
+    result.missing_uuids = [uuid for uuid in seeds if uuid not in found]
+    return result
+
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Exact entity lookups by UUID and by name for the Graphiti MCP server.
+
+These skip the hybrid search (no embedding, no reranking) for clients that already know
+which entities they want. Each lookup is one UNWIND query over all requested UUIDs or
+names. Case-sensitive name matches (exact or prefix) seek the (group_id, name) composite
+index; case-insensitive matches take candidates from graphiti-core's name/summary
+fulltext index, whose analyzer lowercases names, and then check the name exactly.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+from graphiti_core.helpers import lucene_sanitize
+from graphiti_core.nodes import EntityNode, get_entity_node_from_record
+
+MAX_LOOKUPS = 100
+MAX_MATCHES_PER_NAME = 50
+
+# Fulltext candidates checked per case-insensitive name
+FULLTEXT_CANDIDATES = 200
+
+NAME_FULLTEXT_INDEX = 'node_name_and_summary'
+
+LOOKUP_INDEX_STATEMENTS = ['CREATE INDEX entity_group_name IF NOT EXISTS FOR (n:Entity) ON (n.group_id, n.name)']
+
+NODE_RETURN = """n.uuid AS uuid,
+    n.name AS name,
+    n.group_id AS group_id,
+    n.summary AS summary,
+    n.created_at AS created_at,
+    labels(n) AS labels,
+    properties(n) AS attributes"""
+
+
+def check_lookups(values: Sequence[str], what: str) -> List[str]:
+    """Return the distinct non-empty values of a lookup in request order.
+
+    Raises:
+        ValueError: If there are none, too many, or a value is not a string
+    """
+    if not all(isinstance(value, str) for value in values):
+        raise ValueError(f'{what} must be strings')
+    distinct = list(dict.fromkeys(value for value in values if value.strip()))
+    if not distinct:
+        raise ValueError(f'At least one {what[:-1]} is required')
+    if len(distinct) > MAX_LOOKUPS:
+        raise ValueError(f'At most {MAX_LOOKUPS} {what} can be looked up per call')
+    return distinct
+
+
+async def fetch_nodes_by_uuids(driver: Any, uuids: Sequence[str]) -> Tuple[List[EntityNode], List[str]]:
+    """Return the entities with the given UUIDs in request order, and the UUIDs not found.
+
+    Raises:
+        ValueError: If the UUID list is empty or too long
+    """
+    requested = check_lookups(uuids, 'uuids')
+    records, _, _ = await driver.execute_query(
+        f"""
+        UNWIND $uuids AS uuid
+        MATCH (n:Entity {{uuid: uuid}})
+        RETURN {NODE_RETURN}
+        """,
+        uuids=requested,
+        routing_='r',
+    )
+    found = {record['uuid']: get_entity_node_from_record(record) for record in records}
+    return [found[uuid] for uuid in requested if uuid in found], [uuid for uuid in requested if uuid not in found]
+
+
+def name_fulltext_query(name: str, prefix: bool, group_ids: Sequence[str]) -> str:
+    """Build the Lucene query of a case-insensitive name lookup (the last word is a prefix if prefix)."""
+    words = [lucene_sanitize(word.lower()) for word in name.split()]
+    if prefix:
+        words[-1] += '*'
+        terms = '(' + ' AND '.join(words) + ')'
+    else:
+        terms = '"' + ' '.join(words) + '"'
+    groups = ' OR '.join(f'group_id:"{lucene_sanitize(group_id)}"' for group_id in group_ids)
+    return f'({groups}) AND name:{terms}'
+
+
+def find_by_name_query(case_insensitive: bool, prefix: bool) -> str:
+    """Build the lookup query for the matching mode; $lookups holds one map per name."""
+    if case_insensitive:
+        match = f"""CALL db.index.fulltext.queryNodes('{NAME_FULLTEXT_INDEX}', lookup.query, {{limit: $candidates}})
+        YIELD node AS n
+        WITH lookup, n
+        WHERE n:Entity AND n.group_id IN $group_ids
+            AND toLower(n.name) {'STARTS WITH' if prefix else '='} toLower(lookup.name)"""
+    else:
+        match = f"""MATCH (n:Entity)
+        WHERE n.group_id IN $group_ids AND n.name {'STARTS WITH' if prefix else '='} lookup.name"""
+    return f"""
+    UNWIND $lookups AS lookup
+    CALL {{
+        WITH lookup
+        {match}
+        RETURN n
+        ORDER BY size(n.name), n.name, n.uuid
+        LIMIT $limit
+    }}
+    RETURN lookup.name AS lookup_name, {NODE_RETURN}
+    """
+
+
+async def match_nodes_by_name(
+    driver: Any,
+    names: Sequence[str],
+    group_ids: Sequence[str],
+    case_insensitive: bool = False,
+    prefix: bool = False,
+    limit: int = 10,
+) -> Dict[str, List[EntityNode]]:
+    """Return the entities matching each name (shortest names first, at most limit per name).
+
+    Args:
+        driver: Neo4j driver of the Graphiti client
+        names: Entity names to look up
+        group_ids: Groups to search
+        case_insensitive: Ignore case when comparing names
+        prefix: Match names starting with the given name instead of equal to it
+        limit: Maximum number of entities per name
+
+    Raises:
+        ValueError: If the name list is empty or too long, or the limit is out of range
+    """
+    requested = check_lookups(names, 'names')
+    if not 1 <= limit <= MAX_MATCHES_PER_NAME:
+        raise ValueError(f'limit must be between 1 and {MAX_MATCHES_PER_NAME}')
+    lookups: List[Dict[str, Any]] = [{'name': name} for name in requested]
+    if case_insensitive:
+        for lookup in lookups:
+            lookup['query'] = name_fulltext_query(lookup['name'], prefix, group_ids)
+
+    records, _, _ = await driver.execute_query(
+        find_by_name_query(case_insensitive, prefix),
+        lookups=lookups,
+        group_ids=list(group_ids),
+        limit=limit,
+        candidates=FULLTEXT_CANDIDATES,
+        routing_='r',
+    )
+    matches: Dict[str, List[EntityNode]] = {name: [] for name in requested}
+    for record in records:
+        matches[record['lookup_name']].append(get_entity_node_from_record(record))
+    return matches
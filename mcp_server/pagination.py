@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Cursor pagination for the search and episode tools of the Graphiti MCP server.
+
+Cursors are opaque to clients: URL-safe base64 of a small JSON payload. Search cursors point
+into a ranked result snapshot, the uuids of one hybrid search kept in memory for a while, so
+later pages are a uuid lookup instead of a new search. Episode cursors carry a keyset
+position, (created_at, uuid) of the last episode returned, and need no server-side state;
+episode pages seek the (group_id, created_at) index of EPISODE_INDEX_STATEMENTS.
+"""
+import base64
+import binascii
+import json
+import logging
+import time
+import uuid as uuid_lib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from graphiti_core.nodes import EpisodicNode, get_episodic_node_from_record
+
+logger = logging.getLogger(__name__)
+
+CURSOR_VERSION = 1
+
+EPISODE_INDEX_STATEMENTS = [
+    'CREATE INDEX episodic_group_created_at IF NOT EXISTS FOR (e:Episodic) ON (e.group_id, e.created_at)'
+]
+
+
+class InvalidCursorError(ValueError):
+    """Raised for malformed cursors, cursors of another tool and expired snapshots."""
+
+
+def encode_cursor(kind: str, **fields: Any) -> str:
+    """Encode a cursor for a tool (kind) with the given position fields."""
+    payload = {'v': CURSOR_VERSION, 'k': kind, **fields}
+    raw = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, kind: str) -> Dict[str, Any]:
+    """Decode a cursor issued for a tool (kind) and return its position fields."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursorError('Malformed cursor') from e
+    if not isinstance(payload, dict) or payload.get('v') != CURSOR_VERSION:
+        raise InvalidCursorError('Unsupported cursor')
+    if payload.get('k') != kind:
+        raise InvalidCursorError(f"Cursor was issued by {payload.get('k')!r}, not {kind!r}")
+    return {key: value for key, value in payload.items() if key not in ('v', 'k')}
+
+
+@dataclass
+class RankedSnapshot:
+    """Ranked uuids of one search, in result order."""
+
+    tool: str
+    uuids: List[str]
+    expires_at: float
+
+
+class RankedResultStore:
+    """In-process LRU of ranked search snapshots with a TTL.
+
+    Snapshots are local to the server process; a cursor presented to another replica (or
+    after the TTL) is rejected and the client searches again.
+    """
+
+    def __init__(self, max_snapshots: int = 1000, ttl_seconds: float = 600.0):
+        """Create the store.
+
+        Args:
+            max_snapshots: Snapshots kept before the least recently used is dropped
+            ttl_seconds: Time a snapshot stays usable after its last use
+        """
+        self.max_snapshots = max_snapshots
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: 'OrderedDict[str, RankedSnapshot]' = OrderedDict()
+        self.saved = 0
+        self.pages_served = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def save(self, tool: str, uuids: List[str]) -> str:
+        """Store the ranked uuids of a search and return the snapshot id."""
+        snapshot_id = uuid_lib.uuid4().hex
+        self._snapshots[snapshot_id] = RankedSnapshot(tool, list(uuids), time.monotonic() + self.ttl_seconds)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        self.saved += 1
+        return snapshot_id
+
+    def get(self, snapshot_id: str) -> Optional[RankedSnapshot]:
+        """Return a live snapshot (extending its lifetime), or None."""
+        snapshot = self._snapshots.get(snapshot_id)
+        if snapshot is None:
+            return None
+        now = time.monotonic()
+        if snapshot.expires_at <= now:
+            del self._snapshots[snapshot_id]
+            self.expired += 1
+            return None
+        snapshot.expires_at = now + self.ttl_seconds
+        self._snapshots.move_to_end(snapshot_id)
+        return snapshot
+
+    def first_page(self, tool: str, uuids: List[str], page_size: int) -> Optional[str]:
+        """Return the cursor following the first page of a fresh ranking (None if it fits one page)."""
+        if len(uuids) <= page_size:
+            return None
+        return encode_cursor(tool, s=self.save(tool, uuids), o=page_size)
+
+    def page(self, tool: str, cursor: str, page_size: int) -> Tuple[List[str], Optional[str]]:
+        """Resolve a cursor into the uuids of its page and the cursor of the next page.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed, from another tool, or its snapshot expired
+        """
+        fields = decode_cursor(cursor, tool)
+        snapshot_id, offset = fields.get('s'), fields.get('o')
+        if not isinstance(snapshot_id, str) or not isinstance(offset, int) or offset < 0:
+            raise InvalidCursorError('Malformed cursor')
+        snapshot = self.get(snapshot_id)
+        if snapshot is None or snapshot.tool != tool:
+            raise InvalidCursorError('Cursor expired; run the search again without a cursor')
+        end = offset + page_size
+        next_cursor = encode_cursor(tool, s=snapshot_id, o=end) if end < len(snapshot.uuids) else None
+        self.pages_served += 1
+        return snapshot.uuids[offset:end], next_cursor
+
+    def is_live(self, cursor: Optional[str]) -> bool:
+        """Return True if a search cursor (or None, meaning no further pages) can still be followed."""
+        if cursor is None:
+            return True
+        try:
+            fields = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            snapshot_id = json.loads(fields).get('s')
+        except (binascii.Error, ValueError, TypeError, AttributeError):
+            return False
+        return isinstance(snapshot_id, str) and self.get(snapshot_id) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the store."""
+        return {
+            'snapshots': len(self._snapshots),
+            'capacity': self.max_snapshots,
+            'ttl_seconds': self.ttl_seconds,
+            'saved': self.saved,
+            'pages_served': self.pages_served,
+            'expired': self.expired,
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the counters (snapshots are kept)."""
+        self.saved = 0
+        self.pages_served = 0
+        self.expired = 0
+
+
+async def get_episode_page(
+    driver: Any,
+    group_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    sources: Optional[List[str]] = None,
+    source_descriptions: Optional[List[str]] = None,
+    include_content: bool = True,
+) -> Tuple[List[EpisodicNode], Optional[str]]:
+    """Return a page of a group's episodes, newest first, and the cursor of the next (older) page.
+
+    Pages are keyset based on (created_at, uuid), so every page costs the same no matter how
+    deep the client has paged, and episodes added meanwhile do not shift later pages. The
+    filters apply to every page, so pass the same ones with each cursor.
+
+    Args:
+        driver: Neo4j driver of the Graphiti client
+        group_id: Group of the episodes
+        limit: Maximum number of episodes per page
+        cursor: Cursor of the page to return (None for the newest)
+        start: Only episodes created at or after this time
+        end: Only episodes created before this time
+        sources: Only episodes of these source types (e.g. 'message', 'json', 'text')
+        source_descriptions: Only episodes with one of these source descriptions
+        include_content: Read the episode bodies (otherwise content is left empty)
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was issued for another group
+    """
+    after: Dict[str, Any] = {}
+    if cursor:
+        fields = decode_cursor(cursor, 'get_episodes')
+        if fields.get('g') != group_id:
+            raise InvalidCursorError('Cursor was issued for another group')
+        try:
+            after = {'created_at': datetime.fromisoformat(fields['t']), 'uuid': str(fields['u'])}
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidCursorError('Malformed cursor') from e
+
+    conditions = ['e.group_id = $group_id']
+    params: Dict[str, Any] = dict(after)
+    if after:
+        conditions.append('(e.created_at < $created_at OR (e.created_at = $created_at AND e.uuid < $uuid))')
+    if start is not None:
+        conditions.append('e.created_at >= $start')
+        params['start'] = start
+    if end is not None:
+        conditions.append('e.created_at < $end')
+        params['end'] = end
+    if sources:
+        conditions.append('e.source IN $sources')
+        params['sources'] = sources
+    if source_descriptions:
+        conditions.append('e.source_description IN $source_descriptions')
+        params['source_descriptions'] = source_descriptions
+
+    records, _, _ = await driver.execute_query(
+        f"""
+        MATCH (e:Episodic)
+        WHERE {' AND '.join(conditions)}
+        RETURN {'e.content' if include_content else "''"} AS content,
+            e.created_at AS created_at,
+            e.valid_at AS valid_at,
+            e.uuid AS uuid,
+            e.name AS name,
+            e.group_id AS group_id,
+            e.source_description AS source_description,
+            e.source AS source,
+            e.entity_edges AS entity_edges
+        ORDER BY e.created_at DESC, e.uuid DESC
+        LIMIT $limit
+        """,
+        group_id=group_id,
+        limit=limit + 1,
+        routing_='r',
+        **params,
+    )
+    episodes = [get_episodic_node_from_record(record) for record in records[:limit]]
+    next_cursor = None
+    if len(records) > limit and episodes:
+        last = episodes[-1]
+        next_cursor = encode_cursor('get_episodes', g=group_id, t=last.created_at.isoformat(), u=last.uuid)
+    return episodes, next_cursor
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Field projection and compact mode for the search and episode tools of the Graphiti MCP server.
+
+A Projection says which fields of a node, fact or episode a client wants and how long its
+free text (node summaries, episode content) may be. The formatters consult it while
+serializing, so excluded fields are never built, rather than dumping whole objects and
+deleting keys afterwards.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+NODE_FIELDS = ('uuid', 'name', 'summary', 'labels', 'group_id', 'created_at', 'attributes')
+FACT_FIELDS = (
+    'uuid',
+    'group_id',
+    'source_node_uuid',
+    'target_node_uuid',
+    'created_at',
+    'name',
+    'fact',
+    'episodes',
+    'expired_at',
+    'valid_at',
+    'invalid_at',
+    'attributes',
+)
+EPISODE_FIELDS = (
+    'uuid',
+    'name',
+    'group_id',
+    'labels',
+    'created_at',
+    'source',
+    'source_description',
+    'content',
+    'valid_at',
+    'entity_edges',
+)
+
+# Fields returned in compact mode when the client does not name its own
+COMPACT_FIELDS = {
+    'nodes': ('uuid', 'name', 'summary', 'labels'),
+    'facts': ('uuid', 'fact', 'source_node_uuid', 'target_node_uuid', 'valid_at', 'invalid_at'),
+    'episodes': ('uuid', 'name', 'created_at', 'content'),
+}
+
+ALLOWED_FIELDS = {'nodes': NODE_FIELDS, 'facts': FACT_FIELDS, 'episodes': EPISODE_FIELDS}
+
+TRUNCATION_MARK = '…'
+
+
+def truncate_text(text: Optional[str], max_chars: Optional[int]) -> Optional[str]:
+    """Shorten text to at most max_chars characters, preferring a word boundary.
+
+    Truncated text ends with an ellipsis (counted in max_chars); None or short text is
+    returned unchanged.
+    """
+    if text is None or max_chars is None or len(text) <= max_chars:
+        return text
+    cut = text[: max(max_chars - len(TRUNCATION_MARK), 0)]
+    # Back up to the last space unless that would drop a large part of the budget
+    space = cut.rfind(' ')
+    if space >= len(cut) * 0.8:
+        cut = cut[:space]
+    return cut.rstrip() + TRUNCATION_MARK
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Fields to serialize (None for all) and the character budget of free text (None for no limit)."""
+
+    fields: Optional[FrozenSet[str]] = None
+    text_limit: Optional[int] = None
+
+    def includes(self, field: str) -> bool:
+        """Return True if the field is serialized."""
+        return self.fields is None or field in self.fields
+
+    def include_set(self) -> Optional[set]:
+        """Return the fields as a model_dump include set (None for all)."""
+        return set(self.fields) if self.fields is not None else None
+
+    def truncate(self, text: Optional[str]) -> Optional[str]:
+        """Apply the text budget."""
+        return truncate_text(text, self.text_limit)
+
+    def cache_params(self) -> Dict[str, Any]:
+        """Return the projection as search cache key parameters."""
+        return {
+            'fields': sorted(self.fields) if self.fields is not None else None,
+            'text_limit': self.text_limit,
+        }
+
+
+FULL_PROJECTION = Projection()
+
+
+def build_projection(
+    kind: str,
+    fields: Optional[Iterable[str]] = None,
+    compact: bool = False,
+    text_limit: Optional[int] = None,
+) -> Projection:
+    """Build the projection of a tool call.
+
+    Args:
+        kind: 'nodes', 'facts' or 'episodes'
+        fields: Fields requested by the client (None or empty for the default set)
+        compact: Use the compact field set (unless fields are given) and truncate free text
+        text_limit: Character budget for free text in compact mode
+
+    Raises:
+        ValueError: If a requested field does not exist for the kind
+    """
+    allowed = ALLOWED_FIELDS[kind]
+    selected: Optional[FrozenSet[str]] = None
+    if fields:
+        unknown = sorted(set(fields) - set(allowed))
+        if unknown:
+            raise ValueError(f'Unknown {kind} fields {unknown}; available fields: {", ".join(allowed)}')
+        selected = frozenset(fields)
+    elif compact:
+        selected = frozenset(COMPACT_FIELDS[kind])
+    if selected is None and not compact:
+        return FULL_PROJECTION
+    return Projection(fields=selected, text_limit=text_limit if compact else None)
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Result cache for the search tools of the Graphiti MCP server.
+
+Agents repeat the same search_nodes/search_facts calls many times between writes, and every
+call costs an embedding plus several Neo4j queries (and possibly a rerank). SearchResultCache
+keeps formatted responses in an in-process LRU with a TTL and, optionally, in a shared backend
+(Redis) so several server replicas can reuse each other's results.
+
+Invalidation is generation based: every group has a counter that is bumped when an episode
+is committed to it or something is deleted from it, and cache keys include the counters of
+the searched groups. A write therefore makes all earlier results for its groups unreachable
+without scanning the cache; stale entries simply age out of the LRU (or expire in Redis).
+With a shared backend the counters live in the backend too, so a write on one replica
+invalidates the results cached by all of them.
+
+Agents also paraphrase the same question. With a SemanticQueryIndex attached, a query whose
+embedding is within a cosine threshold of a recently cached query with the same scope (tool,
+groups, generations and every other parameter) is served that query's result.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mcp_server.embedding_cache import normalize_text
+from mcp_server.metrics import format_labels, prometheus_header
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as aioredis  # optional shared cache backend
+    HAS_REDIS = True
+except ImportError:
+    aioredis = None  # type: ignore
+    HAS_REDIS = False
+
+# Generation name standing for "every group" (bumped when the whole graph is cleared)
+ALL_GROUPS = '*'
+
+
+def _digest(payload: Mapping[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class SearchCacheKeys(NamedTuple):
+    """Keys of one search call, derived from a single generation snapshot."""
+
+    key: str  # exact call (including the normalized query)
+    scope: str  # everything but the query; near-duplicate queries are matched within a scope
+
+
+class SemanticQueryIndex:
+    """Recent query embeddings per scope, searched for near-duplicates of a new query.
+
+    Each scope keeps at most ``max_per_scope`` unit vectors in a ring buffer, so a lookup is
+    one matrix-vector product over a few hundred rows: exact, and cheaper at this size than
+    maintaining an approximate index. Scopes themselves are evicted least recently used.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_per_scope: int = 256, max_scopes: int = 1024):
+        """Create the index.
+
+        Args:
+            threshold: Minimum cosine similarity for a query to count as a near-duplicate
+            max_per_scope: Recent queries remembered per scope
+            max_scopes: Scopes remembered in total
+        """
+        self.threshold = threshold
+        self.max_per_scope = max_per_scope
+        self.max_scopes = max_scopes
+        # scope -> (vector matrix, result keys, next row to overwrite)
+        self._scopes: 'OrderedDict[str, List[Any]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(len(keys) for _, keys, _ in self._scopes.values())
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm > 0 else None
+
+    def find(self, scope: str, vector: Sequence[float]) -> Optional[Tuple[str, float]]:
+        """Return (result key, similarity) of the most similar recent query, if above threshold."""
+        entry = self._scopes.get(scope)
+        unit = self._unit(vector)
+        if entry is None or unit is None:
+            return None
+        matrix, keys, _ = entry
+        if matrix.shape[1] != unit.shape[0]:
+            return None
+        self._scopes.move_to_end(scope)
+        similarities = matrix[: len(keys)] @ unit
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.threshold:
+            return None
+        return keys[best], similarity
+
+    def add(self, scope: str, vector: Sequence[float], key: str) -> None:
+        """Remember the embedding of a query whose result is cached under key."""
+        unit = self._unit(vector)
+        if unit is None:
+            return
+        entry = self._scopes.get(scope)
+        if entry is None or entry[0].shape[1] != unit.shape[0]:
+            entry = [np.zeros((self.max_per_scope, unit.shape[0]), dtype=np.float32), [], 0]
+            self._scopes[scope] = entry
+        self._scopes.move_to_end(scope)
+        matrix, keys, row = entry
+        matrix[row] = unit
+        if row < len(keys):
+            keys[row] = key
+        else:
+            keys.append(key)
+        entry[2] = (row + 1) % self.max_per_scope
+        while len(self._scopes) > self.max_scopes:
+            self._scopes.popitem(last=False)
+
+    def clear(self) -> None:
+        self._scopes.clear()
+
+
+class RedisSearchCacheBackend:
+    """Shared second-level cache and generation counters stored in Redis."""
+
+    def __init__(self, url: str, prefix: str = 'graphiti:search:'):
+        """Connect lazily to Redis.
+
+        Args:
+            url: Redis URL, e.g. redis://localhost:6379/0
+            prefix: Namespace for all keys written by the cache
+        """
+        if not HAS_REDIS:
+            raise ImportError("The shared search cache needs the 'redis' package (install the 'redis' extra)")
+        self.url = url
+        self.prefix = prefix
+        self._client = aioredis.from_url(url)
+
+    def _generation_key(self, name: str) -> str:
+        return f'{self.prefix}gen:{name}'
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._client.get(self.prefix + key)
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        await self._client.set(self.prefix + key, value, px=max(1, int(ttl_seconds * 1000)))
+
+    async def generations(self, names: Sequence[str]) -> List[int]:
+        values = await self._client.mget([self._generation_key(name) for name in names])
+        return [int(value) if value is not None else 0 for value in values]
+
+    async def bump(self, name: str) -> None:
+        await self._client.incr(self._generation_key(name))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class SearchResultCache:
+    """Two-level (in-process LRU + optional shared backend) cache of search tool responses."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 300.0,
+        backend: Optional[RedisSearchCacheBackend] = None,
+        semantic: Optional[SemanticQueryIndex] = None,
+    ):
+        """Create the cache.
+
+        Args:
+            max_entries: Capacity of the in-process LRU
+            ttl_seconds: Lifetime of an entry; bounds staleness from writes made outside this
+                server (e.g. other graphiti clients writing to the same Neo4j database)
+            backend: Optional shared second level holding entries and generation counters
+            semantic: Optional index serving near-duplicate queries from cached results
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self.semantic = semantic
+        # key -> (expires_at, serialized response)
+        self._lru: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.backend_errors = 0
+
+    async def _current_generations(self, group_ids: Sequence[str]) -> Optional[List[int]]:
+        names = [ALL_GROUPS, *group_ids]
+        if self.backend is None:
+            return [self._generations.get(name, 0) for name in names]
+        try:
+            return await self.backend.generations(names)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f'Search cache backend unavailable, bypassing cache: {e}')
+            return None
+
+    async def make_keys(self, tool: str, params: Mapping[str, Any]) -> Optional[SearchCacheKeys]:
+        """Return the cache keys of a search call, or None if the cache cannot be used right now.
+
+        The key covers the tool, the normalized query, the (unordered) group ids, every other
+        parameter that shapes the result, and the current generations of the searched groups;
+        the scope covers the same minus the query. Take the keys before running the search and
+        store the result under them, so a write that lands while the search runs cannot leave
+        its result cached as current.
+
+        Args:
+            tool: Tool name, e.g. 'search_nodes'
+            params: Search parameters; must include 'group_ids', and 'query' if any
+        """
+        group_ids = sorted(set(params.get('group_ids') or []))
+        generations = await self._current_generations(group_ids)
+        if generations is None:
+            return None
+        normalized = dict(params)
+        normalized['group_ids'] = group_ids
+        query = normalized.pop('query', None)
+        scope = _digest({'tool': tool, 'params': normalized, 'generations': generations})
+        if isinstance(query, str):
+            query = normalize_text(query)
+        return SearchCacheKeys(key=_digest({'scope': scope, 'query': query}), scope=scope)
+
+    async def make_key(self, tool: str, params: Mapping[str, Any]) -> Optional[str]:
+        """Return the exact-match cache key of a search call (see make_keys)."""
+        keys = await self.make_keys(tool, params)
+        return keys.key if keys is not None else None
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for a key (a fresh copy), or None."""
+        serialized = await self._fetch(key)
+        if serialized is None:
+            self.misses += 1
+            return None
+        return json.loads(serialized)
+
+    async def get_similar(self, scope: str, query_vector: Sequence[float]) -> Optional[Any]:
+        """Return the cached response of a near-duplicate query in the same scope, or None.
+
+        Meant as a second chance after get() missed, so a semantic hit is also counted as a
+        miss of the exact lookup.
+        """
+        if self.semantic is None:
+            return None
+        match = self.semantic.find(scope, query_vector)
+        if match is None:
+            return None
+        key, similarity = match
+        serialized = await self._fetch(key, count=False)
+        if serialized is None:
+            return None
+        self.semantic_hits += 1
+        logger.debug(f'Serving search from a near-duplicate query (cosine {similarity:.3f})')
+        return json.loads(serialized)
+
+    async def _fetch(self, key: str, count: bool = True) -> Optional[str]:
+        now = time.monotonic()
+        entry = self._lru.get(key)
+        if entry is not None:
+            expires_at, serialized = entry
+            if expires_at > now:
+                self._lru.move_to_end(key)
+                if count:
+                    self.memory_hits += 1
+                return serialized
+            del self._lru[key]
+
+        if self.backend is not None:
+            try:
+                serialized = await self.backend.get(key)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.warning(f'Search cache backend read failed: {e}')
+                serialized = None
+            if serialized is not None:
+                self._remember(key, serialized, now)
+                if count:
+                    self.shared_hits += 1
+                return serialized
+        return None
+
+    def _remember(self, key: str, serialized: str, now: float) -> None:
+        self._lru[key] = (now + self.ttl_seconds, serialized)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def put(
+        self,
+        key: str,
+        response: Any,
+        scope: Optional[str] = None,
+        query_vector: Optional[Sequence[float]] = None,
+    ) -> None:
+        """Store a JSON-serializable response under a key from make_keys.
+
+        With a scope and the query embedding, the query also becomes a candidate for
+        near-duplicate matching.
+        """
+        serialized = json.dumps(response)
+        self._remember(key, serialized, time.monotonic())
+        self.stores += 1
+        if self.semantic is not None and scope is not None and query_vector is not None:
+            self.semantic.add(scope, query_vector, key)
+        if self.backend is not None:
+            try:
+                await self.backend.set(key, serialized, self.ttl_seconds)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.warning(f'Search cache backend write failed: {e}')
+
+    async def invalidate(self, group_ids: Sequence[str]) -> None:
+        """Bump the generation of each group, making its cached results unreachable."""
+        for group_id in dict.fromkeys(group_ids):
+            await self._bump(group_id)
+
+    async def invalidate_all(self) -> None:
+        """Make every cached result unreachable (e.g. after the graph was cleared)."""
+        await self._bump(ALL_GROUPS)
+        self._lru.clear()
+        if self.semantic is not None:
+            self.semantic.clear()
+
+    async def _bump(self, name: str) -> None:
+        self._generations[name] = self._generations.get(name, 0) + 1
+        self.invalidations += 1
+        if self.backend is not None:
+            try:
+                await self.backend.bump(name)
+            except Exception as e:
+                # Other replicas keep serving their copies until the TTL expires
+                self.backend_errors += 1
+                logger.warning(f"Search cache backend could not invalidate '{name}': {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the cache."""
+        # Every lookup starts with an exact get(); semantic hits are a subset of its misses
+        lookups = self.memory_hits + self.shared_hits + self.misses
+        hits = self.memory_hits + self.shared_hits + self.semantic_hits
+        return {
+            'entries': len(self._lru),
+            'capacity': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'shared_backend': self.backend is not None,
+            'memory_hits': self.memory_hits,
+            'shared_hits': self.shared_hits,
+            'semantic_hits': self.semantic_hits,
+            'semantic_threshold': self.semantic.threshold if self.semantic is not None else None,
+            'semantic_queries': len(self.semantic) if self.semantic is not None else 0,
+            'misses': self.misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+            'stores': self.stores,
+            'invalidations': self.invalidations,
+            'backend_errors': self.backend_errors,
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the counters (cached results are kept)."""
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.backend_errors = 0
+
+    def prometheus_lines(self) -> List[str]:
+        """Render the cache counters in Prometheus text exposition format."""
+        lines = prometheus_header('graphiti_search_cache_lookups_total', 'counter', 'Search result cache lookups by result')
+        for result, value in (('memory_hit', self.memory_hits), ('shared_hit', self.shared_hits), ('miss', self.misses)):
+            lines.append(f'graphiti_search_cache_lookups_total{format_labels({"result": result})} {value}')
+        lines.extend(prometheus_header(
+            'graphiti_search_cache_semantic_hits_total', 'counter', 'Exact misses served from a near-duplicate query'
+        ))
+        lines.append(f'graphiti_search_cache_semantic_hits_total{format_labels({})} {self.semantic_hits}')
+        lines.extend(prometheus_header('graphiti_search_cache_invalidations_total', 'counter', 'Group generation bumps'))
+        lines.append(f'graphiti_search_cache_invalidations_total{format_labels({})} {self.invalidations}')
+        lines.extend(prometheus_header('graphiti_search_cache_entries', 'gauge', 'Results held in the in-process cache'))
+        lines.append(f'graphiti_search_cache_entries{format_labels({})} {len(self._lru)}')
+        return lines
+
+    async def close(self) -> None:
+        """Close the shared backend connection, if any."""
+        if self.backend is not None:
+            await self.backend.close()
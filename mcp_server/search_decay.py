@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Recency and importance decay scoring of search candidates for the Graphiti MCP server.
+
+graphiti-core ranks candidates by relevance alone, so on long-lived groups old facts crowd
+out recent ones. With decay, the ranked candidate list of a search (several pages deep) is
+re-scored in one vectorized pass: the relevance of each rank is blended with an exponential
+decay of its age and, where the entity or fact has one, an importance level. No further
+query is run, so a small page size still surfaces relevant recent results.
+"""
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+import numpy as np
+
+T = TypeVar('T')
+
+# Attributes of custom entity types that carry an importance level, in order of preference
+IMPORTANCE_ATTRIBUTES = ('importance_level', 'severity')
+IMPORTANCE_LEVELS = {'critical': 1.0, 'high': 0.75, 'medium': 0.5, 'low': 0.25}
+# Importance of candidates without an importance level
+NEUTRAL_IMPORTANCE = 0.5
+
+SECONDS_PER_DAY = 86400.0
+
+
+@dataclass(frozen=True)
+class DecayPolicy:
+    """Half-life of the recency decay and the weights of recency and importance in the score.
+
+    Relevance gets the remaining weight, 1 - recency_weight - importance_weight.
+    """
+
+    half_life_days: float = 30.0
+    recency_weight: float = 0.3
+    importance_weight: float = 0.1
+
+    def __post_init__(self):
+        if not self.half_life_days > 0:
+            raise ValueError('half_life_days must be positive')
+        if self.recency_weight < 0 or self.importance_weight < 0:
+            raise ValueError('Decay weights must not be negative')
+        if self.recency_weight + self.importance_weight > 1:
+            raise ValueError('recency_weight and importance_weight must add up to at most 1')
+
+    def with_half_life(self, half_life_days: Optional[float]) -> 'DecayPolicy':
+        """Return the policy with another half-life (unchanged for None).
+
+        Raises:
+            ValueError: If the half-life is not a positive number
+        """
+        if half_life_days is None:
+            return self
+        try:
+            return replace(self, half_life_days=float(half_life_days))
+        except TypeError as e:
+            raise ValueError('half_life_days must be a number') from e
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the policy as a JSON-serializable dict (also used in search cache keys)."""
+        return {
+            'half_life_days': self.half_life_days,
+            'recency_weight': self.recency_weight,
+            'importance_weight': self.importance_weight,
+        }
+
+
+def importance_of(attributes: Dict[str, Any]) -> float:
+    """Return the importance (0-1) of a candidate from its attributes.
+
+    Levels (critical, high, medium, low) and numbers between 0 and 1 are understood; other
+    candidates get NEUTRAL_IMPORTANCE.
+    """
+    for name in IMPORTANCE_ATTRIBUTES:
+        value = attributes.get(name)
+        if isinstance(value, str) and value.strip().lower() in IMPORTANCE_LEVELS:
+            return IMPORTANCE_LEVELS[value.strip().lower()]
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value <= 1:
+            return float(value)
+    return NEUTRAL_IMPORTANCE
+
+
+def decay_scores(
+    timestamps: np.ndarray,
+    importance: np.ndarray,
+    policy: DecayPolicy,
+    now: float,
+) -> np.ndarray:
+    """Return the blended score of ranked candidates.
+
+    Args:
+        timestamps: POSIX time of each candidate in rank order (NaN if unknown)
+        importance: Importance (0-1) of each candidate
+        policy: Half-life and weights
+        now: POSIX time the ages are measured from
+    """
+    count = len(timestamps)
+    # graphiti-core returns no scores, so relevance falls linearly from 1 for the top rank
+    relevance = 1.0 - np.arange(count) / max(count, 1)
+    age_days = np.maximum(now - timestamps, 0.0) / SECONDS_PER_DAY
+    recency = np.where(np.isnan(timestamps), 0.0, np.power(0.5, age_days / policy.half_life_days))
+    relevance_weight = 1.0 - policy.recency_weight - policy.importance_weight
+    return relevance_weight * relevance + policy.recency_weight * recency + policy.importance_weight * importance
+
+
+def rescore(
+    candidates: Sequence[T],
+    timestamp: Callable[[T], Optional[datetime]],
+    attributes: Callable[[T], Dict[str, Any]],
+    policy: DecayPolicy,
+    now: Optional[datetime] = None,
+) -> List[T]:
+    """Reorder ranked candidates by their decay score (ties keep the relevance order).
+
+    Args:
+        candidates: Candidates in relevance order
+        timestamp: Time of a candidate the decay applies to (e.g. when a fact became valid)
+        attributes: Attributes of a candidate holding its importance
+        policy: Half-life and weights
+        now: Time the ages are measured from (default: now)
+    """
+    if len(candidates) < 2:
+        return list(candidates)
+    times = [timestamp(candidate) for candidate in candidates]
+    timestamps = np.array([t.timestamp() if t is not None else np.nan for t in times], dtype=float)
+    importance = np.array([importance_of(attributes(candidate) or {}) for candidate in candidates], dtype=float)
+    scores = decay_scores(timestamps, importance, policy, (now or datetime.now(timezone.utc)).timestamp())
+    order = np.argsort(-scores, kind='stable')
+    return [candidates[i] for i in order]
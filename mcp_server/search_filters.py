@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Label, attribute and time filters pushed down into the Cypher of Graphiti searches.
+
+graphiti-core's SearchFilters turn labels into node predicates and time ranges into edge
+predicates, but node searches ignore everything except labels. PushdownSearchFilters adds
+attribute predicates (typed against the registered entity models when an entity type is
+named) and a point in time for facts, and install_filter_pushdown() wraps graphiti-core's
+filter constructors so those predicates, node created_at ranges and fact validity at as_of
+become part of the search queries, instead of clients over-fetching and filtering the
+results themselves. graphiti-core's node fulltext search limits its hits before filtering
+them, so with filters it is replaced by one that filters first.
+"""
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional, Tuple, Type
+
+from graphiti_core.graph_queries import get_nodes_query
+from graphiti_core.nodes import ENTITY_NODE_RETURN, get_entity_node_from_record
+from graphiti_core.search import search as graphiti_search_module
+from graphiti_core.search import search_utils
+from graphiti_core.search.search_filters import ComparisonOperator, DateFilter, SearchFilters
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Labels and property names are interpolated into Cypher, so only plain identifiers are allowed
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Node properties managed by Graphiti that are not attributes
+RESERVED_PROPERTIES = frozenset({'uuid', 'name', 'group_id', 'summary', 'name_embedding', 'created_at', 'labels'})
+
+OPERATORS = {
+    '=': '=',
+    '==': '=',
+    '!=': '<>',
+    '<>': '<>',
+    '<': '<',
+    '<=': '<=',
+    '>': '>',
+    '>=': '>=',
+    'in': 'IN',
+    'contains': 'CONTAINS',
+    'starts_with': 'STARTS WITH',
+}
+
+PARAM_PREFIX = 'pushdown_'
+
+# Fulltext hits read per requested node when node filters must be applied to them
+FILTERED_FULLTEXT_FACTOR = 20
+
+# Composite indexes for fact searches of a group bounded by validity (e.g. with as_of);
+# graphiti-core only indexes the temporal edge properties on their own
+TEMPORAL_INDEX_STATEMENTS = [
+    'CREATE INDEX relates_to_group_valid_at IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.group_id, r.valid_at)',
+    'CREATE INDEX relates_to_group_invalid_at IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.group_id, r.invalid_at)',
+]
+
+
+class FilterError(ValueError):
+    """Raised for filters that cannot be translated (unknown labels, properties or operators)."""
+
+
+class AttributePredicate(BaseModel):
+    """A comparison of a node property, optionally restricted to one entity type."""
+
+    property: str
+    op: Literal['=', '<>', '<', '<=', '>', '>=', 'IN', 'CONTAINS', 'STARTS WITH'] = '='
+    value: Any = None
+    entity: Optional[str] = None
+
+
+class PushdownSearchFilters(SearchFilters):
+    """SearchFilters with node attribute predicates and a fact validity time.
+
+    Both are applied together with the inherited filters.
+    """
+
+    attribute_predicates: List[AttributePredicate] = []
+    as_of: Optional[datetime] = None
+
+
+def check_identifier(value: str, what: str) -> str:
+    """Return value if it is a plain identifier usable as a Cypher label or property name."""
+    if not isinstance(value, str) or not IDENTIFIER.match(value):
+        raise FilterError(f'Invalid {what} {value!r}')
+    return value
+
+
+def parse_time(value: str, what: str) -> datetime:
+    """Parse an ISO 8601 timestamp (naive timestamps are taken as UTC)."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError) as e:
+        raise FilterError(f'{what} must be an ISO 8601 timestamp, got {value!r}') from e
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def time_range(after: Optional[str], before: Optional[str], what: str) -> Optional[List[List[DateFilter]]]:
+    """Translate an after/before pair into SearchFilters date filters (one AND group)."""
+    bounds = []
+    if after:
+        bounds.append(
+            DateFilter(date=parse_time(after, f'{what}_after'), comparison_operator=ComparisonOperator.greater_than_equal)
+        )
+    if before:
+        bounds.append(
+            DateFilter(date=parse_time(before, f'{what}_before'), comparison_operator=ComparisonOperator.less_than)
+        )
+    return [bounds] if bounds else None
+
+
+def edge_validity_clause(var: str, param: str, current_only: bool) -> str:
+    """Return a Cypher predicate for edges valid at the time in $param.
+
+    With current_only the edge must also not have been expired (superseded) since; leave it
+    out for historical points in time, where edges expired later were still valid.
+    """
+    clause = (
+        f'({var}.valid_at IS NULL OR {var}.valid_at <= ${param}) '
+        f'AND ({var}.invalid_at IS NULL OR {var}.invalid_at > ${param})'
+    )
+    if current_only:
+        clause += f' AND {var}.expired_at IS NULL'
+    return clause
+
+
+def parse_attribute_predicate(spec: Any, entity_types: Dict[str, Type[BaseModel]]) -> AttributePredicate:
+    """Validate one attribute filter object from a tool call.
+
+    The object has a property, an op (=, ==, !=, <, <=, >, >=, in, contains, starts_with;
+    default =) and a value. When it names an entity type, the property must be a field of
+    that type's model and the value is validated against the field's type.
+    """
+    if not isinstance(spec, dict):
+        raise FilterError('Attribute filters must be objects with "property", "op" and "value"')
+    prop = check_identifier(spec.get('property'), 'property')
+    if prop in RESERVED_PROPERTIES:
+        raise FilterError(f'{prop!r} is not an attribute; use the dedicated search parameters')
+    op = OPERATORS.get(str(spec.get('op', '=')).lower())
+    if op is None:
+        raise FilterError(f'Unknown operator {spec.get("op")!r}; available operators: {", ".join(OPERATORS)}')
+    value = spec.get('value')
+    if op == 'IN' and not isinstance(value, list):
+        raise FilterError(f'The "in" operator needs a list value for {prop!r}')
+    if op in ('CONTAINS', 'STARTS WITH') and not isinstance(value, str):
+        raise FilterError(f'The {spec.get("op")!r} operator needs a string value for {prop!r}')
+
+    entity = spec.get('entity')
+    if entity is not None:
+        check_identifier(entity, 'entity type')
+        model = entity_types.get(entity)
+        if model is None:
+            raise FilterError(f'Unknown entity type {entity!r}')
+        field = model.model_fields.get(prop)
+        if field is None:
+            raise FilterError(f'{entity} has no attribute {prop!r}; attributes: {", ".join(model.model_fields)}')
+        # Validate against the field type, then store the JSON form Graphiti writes to the node
+        if op not in ('CONTAINS', 'STARTS WITH'):
+            adapter = TypeAdapter(List[field.annotation] if op == 'IN' else field.annotation)
+            try:
+                value = adapter.dump_python(adapter.validate_python(value), mode='json')
+            except ValidationError as e:
+                raise FilterError(f'Invalid value for {entity}.{prop}: {e.errors()[0]["msg"]}') from e
+    return AttributePredicate(property=prop, op=op, value=value, entity=entity)
+
+
+def build_node_filters(
+    labels: Optional[List[str]] = None,
+    attribute_filters: Optional[List[Any]] = None,
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+    entity_types: Optional[Dict[str, Type[BaseModel]]] = None,
+) -> SearchFilters:
+    """Build the filters of a node search.
+
+    Args:
+        labels: Node labels, any of which a result must have
+        attribute_filters: Attribute filter objects (see parse_attribute_predicate)
+        created_after: Only nodes created at or after this ISO 8601 timestamp
+        created_before: Only nodes created before this ISO 8601 timestamp
+        entity_types: Registered entity models used to type attribute filters
+
+    Raises:
+        FilterError: If a label, property, operator, value or timestamp is invalid
+    """
+    node_labels = [check_identifier(label, 'entity type') for label in dict.fromkeys(labels or [])] or None
+    predicates = [parse_attribute_predicate(spec, entity_types or {}) for spec in attribute_filters or []]
+    return PushdownSearchFilters(
+        node_labels=node_labels,
+        created_at=time_range(created_after, created_before, 'created'),
+        attribute_predicates=predicates,
+    )
+
+
+def build_edge_filters(
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+    valid_after: Optional[str] = None,
+    valid_before: Optional[str] = None,
+    as_of: Optional[str] = None,
+) -> SearchFilters:
+    """Build the filters of a fact search from created_at and valid_at ranges and a validity time.
+
+    With as_of only facts valid at that time are kept: valid_at not after it and invalid_at
+    (if any) after it.
+
+    Raises:
+        FilterError: If a timestamp is invalid
+    """
+    return PushdownSearchFilters(
+        created_at=time_range(created_after, created_before, 'created'),
+        valid_at=time_range(valid_after, valid_before, 'valid'),
+        as_of=parse_time(as_of, 'as_of') if as_of else None,
+    )
+
+
+def node_pushdown_query(filters: SearchFilters) -> Tuple[str, Dict[str, Any]]:
+    """Return the Cypher predicates (on n) and parameters that graphiti-core leaves out for nodes."""
+    clauses: List[str] = []
+    params: Dict[str, Any] = {}
+
+    if filters.created_at:
+        groups = []
+        for i, and_group in enumerate(filters.created_at):
+            terms = []
+            for j, date_filter in enumerate(and_group):
+                name = f'{PARAM_PREFIX}created_at_{i}_{j}'
+                params[name] = date_filter.date
+                terms.append(f'n.created_at {date_filter.comparison_operator.value} ${name}')
+            groups.append('(' + ' AND '.join(terms) + ')')
+        clauses.append('(' + ' OR '.join(groups) + ')')
+
+    for i, predicate in enumerate(getattr(filters, 'attribute_predicates', None) or []):
+        name = f'{PARAM_PREFIX}attr_{i}'
+        params[name] = predicate.value
+        clause = f'n.{predicate.property} {predicate.op} ${name}'
+        if predicate.entity is not None:
+            clause = f'(n:{predicate.entity} AND {clause})'
+        clauses.append(clause)
+
+    query = ''.join(f'\nAND {clause}' for clause in clauses)
+    return query, params
+
+
+def edge_pushdown_query(filters: SearchFilters) -> Tuple[str, Dict[str, Any]]:
+    """Return the Cypher predicate (on r) and parameters for the validity time of fact searches."""
+    as_of = getattr(filters, 'as_of', None)
+    if as_of is None:
+        return '', {}
+    name = f'{PARAM_PREFIX}as_of'
+    return f'\nAND {edge_validity_clause("r", name, current_only=False)}', {name: as_of}
+
+
+_original_node_filter_constructor = search_utils.node_search_filter_query_constructor
+_original_edge_filter_constructor = search_utils.edge_search_filter_query_constructor
+
+
+def _node_filter_constructor_with_pushdown(filters: SearchFilters) -> Tuple[str, Dict[str, Any]]:
+    query, params = _original_node_filter_constructor(filters)
+    extra_query, extra_params = node_pushdown_query(filters)
+    return query + extra_query, {**params, **extra_params}
+
+
+def _edge_filter_constructor_with_pushdown(filters: SearchFilters) -> Tuple[str, Dict[str, Any]]:
+    query, params = _original_edge_filter_constructor(filters)
+    extra_query, extra_params = edge_pushdown_query(filters)
+    return query + extra_query, {**params, **extra_params}
+
+
+_original_node_fulltext_search = graphiti_search_module.node_fulltext_search
+
+
+def node_fulltext_query(provider: str, filter_query: str) -> str:
+    """Build a node fulltext search that filters the hits before limiting them."""
+    if provider == 'neo4j':
+        call = 'CALL db.index.fulltext.queryNodes("node_name_and_summary", $query, {limit: $fulltext_limit})'
+    else:
+        call = get_nodes_query(provider, 'node_name_and_summary', '$query')
+    return (
+        call
+        + """
+        YIELD node AS n, score
+        WITH n, score
+        WHERE n:Entity"""
+        + filter_query
+        + """
+        WITH n, score
+        ORDER BY score DESC
+        LIMIT $limit
+        """
+        + ENTITY_NODE_RETURN
+        + """
+        ORDER BY score DESC
+        """
+    )
+
+
+async def _node_fulltext_search_with_pushdown(
+    driver: Any,
+    query: str,
+    search_filter: SearchFilters,
+    group_ids: Optional[List[str]] = None,
+    limit: int = search_utils.RELEVANT_SCHEMA_LIMIT,
+) -> list:
+    # graphiti-core applies LIMIT before the filter, so narrow filters would lose matches
+    filter_query, filter_params = search_utils.node_search_filter_query_constructor(search_filter)
+    fuzzy_query = search_utils.fulltext_query(query, group_ids)
+    if not filter_query or fuzzy_query == '':
+        return await _original_node_fulltext_search(driver, query, search_filter, group_ids, limit)
+    records, _, _ = await driver.execute_query(
+        node_fulltext_query(driver.provider, filter_query),
+        params=filter_params,
+        query=fuzzy_query,
+        group_ids=group_ids,
+        limit=limit,
+        fulltext_limit=limit * FILTERED_FULLTEXT_FACTOR,
+        routing_='r',
+    )
+    return [get_entity_node_from_record(record) for record in records]
+
+
+def install_filter_pushdown() -> None:
+    """Make graphiti-core searches apply the filters graphiti-core leaves out (idempotent).
+
+    Node searches get created_at ranges and attribute predicates, fact searches as_of, and
+    node fulltext searches filter their hits before limiting them. Install before wrappers of
+    graphiti-core's search methods (timing, streaming) so they wrap the replacement.
+    """
+    if search_utils.node_search_filter_query_constructor is not _node_filter_constructor_with_pushdown:
+        search_utils.node_search_filter_query_constructor = _node_filter_constructor_with_pushdown
+        logger.info('Search filter pushdown installed for node searches')
+    if search_utils.edge_search_filter_query_constructor is not _edge_filter_constructor_with_pushdown:
+        search_utils.edge_search_filter_query_constructor = _edge_filter_constructor_with_pushdown
+        logger.info('Search filter pushdown installed for fact searches')
+    if graphiti_search_module.node_fulltext_search is _original_node_fulltext_search:
+        graphiti_search_module.node_fulltext_search = _node_fulltext_search_with_pushdown
+
+
+def attribute_index_statements(entity_types: Dict[str, Type[BaseModel]]) -> List[str]:
+    """Return CREATE INDEX statements for the attributes of the registered entity types."""
+    statements = []
+    for label, model in sorted(entity_types.items()):
+        if not IDENTIFIER.match(label):
+            continue
+        for prop in model.model_fields:
+            if not IDENTIFIER.match(prop) or prop in RESERVED_PROPERTIES:
+                continue
+            statements.append(
+                f'CREATE INDEX attr_{label.lower()}_{prop.lower()} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})'
+            )
+    return statements
+
+
+async def ensure_indexes(driver: Any, statements: List[str]) -> int:
+    """Run CREATE INDEX ... IF NOT EXISTS statements.
+
+    Returns the number of statements run; failures are logged and skipped, since a missing
+    index only makes the queries using it slower.
+    """
+    created = 0
+    for statement in statements:
+        try:
+            await driver.execute_query(statement)
+            created += 1
+        except Exception as e:
+            logger.warning(f'Could not create index ({statement}): {e}')
+    return created
+
+
+async def ensure_attribute_indexes(driver: Any, entity_types: Dict[str, Type[BaseModel]]) -> int:
+    """Create range indexes for the attribute predicates of the registered entity types."""
+    return await ensure_indexes(driver, attribute_index_statements(entity_types))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Reranker selection for the search tools of the Graphiti MCP server.
+
+Each search tool call names a reranker (or gets the server default from the RerankPolicy),
+which selects one of graphiti-core's hybrid search recipes. The SearchConfig for a
+(kind, reranker, limit) combination is built once and shared by every search using it; the
+search function only reads it, so no per-call copy is needed.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from graphiti_core.search.search_config import SearchConfig
+from graphiti_core.search.search_config_recipes import (
+    EDGE_HYBRID_SEARCH_CROSS_ENCODER,
+    EDGE_HYBRID_SEARCH_EPISODE_MENTIONS,
+    EDGE_HYBRID_SEARCH_MMR,
+    EDGE_HYBRID_SEARCH_NODE_DISTANCE,
+    EDGE_HYBRID_SEARCH_RRF,
+    NODE_HYBRID_SEARCH_CROSS_ENCODER,
+    NODE_HYBRID_SEARCH_EPISODE_MENTIONS,
+    NODE_HYBRID_SEARCH_MMR,
+    NODE_HYBRID_SEARCH_NODE_DISTANCE,
+    NODE_HYBRID_SEARCH_RRF,
+)
+
+from mcp_server.metrics import Histogram, prometheus_header, prometheus_histogram_lines
+
+# Rerankers from cheapest to most expensive: rrf and mmr run in-process, node_distance and
+# episode_mentions add a graph query, cross_encoder calls a model for every candidate
+RERANKERS = ('rrf', 'mmr', 'node_distance', 'episode_mentions', 'cross_encoder')
+
+# Rerankers calling a model once per candidate; they rank only the requested page, so a call
+# costs about one model call per result instead of one per cursor snapshot candidate
+PAGE_ONLY_RERANKERS = frozenset({'cross_encoder'})
+
+# Rerank latency buckets in milliseconds; in-process rerankers take well under a millisecond
+RERANK_LATENCY_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+RECIPES: Dict[Tuple[str, str], SearchConfig] = {
+    ('nodes', 'rrf'): NODE_HYBRID_SEARCH_RRF,
+    ('nodes', 'mmr'): NODE_HYBRID_SEARCH_MMR,
+    ('nodes', 'node_distance'): NODE_HYBRID_SEARCH_NODE_DISTANCE,
+    ('nodes', 'episode_mentions'): NODE_HYBRID_SEARCH_EPISODE_MENTIONS,
+    ('nodes', 'cross_encoder'): NODE_HYBRID_SEARCH_CROSS_ENCODER,
+    ('facts', 'rrf'): EDGE_HYBRID_SEARCH_RRF,
+    ('facts', 'mmr'): EDGE_HYBRID_SEARCH_MMR,
+    ('facts', 'node_distance'): EDGE_HYBRID_SEARCH_NODE_DISTANCE,
+    ('facts', 'episode_mentions'): EDGE_HYBRID_SEARCH_EPISODE_MENTIONS,
+    ('facts', 'cross_encoder'): EDGE_HYBRID_SEARCH_CROSS_ENCODER,
+}
+
+
+@lru_cache(maxsize=256)
+def get_search_config(kind: str, reranker: str, limit: int) -> SearchConfig:
+    """Return the shared SearchConfig of a recipe with the given limit.
+
+    The config is cached and shared between calls: treat it as read-only (Graphiti.search
+    sets the limit on the config it is given, so pass it to graphiti_core.search.search.search).
+    """
+    return RECIPES[(kind, reranker)].model_copy(update={'limit': limit})
+
+
+def ranking_depth(reranker: str, page_size: int, pages: int, max_depth: int) -> int:
+    """Return how many results a first search page ranks (the rest are served through cursors).
+
+    A search ranks pages pages of page_size results, at most max_depth but never less than
+    one page. PAGE_ONLY_RERANKERS rank only the page itself, so their results have no
+    further pages.
+    """
+    if reranker in PAGE_ONLY_RERANKERS or pages <= 1:
+        return page_size
+    return max(page_size, min(page_size * pages, max_depth))
+
+
+def parse_rerankers(value: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated reranker list (None or empty for all rerankers)."""
+    if not value:
+        return None
+    return [name.strip().lower() for name in value.split(',') if name.strip()]
+
+
+class RerankPolicy:
+    """Server-level choice of the reranker used when a call names none, and of the allowed ones."""
+
+    def __init__(self, default: str = 'rrf', allowed: Optional[Iterable[str]] = None):
+        """Create the policy.
+
+        Args:
+            default: Reranker of calls that name none and have no center node
+            allowed: Rerankers clients may request (all by default)
+
+        Raises:
+            ValueError: If a reranker is unknown or the default is not allowed
+        """
+        self.allowed = set(allowed) if allowed is not None else set(RERANKERS)
+        unknown = sorted(self.allowed - set(RERANKERS))
+        if unknown:
+            raise ValueError(f'Unknown rerankers {unknown}; available rerankers: {", ".join(RERANKERS)}')
+        if default not in self.allowed:
+            raise ValueError(f'Default reranker {default!r} is not among the allowed rerankers')
+        self.default = default
+
+    def disable(self, reranker: str) -> None:
+        """Disallow a reranker, e.g. cross_encoder when no cross encoder is configured."""
+        self.allowed.discard(reranker)
+        if self.default == reranker:
+            self.default = 'rrf'
+
+    def resolve(self, requested: Optional[str], center_node_uuid: Optional[str] = None) -> str:
+        """Return the reranker of a search call.
+
+        Calls with a center node default to node_distance.
+
+        Raises:
+            ValueError: If the reranker is unknown, not allowed, or needs a center node
+        """
+        if not requested:
+            if center_node_uuid is not None and 'node_distance' in self.allowed:
+                return 'node_distance'
+            return self.default
+        reranker = requested.lower()
+        if reranker not in RERANKERS:
+            raise ValueError(f'Unknown reranker {requested!r}; available rerankers: {", ".join(RERANKERS)}')
+        if reranker not in self.allowed:
+            raise ValueError(
+                f'Reranker {reranker!r} is disabled on this server; allowed rerankers: '
+                f'{", ".join(r for r in RERANKERS if r in self.allowed)}'
+            )
+        if reranker == 'node_distance' and center_node_uuid is None:
+            raise ValueError('The node_distance reranker needs a center_node_uuid')
+        return reranker
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the policy as a JSON-serializable dict."""
+        return {'default': self.default, 'allowed': [r for r in RERANKERS if r in self.allowed]}
+
+
+class RerankStats:
+    """Rerank latency per reranker."""
+
+    def __init__(self):
+        self.latency: Dict[str, Histogram] = {}
+
+    def observe(self, reranker: str, elapsed_ms: float) -> None:
+        """Record the rerank time of one search."""
+        self.latency.setdefault(reranker, Histogram(RERANK_LATENCY_BUCKETS_MS)).observe(elapsed_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the latencies."""
+        cache = get_search_config.cache_info()
+        return {
+            'latency': {reranker: histogram.snapshot() for reranker, histogram in sorted(self.latency.items())},
+            'search_configs': {'cached': cache.currsize, 'hits': cache.hits, 'misses': cache.misses},
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the latencies."""
+        self.latency.clear()
+
+    def prometheus_lines(self) -> List[str]:
+        """Render the latencies in the Prometheus text format."""
+        name = 'graphiti_search_rerank_duration_ms'
+        lines = prometheus_header(name, 'histogram', 'Rerank time of searches by reranker, in milliseconds.')
+        for reranker, histogram in sorted(self.latency.items()):
+            lines.extend(prometheus_histogram_lines(name, {'reranker': reranker}, histogram))
+        return lines
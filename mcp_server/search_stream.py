@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Progressive results for streamed Graphiti searches.
+
+graphiti-core only returns a search once every search method has finished and the
+candidates are reranked. install_candidate_streaming() wraps its fulltext, similarity and
+BFS search functions so that, inside a stream_candidates() scope, each method's candidates
+are handed to a listener as soon as that method returns. ProgressiveResults is the listener
+of one tool call: it sends the candidates not sent yet to the client as a partial result
+and records the time to the first result, which StreamStats keeps apart from total time.
+"""
+import contextlib
+import functools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set
+
+from graphiti_core.search import search as graphiti_search_module
+
+from mcp_server.metrics import Histogram, prometheus_header, prometheus_histogram_lines
+
+logger = logging.getLogger(__name__)
+
+CandidateListener = Callable[[str, str, List[Any]], Awaitable[None]]
+
+# graphiti-core search functions whose results are candidates: (result kind, search method)
+CANDIDATE_FUNCTIONS = {
+    'node_fulltext_search': ('nodes', 'fulltext'),
+    'node_similarity_search': ('nodes', 'similarity'),
+    'node_bfs_search': ('nodes', 'bfs'),
+    'edge_fulltext_search': ('facts', 'fulltext'),
+    'edge_similarity_search': ('facts', 'similarity'),
+    'edge_bfs_search': ('facts', 'bfs'),
+}
+
+# Latency buckets in milliseconds for time to first result and total time of streamed searches
+STREAM_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_listener: ContextVar[Optional[CandidateListener]] = ContextVar('search_candidate_listener', default=None)
+
+
+@contextlib.contextmanager
+def stream_candidates(listener: Optional[CandidateListener]) -> Iterator[None]:
+    """Pass the candidates of searches run inside the block to listener (no-op for None)."""
+    token = _listener.set(listener)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def _streaming(kind: str, method: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        results = await func(*args, **kwargs)
+        listener = _listener.get()
+        if listener is not None and results:
+            try:
+                await listener(kind, method, results)
+            except Exception as e:
+                # A client that went away must not fail the search itself
+                logger.warning(f'Could not stream {method} {kind} candidates: {e}')
+        return results
+
+    wrapper.__candidate_stream__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def install_candidate_streaming() -> None:
+    """Wrap graphiti-core's search methods so their candidates reach the listener (idempotent).
+
+    Install after other wrappers of these functions (e.g. the vector index mirror) so the
+    candidates they return are streamed too.
+    """
+    for name, (kind, method) in CANDIDATE_FUNCTIONS.items():
+        func = getattr(graphiti_search_module, name)
+        if not getattr(func, '__candidate_stream__', False):
+            setattr(graphiti_search_module, name, _streaming(kind, method, func))
+
+
+class ProgressiveResults:
+    """Candidate listener of one streamed search call.
+
+    Every search method's candidates that were not sent before are formatted and passed to
+    send (at most limit per method), and progress is reported per finished method.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        format_result: Callable[[Any], Dict[str, Any]],
+        limit: int,
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        progress: Optional[Callable[[float, Optional[float]], Awaitable[None]]] = None,
+    ):
+        """Create the listener.
+
+        Args:
+            kind: Result kind streamed ('nodes' or 'facts'); candidates of other kinds are ignored
+            format_result: Formatter of one candidate
+            limit: Maximum number of candidates per partial result
+            send: Coroutine function delivering a partial result to the client
+            progress: Coroutine function reporting (progress, total) to the client
+        """
+        self.kind = kind
+        self.format_result = format_result
+        self.limit = limit
+        self.send = send
+        self.progress = progress
+        self.started = time.perf_counter()
+        self.sent: Set[str] = set()
+        self.partials = 0
+        self.stages = 0
+        self.total_stages: Optional[int] = None
+        self.first_result_ms: Optional[float] = None
+
+    def expect_stages(self, search_methods: int) -> None:
+        """Set the number of progress steps: one per search method, plus the final result."""
+        self.total_stages = search_methods + 1
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    async def __call__(self, kind: str, method: str, results: List[Any]) -> None:
+        if kind != self.kind:
+            return
+        fresh = [result for result in results if result.uuid not in self.sent][: self.limit]
+        self.stages += 1
+        if fresh:
+            self.sent.update(result.uuid for result in fresh)
+            elapsed_ms = self.elapsed_ms()
+            if self.first_result_ms is None:
+                self.first_result_ms = elapsed_ms
+            self.partials += 1
+            await self.send(
+                {
+                    'partial': True,
+                    'stage': method,
+                    kind: [self.format_result(result) for result in fresh],
+                    'elapsed_ms': round(elapsed_ms, 3),
+                }
+            )
+        if self.progress is not None:
+            await self.progress(self.stages, self.total_stages)
+
+    async def finish(self) -> float:
+        """Report the final result as the last progress step and return the total time in milliseconds."""
+        total_ms = self.elapsed_ms()
+        if self.progress is not None:
+            try:
+                final = self.total_stages or self.stages + 1
+                await self.progress(final, final)
+            except Exception as e:
+                logger.warning(f'Could not report search progress: {e}')
+        return total_ms
+
+
+class StreamStats:
+    """Time to first result and total time of streamed searches, per tool."""
+
+    def __init__(self):
+        self.first_result: Dict[str, Histogram] = {}
+        self.total: Dict[str, Histogram] = {}
+
+    def observe(self, tool: str, first_result_ms: Optional[float], total_ms: float) -> None:
+        """Record a streamed search; one without partial results got its first result at the end."""
+        first = first_result_ms if first_result_ms is not None else total_ms
+        self.first_result.setdefault(tool, Histogram(STREAM_LATENCY_BUCKETS_MS)).observe(first)
+        self.total.setdefault(tool, Histogram(STREAM_LATENCY_BUCKETS_MS)).observe(total_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the latencies."""
+        return {
+            tool: {'first_result': self.first_result[tool].snapshot(), 'total': self.total[tool].snapshot()}
+            for tool in sorted(self.total)
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the latencies."""
+        self.first_result.clear()
+        self.total.clear()
+
+    def prometheus_lines(self) -> List[str]:
+        """Render the latencies in the Prometheus text format."""
+        lines = []
+        for name, histograms, help_text in (
+            (
+                'graphiti_search_first_result_ms',
+                self.first_result,
+                'Time to the first (partial) result of streamed searches, in milliseconds.',
+            ),
+            ('graphiti_search_streamed_duration_ms', self.total, 'Total time of streamed searches, in milliseconds.'),
+        ):
+            lines.extend(prometheus_header(name, 'histogram', help_text))
+            for tool, histogram in sorted(histograms.items()):
+                lines.extend(prometheus_histogram_lines(name, {'tool': tool}, histogram))
+        return lines
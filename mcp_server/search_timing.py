@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Per-request stage timings of Graphiti searches.
+
+collect_timings() opens a timing scope for one search; code running inside it (including
+tasks it gathers) adds elapsed milliseconds per stage with add_timing or stage(). The
+fulltext, similarity, BFS and rerank stages are measured by wrapping graphiti-core's search
+method and reranker functions (and the cross encoder); the server times query embedding,
+cache lookups, hydration and result formatting itself. SearchLatencyStats aggregates the
+stages of finished searches per tool and group and keeps the slowest recent searches.
+"""
+import asyncio
+import functools
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from graphiti_core.cross_encoder.client import CrossEncoderClient
+from graphiti_core.search import search as graphiti_search_module
+
+from mcp_server.metrics import Histogram, prometheus_header, prometheus_histogram_lines
+
+logger = logging.getLogger(__name__)
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('search_stage_timings', default=None)
+
+# graphiti-core search functions that make up reranking (fetching embeddings is part of MMR)
+RERANK_FUNCTIONS = (
+    'rrf',
+    'maximal_marginal_relevance',
+    'node_distance_reranker',
+    'episode_mentions_reranker',
+    'get_embeddings_for_nodes',
+    'get_embeddings_for_edges',
+)
+
+# graphiti-core search method functions by the stage they are timed as
+SEARCH_METHOD_STAGES = {
+    'node_fulltext_search': 'fulltext',
+    'edge_fulltext_search': 'fulltext',
+    'node_similarity_search': 'similarity',
+    'edge_similarity_search': 'similarity',
+    'node_bfs_search': 'bfs',
+    'edge_bfs_search': 'bfs',
+}
+
+# Stages in the order a search runs them; methods run concurrently, so stages can overlap
+SEARCH_STAGES = ('cache', 'embed', 'fulltext', 'similarity', 'bfs', 'rerank', 'decay', 'hydrate', 'format')
+
+# Stage latency buckets in milliseconds
+STAGE_LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Collect stage timings (milliseconds by stage) of the code run inside the block.
+
+    Scopes nest: when an inner scope closes, its timings are added to the enclosing one.
+    """
+    timings: Dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+        for name, elapsed_ms in timings.items():
+            add_timing(name, elapsed_ms)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Add the running time of the block to a stage of the current timing scope."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, (time.perf_counter() - started) * 1000)
+
+
+def add_timing(stage: str, elapsed_ms: float) -> None:
+    """Add time to a stage of the current timing scope (no-op outside one)."""
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + elapsed_ms
+
+
+def timed(stage: str, func: Callable) -> Callable:
+    """Wrap a sync or async function so its running time is added to a stage."""
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                add_timing(stage, (time.perf_counter() - started) * 1000)
+
+        async_wrapper.__wrapped_stage__ = stage  # type: ignore[attr-defined]
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            add_timing(stage, (time.perf_counter() - started) * 1000)
+
+    wrapper.__wrapped_stage__ = stage  # type: ignore[attr-defined]
+    return wrapper
+
+
+def install_search_timing() -> None:
+    """Time graphiti-core's search methods and reranker functions as their stages (idempotent).
+
+    Install after replacements of these functions (e.g. the vector index mirror) and before
+    wrappers whose own work should not count (e.g. candidate streaming).
+    """
+    stages = {**SEARCH_METHOD_STAGES, **{name: 'rerank' for name in RERANK_FUNCTIONS}}
+    for name, stage_name in stages.items():
+        func = getattr(graphiti_search_module, name)
+        if not hasattr(func, '__wrapped_stage__'):
+            setattr(graphiti_search_module, name, timed(stage_name, func))
+
+
+class TimedCrossEncoder(CrossEncoderClient):
+    """Cross encoder wrapper that adds its ranking time to the rerank stage."""
+
+    def __init__(self, inner: CrossEncoderClient):
+        self.inner = inner
+
+    async def rank(self, query: str, passages: List[str]) -> List[Tuple[str, float]]:
+        started = time.perf_counter()
+        try:
+            return await self.inner.rank(query, passages)
+        finally:
+            add_timing('rerank', (time.perf_counter() - started) * 1000)
+
+
+class SearchLatencyStats:
+    """Stage latencies of searches per tool and group, and a log of slow searches.
+
+    Groups beyond max_groups distinct group sets are counted as "other", so clients using
+    many groups cannot grow the metrics without bound.
+    """
+
+    def __init__(self, slow_ms: float = 1000.0, max_groups: int = 100, max_slow: int = 50):
+        """Create the statistics.
+
+        Args:
+            slow_ms: Searches taking at least this long are logged and kept (0 disables)
+            max_groups: Distinct group sets tracked separately
+            max_slow: Slow searches kept for get_search_stats
+        """
+        self.slow_ms = slow_ms
+        self.max_groups = max_groups
+        self.latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self.groups: set = set()
+        self.slow: Deque[Dict[str, Any]] = deque(maxlen=max_slow)
+        self.slow_count = 0
+
+    def _group_label(self, group_ids: Iterable[str]) -> str:
+        label = ','.join(sorted(group_ids)) or 'none'
+        if label not in self.groups:
+            if len(self.groups) >= self.max_groups:
+                return 'other'
+            self.groups.add(label)
+        return label
+
+    def observe(
+        self, tool: str, group_ids: Iterable[str], timings: Dict[str, float], total_ms: float, query: str = ''
+    ) -> bool:
+        """Record the stage timings and total time of one search; returns True if it was slow."""
+        group_ids = list(group_ids)
+        group = self._group_label(group_ids)
+        for name, elapsed_ms in [*timings.items(), ('total', total_ms)]:
+            key = (tool, group, name)
+            self.latency.setdefault(key, Histogram(STAGE_LATENCY_BUCKETS_MS)).observe(elapsed_ms)
+        if not self.slow_ms or total_ms < self.slow_ms:
+            return False
+        self.slow_count += 1
+        stages = {name: round(elapsed_ms, 3) for name, elapsed_ms in sorted(timings.items())}
+        self.slow.append(
+            {
+                'time': time.time(),
+                'tool': tool,
+                'group_ids': group_ids,
+                'query': query[:200],
+                'total_ms': round(total_ms, 3),
+                'stages': stages,
+            }
+        )
+        breakdown = ', '.join(f'{name}={elapsed_ms:.1f}ms' for name, elapsed_ms in stages.items())
+        logger.warning(f'Slow {tool} ({total_ms:.1f}ms) in groups {group_ids} for {query[:80]!r}: {breakdown}')
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot: latencies by tool, group and stage, and slow searches."""
+        latency: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (tool, group, name), histogram in sorted(self.latency.items()):
+            latency.setdefault(tool, {}).setdefault(group, {})[name] = histogram.snapshot()
+        return {
+            'latency': latency,
+            'slow_threshold_ms': self.slow_ms,
+            'slow_searches': self.slow_count,
+            'recent_slow': list(self.slow),
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the latencies and the slow search log."""
+        self.latency.clear()
+        self.groups.clear()
+        self.slow.clear()
+        self.slow_count = 0
+
+    def prometheus_lines(self) -> List[str]:
+        """Render the latencies in the Prometheus text format."""
+        name = 'graphiti_search_stage_duration_ms'
+        lines = prometheus_header(name, 'histogram', 'Time spent per search stage by tool and group, in milliseconds.')
+        for (tool, group, stage_name), histogram in sorted(self.latency.items()):
+            labels = {'tool': tool, 'group': group, 'stage': stage_name}
+            lines.extend(prometheus_histogram_lines(name, labels, histogram))
+        lines.extend(prometheus_header('graphiti_search_slow_total', 'counter', 'Searches slower than the threshold.'))
+        lines.append(f'graphiti_search_slow_total {self.slow_count}')
+        return lines
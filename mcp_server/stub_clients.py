@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Deterministic local stand-ins for the LLM, embedder and reranker used by the Graphiti MCP server.
+
+They let the episode queue, the Neo4j write path and the search tools be benchmarked without a
+provider: the LLM returns schema-valid structured outputs derived from the prompt, embeddings are
+hash-derived (feature hashing, so texts sharing words land close together), and every call sleeps
+for a configurable synthetic latency. Outputs depend only on the input and the seed.
+"""
+import asyncio
+import enum
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import typing
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from graphiti_core.cross_encoder.client import CrossEncoderClient
+from graphiti_core.embedder.client import EMBEDDING_DIM, EmbedderClient
+from graphiti_core.llm_client import LLMClient
+from graphiti_core.llm_client.config import LLMConfig, ModelSize
+from graphiti_core.prompts.models import Message
+from pydantic import BaseModel
+
+from mcp_server.llm_routing import get_prompt_type
+
+logger = logging.getLogger(__name__)
+
+STUB_MODEL_NAME = 'stub'
+# Upper bound on entities the stub "extracts" from one episode
+MAX_STUB_ENTITIES = 8
+
+_WORD_RE = re.compile(r'[\w-]+')
+_CAPITALIZED_RE = re.compile(r'\b[A-Z][\w-]{2,}\b')
+_ENTITY_ID_RE = re.compile(r"""['"]id['"]:\s*(\d+),\s*['"]name['"]:\s*['"]((?:[^'"\\]|\\.)*)['"]""")
+
+
+class LatencyModel:
+    """Synthetic latency distribution in milliseconds.
+
+    Specs have the form ``<distribution>[:<param>[:<param>]]``:
+        - ``none``                      no delay
+        - ``fixed:<ms>``                constant delay
+        - ``uniform:<min_ms>:<max_ms>`` uniform between the bounds
+        - ``normal:<mean_ms>:<std_ms>`` normal, clipped at zero
+        - ``lognormal:<median_ms>:<sigma>`` log-normal (long tail, like real providers)
+    """
+
+    DISTRIBUTIONS = ('none', 'fixed', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, distribution: str = 'none', params: tuple = (), seed: int = 0):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}' (expected one of {self.DISTRIBUTIONS})")
+        self.distribution = distribution
+        self.params = tuple(float(p) for p in params)
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec: Optional[str], seed: int = 0) -> 'LatencyModel':
+        """Build a latency model from a spec string (None or empty means no delay)."""
+        if not spec:
+            return cls(seed=seed)
+        distribution, *params = [part.strip() for part in spec.split(':')]
+        expected = {'none': 0, 'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}.get(distribution)
+        if expected is not None and len(params) != expected:
+            raise ValueError(f"Latency spec '{spec}' needs {expected} parameter(s) for '{distribution}'")
+        return cls(distribution, tuple(params), seed=seed)
+
+    def sample_ms(self) -> float:
+        """Draw one latency sample in milliseconds."""
+        if self.distribution == 'fixed':
+            return self.params[0]
+        if self.distribution == 'uniform':
+            return self._rng.uniform(self.params[0], self.params[1])
+        if self.distribution == 'normal':
+            return max(0.0, self._rng.gauss(self.params[0], self.params[1]))
+        if self.distribution == 'lognormal':
+            return self._rng.lognormvariate(math.log(max(self.params[0], 1e-3)), self.params[1])
+        return 0.0
+
+    async def sleep(self) -> None:
+        """Sleep for one sampled latency."""
+        delay_ms = self.sample_ms()
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+    def describe(self) -> str:
+        return ':'.join([self.distribution, *(f'{p:g}' for p in self.params)])
+
+
+def _digest(*parts: str) -> int:
+    return int.from_bytes(hashlib.sha256('\x1f'.join(parts).encode('utf-8')).digest()[:8], 'big')
+
+
+def _section(text: str, tag: str) -> Optional[str]:
+    """Return the text between ``<TAG>`` and ``</TAG>`` in a graphiti-core prompt."""
+    start = text.find(f'<{tag}>')
+    if start == -1:
+        return None
+    start += len(tag) + 2
+    end = text.find(f'</{tag}>', start)
+    return text[start:end if end != -1 else None].strip()
+
+
+def _stub_value(annotation: Any, path: str, seed: str) -> Any:
+    """Build a deterministic JSON-compatible value that validates against a type annotation."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Union or type(annotation).__name__ == 'UnionType':
+        # Optional fields are left empty; other unions use their first member
+        if type(None) in args:
+            return None
+        return _stub_value(args[0], path, seed)
+    if origin is typing.Literal:
+        return args[0]
+    if origin in (list, set, tuple, frozenset) or annotation in (list, set, tuple):
+        return []
+    if origin is dict or annotation is dict:
+        return {}
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return _stub_model_data(annotation, path, seed)
+        if issubclass(annotation, enum.Enum):
+            return next(iter(annotation)).value
+        if issubclass(annotation, bool):
+            return False
+        if issubclass(annotation, int):
+            return 0
+        if issubclass(annotation, float):
+            return 0.0
+        if issubclass(annotation, datetime):
+            return None
+    return f'stub-{_digest(seed, path) % 10**8:08d}'
+
+
+def _stub_model_data(model: type[BaseModel], path: str, seed: str) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for name, field in model.model_fields.items():
+        if not field.is_required():
+            continue
+        data[name] = _stub_value(field.annotation, f'{path}.{name}', seed)
+    return data
+
+
+class StubLLMClient(LLMClient):
+    """LLMClient returning deterministic, schema-valid structured outputs after a synthetic delay.
+
+    Entity extraction picks capitalized words from the episode, node dedupe marks every node as
+    new, edge extraction links consecutive entities, and every other response model (including
+    custom entity types) gets schema defaults. This keeps the graph growing realistically enough
+    to exercise the Neo4j write path.
+    """
+
+    def __init__(self, latency: Optional[LatencyModel] = None, config: LLMConfig | None = None):
+        """Initialize the stub.
+
+        Args:
+            latency: Synthetic latency applied to every call (no delay if omitted)
+            config: LLM configuration (model names are only used for reporting)
+        """
+        super().__init__(config or LLMConfig(api_key='stub', model=STUB_MODEL_NAME), cache=False)
+        self.latency = latency or LatencyModel()
+        logger.info(f'Using stub LLM client (latency: {self.latency.describe()})')
+
+    async def generate_response(
+        self,
+        messages: list[Message],
+        response_model: type[BaseModel] | None = None,
+        max_tokens: int | None = None,
+        model_size: ModelSize = ModelSize.medium,
+    ) -> dict[str, typing.Any]:
+        return await self._generate_response(messages, response_model, max_tokens, model_size)
+
+    async def _generate_response(
+        self,
+        messages: list[Message],
+        response_model: type[BaseModel] | None = None,
+        max_tokens: int | None = None,
+        model_size: ModelSize = ModelSize.medium,
+    ) -> dict[str, typing.Any]:
+        await self.latency.sleep()
+        prompt = '\n'.join(m.content for m in messages)
+        if response_model is None:
+            return {'content': f'stub-{_digest(prompt) % 10**8:08d}'}
+
+        prompt_type = get_prompt_type(response_model)
+        if prompt_type == 'extract_nodes':
+            data: Dict[str, Any] = {'extracted_entities': self._extract_entities(prompt)}
+        elif prompt_type == 'dedupe_nodes':
+            data = {'entity_resolutions': self._resolve_entities(prompt)}
+        elif prompt_type == 'extract_edges':
+            data = {'edges': self._extract_edges(prompt)}
+        else:
+            data = _stub_model_data(response_model, response_model.__name__, prompt)
+            if prompt_type == 'dedupe_edges':
+                data['fact_type'] = 'DEFAULT'
+        return response_model.model_validate(data).model_dump()
+
+    @staticmethod
+    def _extract_entities(prompt: str) -> List[Dict[str, Any]]:
+        content = next(
+            (s for s in (_section(prompt, tag) for tag in ('CURRENT MESSAGE', 'JSON', 'TEXT')) if s),
+            '',
+        )
+        names: List[str] = []
+        for name in _CAPITALIZED_RE.findall(content):
+            if name not in names:
+                names.append(name)
+            if len(names) == MAX_STUB_ENTITIES:
+                break
+        return [{'name': name, 'entity_type_id': 0} for name in names]
+
+    @staticmethod
+    def _entity_refs(prompt: str) -> List[tuple]:
+        section = _section(prompt, 'ENTITIES') or ''
+        return [(int(entity_id), name) for entity_id, name in _ENTITY_ID_RE.findall(section)]
+
+    def _resolve_entities(self, prompt: str) -> List[Dict[str, Any]]:
+        return [
+            {'id': entity_id, 'duplicate_idx': -1, 'name': name, 'duplicates': []}
+            for entity_id, name in self._entity_refs(prompt)
+        ]
+
+    def _extract_edges(self, prompt: str) -> List[Dict[str, Any]]:
+        refs = self._entity_refs(prompt)
+        return [
+            {
+                'relation_type': 'RELATES_TO',
+                'source_entity_id': source_id,
+                'target_entity_id': target_id,
+                'fact': f'{source_name} relates to {target_name}',
+                'valid_at': None,
+                'invalid_at': None,
+            }
+            for (source_id, source_name), (target_id, target_name) in zip(refs, refs[1:])
+        ]
+
+
+def hash_embedding(text: str, dim: int = EMBEDDING_DIM, seed: int = 0) -> List[float]:
+    """Embed a text by feature hashing its lowercased words into a unit vector.
+
+    Texts that share words get a positive cosine similarity, so vector search over stub
+    embeddings still returns plausible neighbours.
+    """
+    vector = [0.0] * dim
+    words = _WORD_RE.findall(text.lower()) or [text]
+    for word in words:
+        h = _digest(str(seed), word)
+        vector[h % dim] += 1.0 if (h >> 32) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class StubEmbedder(EmbedderClient):
+    """EmbedderClient producing hash-derived embeddings after a synthetic delay."""
+
+    def __init__(self, embedding_dim: int = EMBEDDING_DIM, latency: Optional[LatencyModel] = None, seed: int = 0):
+        """Initialize the stub.
+
+        Args:
+            embedding_dim: Dimension of the produced vectors
+            latency: Synthetic latency applied per request (no delay if omitted)
+            seed: Seed mixed into the word hashes
+        """
+        self.embedding_dim = embedding_dim
+        self.latency = latency or LatencyModel()
+        self.seed = seed
+        logger.info(f'Using stub embedder (dim: {embedding_dim}, latency: {self.latency.describe()})')
+
+    async def create(
+        self, input_data: str | list[str] | Iterable[int] | Iterable[Iterable[int]]
+    ) -> list[float]:
+        await self.latency.sleep()
+        if isinstance(input_data, str):
+            text = input_data
+        elif isinstance(input_data, list) and input_data and isinstance(input_data[0], str):
+            text = input_data[0]
+        else:
+            text = json.dumps(list(input_data), default=list)
+        return hash_embedding(text, self.embedding_dim, self.seed)
+
+    async def create_batch(self, input_data_list: list[str]) -> list[list[float]]:
+        await self.latency.sleep()
+        return [hash_embedding(text, self.embedding_dim, self.seed) for text in input_data_list]
+
+
+class StubCrossEncoder(CrossEncoderClient):
+    """CrossEncoderClient ranking passages by word overlap with the query."""
+
+    def __init__(self, latency: Optional[LatencyModel] = None):
+        self.latency = latency or LatencyModel()
+
+    async def rank(self, query: str, passages: list[str]) -> list[tuple[str, float]]:
+        await self.latency.sleep()
+        query_words = set(_WORD_RE.findall(query.lower()))
+        scored = []
+        for passage in passages:
+            passage_words = set(_WORD_RE.findall(passage.lower()))
+            union = query_words | passage_words
+            scored.append((passage, len(query_words & passage_words) / len(union) if union else 0.0))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
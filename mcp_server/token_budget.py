@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Token-aware preflight checks for LLM requests made by the Graphiti MCP server.
+
+Before a chat completion is sent, PromptBudget counts the prompt tokens locally (tiktoken
+when installed, a conservative character estimate otherwise) and checks them against the
+model's context window and the requested max_tokens. Over-budget requests have their
+output budget clamped and, if the prompt itself is too large, the largest message is
+truncated from the middle so the instructions at the start and end of the prompt survive.
+Responses cut off at max_tokens are retried once with a larger output budget instead of
+failing the whole episode.
+"""
+import hashlib
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    tiktoken = None
+    HAS_TIKTOKEN = False
+
+# Context window sizes in tokens. Extend/override with LLM_CONTEXT_WINDOWS.
+DEFAULT_CONTEXT_WINDOWS: Dict[str, int] = {
+    'gpt-4o': 128_000,
+    'gpt-4o-mini': 128_000,
+    'gpt-4.1': 1_047_576,
+    'gpt-4.1-mini': 1_047_576,
+    'gpt-4.1-nano': 1_047_576,
+    'o3-mini': 200_000,
+    'o4-mini': 200_000,
+    'gpt-4-turbo': 128_000,
+    'gpt-3.5-turbo': 16_385,
+}
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+# Chat format overhead as counted by OpenAI: per message and for the reply priming
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+# Characters per token used when no tokenizer is available (deliberately conservative)
+CHARS_PER_TOKEN_ESTIMATE = 3.5
+TRUNCATION_MARKER = '\n\n[... {count} tokens truncated to fit the model context window ...]\n\n'
+
+
+def parse_context_windows(spec: Optional[str]) -> Dict[str, int]:
+    """Parse a context window spec into a model -> window size map.
+
+    The spec is a comma-separated list of ``model=tokens`` entries,
+    e.g. ``qwen/qwen-3-32b=32768,gpt-4o=128000``.
+
+    Args:
+        spec: The raw spec string (typically from LLM_CONTEXT_WINDOWS)
+
+    Returns:
+        A dictionary of model name to context window size in tokens
+    """
+    windows: Dict[str, int] = {}
+    if not spec:
+        return windows
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            model, tokens = entry.rsplit('=', 1)
+            windows[model.strip()] = int(tokens)
+        except ValueError:
+            logger.warning(f"Ignoring malformed LLM context window entry '{entry}' (expected model=tokens)")
+    return windows
+
+
+class TokenCounter:
+    """Counts tokens per text, memoized by content hash in a bounded LRU cache."""
+
+    def __init__(self, cache_size: int = 4096):
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple[str, str], int]' = OrderedDict()
+        self._encodings: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _encoding(self, model: str) -> Any:
+        if not HAS_TIKTOKEN:
+            return None
+        encoding = self._encodings.get(model)
+        if encoding is None:
+            try:
+                encoding = tiktoken.encoding_for_model(model.rsplit('/', 1)[-1])
+            except KeyError:
+                # Non-OpenAI models: o200k_base is a reasonable proxy for modern BPE tokenizers
+                encoding = tiktoken.get_encoding('o200k_base')
+            self._encodings[model] = encoding
+        return encoding
+
+    def encoding_name(self, model: str) -> str:
+        """Return the name of the tokenizer used for a model ('estimate' without tiktoken)."""
+        encoding = self._encoding(model)
+        return encoding.name if encoding is not None else 'estimate'
+
+    def count(self, text: str, model: str) -> int:
+        """Count the tokens of a text for a model."""
+        if not text:
+            return 0
+        key = (self.encoding_name(model), hashlib.sha1(text.encode('utf-8')).hexdigest())
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        encoding = self._encoding(model)
+        if encoding is not None:
+            tokens = len(encoding.encode(text, disallowed_special=()))
+        else:
+            tokens = math.ceil(len(text) / CHARS_PER_TOKEN_ESTIMATE)
+
+        with self._lock:
+            self._cache[key] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def count_messages(self, messages: List[Dict[str, Any]], model: str) -> int:
+        """Count the prompt tokens of a list of OpenAI chat messages."""
+        total = TOKENS_PER_REPLY
+        for message in messages:
+            total += TOKENS_PER_MESSAGE + self.count(_content_text(message), model)
+        return total
+
+    def truncate_middle(self, text: str, max_tokens: int, model: str) -> str:
+        """Shorten a text to about max_tokens by cutting out its middle."""
+        encoding = self._encoding(model)
+        if encoding is not None:
+            tokens = encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            removed = len(tokens) - max_tokens
+            head = max_tokens // 2
+            tail = max_tokens - head
+            return (
+                encoding.decode(tokens[:head])
+                + TRUNCATION_MARKER.format(count=removed)
+                + (encoding.decode(tokens[-tail:]) if tail else '')
+            )
+
+        max_chars = int(max_tokens * CHARS_PER_TOKEN_ESTIMATE)
+        if len(text) <= max_chars:
+            return text
+        removed = math.ceil((len(text) - max_chars) / CHARS_PER_TOKEN_ESTIMATE)
+        head = max_chars // 2
+        tail = max_chars - head
+        return text[:head] + TRUNCATION_MARKER.format(count=removed) + (text[-tail:] if tail else '')
+
+
+def _content_text(message: Dict[str, Any]) -> str:
+    content = message.get('content')
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        # Multi-part content: only text parts count towards the prompt here
+        return '\n'.join(part.get('text', '') for part in content if isinstance(part, dict))
+    return ''
+
+
+class PromptBudget:
+    """Preflight budget enforcement for OpenAI chat completion requests."""
+
+    def __init__(
+        self,
+        context_windows: Optional[Dict[str, int]] = None,
+        default_context_window: int = DEFAULT_CONTEXT_WINDOW,
+        safety_margin: float = 0.05,
+        min_output_tokens: int = 256,
+        counter: Optional[TokenCounter] = None,
+    ):
+        """Initialize the budget.
+
+        Args:
+            context_windows: Extra/override context window sizes by model name
+            default_context_window: Window assumed for models that are not listed
+            safety_margin: Fraction of the window kept free to absorb tokenizer differences
+            min_output_tokens: Smallest output budget max_tokens is clamped down to
+            counter: Token counter to use (a new one is created if omitted)
+        """
+        self.context_windows: Dict[str, int] = dict(DEFAULT_CONTEXT_WINDOWS)
+        self.context_windows.update(context_windows or {})
+        self.default_context_window = default_context_window
+        self.safety_margin = safety_margin
+        self.min_output_tokens = min_output_tokens
+        self.counter = counter or TokenCounter()
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.clamped = 0
+        self.truncated = 0
+        self.truncated_tokens = 0
+        self.length_retries = 0
+        if not HAS_TIKTOKEN:
+            logger.info("tiktoken is not installed; prompt token budgets use a character-based estimate")
+
+    def context_window(self, model: str) -> int:
+        """Return the context window of a model (provider prefixes are ignored)."""
+        if model in self.context_windows:
+            return self.context_windows[model]
+        return self.context_windows.get(model.rsplit('/', 1)[-1], self.default_context_window)
+
+    def usable_window(self, model: str) -> int:
+        """Return the context window minus the safety margin."""
+        window = self.context_window(model)
+        return window - int(window * self.safety_margin)
+
+    def apply(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Fit a chat completion request into the model's context window.
+
+        Args:
+            request: The keyword arguments of a ``chat.completions.create/parse`` call
+
+        Returns:
+            The (possibly adjusted) request; the input dictionary is not modified
+        """
+        model = request.get('model') or ''
+        messages = request.get('messages') or []
+        token_key = 'max_completion_tokens' if 'max_completion_tokens' in request else 'max_tokens'
+        max_tokens = request.get(token_key) or 0
+        window = self.usable_window(model)
+        prompt_tokens = self.counter.count_messages(messages, model)
+        with self._lock:
+            self.checked += 1
+
+        if prompt_tokens + max_tokens <= window:
+            return request
+
+        request = dict(request)
+        # First give up output budget the prompt needs, down to min_output_tokens
+        if max_tokens:
+            output_budget = max(window - prompt_tokens, min(self.min_output_tokens, max_tokens))
+            if output_budget < max_tokens:
+                logger.warning(
+                    f"Clamping {token_key} for '{model}' from {max_tokens} to {output_budget} "
+                    f"({prompt_tokens} prompt tokens, window {window})"
+                )
+                request[token_key] = output_budget
+                max_tokens = output_budget
+                with self._lock:
+                    self.clamped += 1
+
+        excess = prompt_tokens + max_tokens - window
+        if excess <= 0:
+            return request
+
+        # Truncate the largest message; graphiti-core puts episode content and context there
+        sizes = [self.counter.count(_content_text(message), model) for message in messages]
+        largest = max(range(len(sizes)), key=sizes.__getitem__, default=None)
+        marker_tokens = self.counter.count(TRUNCATION_MARKER.format(count=excess), model)
+        target = sizes[largest] - excess - marker_tokens if largest is not None else 0
+        if target <= 0 or not isinstance(messages[largest].get('content'), str):
+            logger.error(
+                f"Prompt for '{model}' needs {prompt_tokens} tokens but only {window - max_tokens} fit; "
+                f"it cannot be truncated safely and is sent as is"
+            )
+            return request
+
+        message = dict(messages[largest])
+        message['content'] = self.counter.truncate_middle(message['content'], target, model)
+        request['messages'] = messages[:largest] + [message] + messages[largest + 1:]
+        logger.warning(
+            f"Truncated the {message.get('role', 'user')} message for '{model}' by ~{excess} tokens "
+            f"to fit the context window ({prompt_tokens} prompt tokens, window {window})"
+        )
+        with self._lock:
+            self.truncated += 1
+            self.truncated_tokens += excess
+        return request
+
+    def expanded_output_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a copy of a request with a doubled output budget, or None if it cannot grow.
+
+        Used to retry a call whose output was cut off at max_tokens.
+        """
+        model = request.get('model') or ''
+        token_key = 'max_completion_tokens' if 'max_completion_tokens' in request else 'max_tokens'
+        max_tokens = request.get(token_key)
+        if not max_tokens:
+            return None
+        prompt_tokens = self.counter.count_messages(request.get('messages') or [], model)
+        expanded = min(max_tokens * 2, self.usable_window(model) - prompt_tokens)
+        if expanded <= max_tokens:
+            return None
+        with self._lock:
+            self.length_retries += 1
+        logger.warning(f"Output for '{model}' hit {token_key}={max_tokens}; retrying with {expanded}")
+        return {**request, token_key: expanded}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the budget counters."""
+        with self._lock:
+            counter = self.counter
+            lookups = counter.hits + counter.misses
+            return {
+                'tokenizer': 'tiktoken' if HAS_TIKTOKEN else 'estimate',
+                'requests_checked': self.checked,
+                'output_budgets_clamped': self.clamped,
+                'prompts_truncated': self.truncated,
+                'tokens_truncated': self.truncated_tokens,
+                'length_retries': self.length_retries,
+                'token_cache_hit_rate': round(counter.hits / lookups, 4) if lookups else None,
+            }
+
+
+def _is_length_cutoff(response: Any) -> bool:
+    choices = getattr(response, 'choices', None) or []
+    return bool(choices) and getattr(choices[0], 'finish_reason', None) == 'length'
+
+
+async def send_with_budget(
+    budget: PromptBudget,
+    send: Callable[..., Any],
+    request: Dict[str, Any],
+) -> Any:
+    """Send a chat completion request with preflight budgeting and one length retry.
+
+    Args:
+        budget: The budget to apply
+        send: The SDK method to call (``chat.completions.create`` or ``parse``)
+        request: The keyword arguments for the call
+
+    Returns:
+        The SDK response
+    """
+    import openai
+
+    request = budget.apply(request)
+    try:
+        response = await send(**request)
+    except openai.LengthFinishReasonError:
+        retry = budget.expanded_output_request(request)
+        if retry is None:
+            raise
+        return await send(**retry)
+
+    # create() does not raise on truncation; structured output cut off mid-JSON is useless
+    if _is_length_cutoff(response) and request.get('response_format') is not None:
+        retry = budget.expanded_output_request(request)
+        if retry is not None:
+            return await send(**retry)
+    return response
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+In-process vector index mirror for the hot groups of the Graphiti MCP server.
+
+graphiti-core runs vector similarity as an exact cosine scan in Cypher on every search. The
+mirror keeps the entity name and fact embeddings of recently searched groups in memory as
+NumPy flat indexes (unit-normalized float32 matrices, scanned with one matrix-vector product)
+and answers the similarity part of a search from there; Neo4j is only asked to hydrate the
+winning uuids.
+
+Groups are loaded on first search, updated from the results of each ingested episode, reloaded
+after a TTL (other replicas may have written meanwhile) and evicted least recently used when
+the mirror exceeds its memory budget. Groups larger than max_group_vectors, searches without
+group_ids and filtered searches fall through to Neo4j.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from graphiti_core.edges import EntityEdge
+from graphiti_core.nodes import EntityNode
+from graphiti_core.search import search as graphiti_search_module
+from graphiti_core.search.search_filters import SearchFilters
+from graphiti_core.search.search_utils import DEFAULT_MIN_SCORE, RELEVANT_SCHEMA_LIMIT
+
+from mcp_server.metrics import format_labels, prometheus_header
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('nodes', 'edges')
+
+COUNT_QUERY = """
+CALL { MATCH (n:Entity) WHERE n.group_id = $group_id RETURN count(n) AS nodes }
+CALL { MATCH (:Entity)-[r:RELATES_TO]->(:Entity) WHERE r.group_id = $group_id RETURN count(r) AS edges }
+RETURN nodes, edges
+"""
+
+LOAD_QUERIES = {
+    'nodes': """
+        MATCH (n:Entity)
+        WHERE n.group_id = $group_id AND n.name_embedding IS NOT NULL
+        RETURN n.uuid AS uuid, n.name_embedding AS embedding
+    """,
+    'edges': """
+        MATCH (:Entity)-[r:RELATES_TO]->(:Entity)
+        WHERE r.group_id = $group_id AND r.fact_embedding IS NOT NULL
+        RETURN r.uuid AS uuid, r.fact_embedding AS embedding
+    """,
+}
+
+
+def _unit_rows(vectors: Any) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class FlatVectorIndex:
+    """Exact cosine index over unit-normalized vectors, addressed by uuid."""
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim
+        self.uuids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self._matrix = np.zeros((0, dim or 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.uuids)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._matrix.nbytes)
+
+    def upsert(self, uuids: Sequence[str], vectors: Any) -> None:
+        """Insert or replace the vectors of the given uuids."""
+        if not uuids:
+            return
+        rows = _unit_rows(vectors)
+        if self.dim is None:
+            self.dim = rows.shape[1]
+            self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        if rows.shape[1] != self.dim:
+            raise ValueError(f'Expected {self.dim}-dimensional vectors, got {rows.shape[1]}')
+        appended = []
+        for uuid, row in zip(uuids, rows):
+            position = self.positions.get(uuid)
+            if position is not None:
+                self._matrix[position] = row
+            else:
+                self.positions[uuid] = len(self.uuids) + len(appended)
+                appended.append((uuid, row))
+        if appended:
+            self.uuids.extend(uuid for uuid, _ in appended)
+            self._matrix = np.vstack([self._matrix, np.stack([row for _, row in appended])])
+
+    def remove(self, uuids: Sequence[str]) -> None:
+        """Remove the given uuids (unknown uuids are ignored)."""
+        drop = [self.positions[uuid] for uuid in uuids if uuid in self.positions]
+        if not drop:
+            return
+        keep = np.ones(len(self.uuids), dtype=bool)
+        keep[drop] = False
+        self._matrix = self._matrix[keep]
+        self.uuids = [uuid for uuid, kept in zip(self.uuids, keep) if kept]
+        self.positions = {uuid: i for i, uuid in enumerate(self.uuids)}
+
+    def search(self, query: np.ndarray, limit: int, min_score: float) -> List[Tuple[str, float]]:
+        """Return up to limit (uuid, score) pairs with score > min_score, best first.
+
+        Scores are normalized cosine similarity, (1 + cos) / 2, as returned by Neo4j's
+        vector.similarity.cosine, so min_score means the same as in graphiti-core.
+        """
+        if not self.uuids or limit <= 0 or query.shape[0] != self.dim:
+            return []
+        scores = (1.0 + self._matrix @ query) / 2.0
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.uuids[i], float(scores[i])) for i in top if scores[i] > min_score]
+
+
+class GroupMirror:
+    """Node and edge indexes of one group."""
+
+    def __init__(self, loaded_at: float):
+        self.indexes: Dict[str, FlatVectorIndex] = {kind: FlatVectorIndex() for kind in KINDS}
+        self.loaded_at = loaded_at
+
+    @property
+    def nbytes(self) -> int:
+        return sum(index.nbytes for index in self.indexes.values())
+
+
+class VectorIndexMirror:
+    """LRU of per-group flat indexes within a memory budget."""
+
+    def __init__(
+        self,
+        memory_budget_bytes: int = 256 * 1024 * 1024,
+        max_group_vectors: int = 200_000,
+        ttl_seconds: float = 300.0,
+    ):
+        """Create the mirror.
+
+        Args:
+            memory_budget_bytes: Bytes of vectors kept across all groups
+            max_group_vectors: Groups with more nodes or facts than this are not mirrored
+            ttl_seconds: Age after which a group is reloaded from Neo4j
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self.max_group_vectors = max_group_vectors
+        self.ttl_seconds = ttl_seconds
+        self._groups: 'OrderedDict[str, GroupMirror]' = OrderedDict()
+        # Groups found too large, with the time they were checked
+        self._oversized: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.searches = {kind: 0 for kind in KINDS}
+        self.fallbacks = 0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.evictions = 0
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(group.nbytes for group in self._groups.values())
+
+    async def _load(self, driver: Any, group_id: str) -> Optional[GroupMirror]:
+        started = time.monotonic()
+        records, _, _ = await driver.execute_query(COUNT_QUERY, group_id=group_id, routing_='r')
+        counts = records[0] if records else {'nodes': 0, 'edges': 0}
+        if max(counts['nodes'], counts['edges']) > self.max_group_vectors:
+            self._oversized[group_id] = started
+            logger.info(f'Group {group_id} is too large for the vector index mirror ({dict(counts)})')
+            return None
+        group = GroupMirror(loaded_at=started)
+        for kind in KINDS:
+            records, _, _ = await driver.execute_query(LOAD_QUERIES[kind], group_id=group_id, routing_='r')
+            if records:
+                group.indexes[kind].upsert(
+                    [record['uuid'] for record in records], [record['embedding'] for record in records]
+                )
+        self.loads += 1
+        self.load_seconds += time.monotonic() - started
+        return group
+
+    async def get_group(self, driver: Any, group_id: str) -> Optional[GroupMirror]:
+        """Return the group's mirror, loading it on first use or after the TTL (None if not mirrored)."""
+        now = time.monotonic()
+        group = self._groups.get(group_id)
+        if group is not None and now - group.loaded_at < self.ttl_seconds:
+            self._groups.move_to_end(group_id)
+            return group
+        checked = self._oversized.get(group_id)
+        if checked is not None and now - checked < self.ttl_seconds:
+            return None
+
+        lock = self._locks.setdefault(group_id, asyncio.Lock())
+        async with lock:
+            # Another search may have loaded the group while this one waited
+            group = self._groups.get(group_id)
+            if group is not None and time.monotonic() - group.loaded_at < self.ttl_seconds:
+                return group
+            self._groups.pop(group_id, None)
+            group = await self._load(driver, group_id)
+            if group is None:
+                return None
+            if group.nbytes > self.memory_budget_bytes:
+                self._oversized[group_id] = group.loaded_at
+                return None
+            self._groups[group_id] = group
+            self._oversized.pop(group_id, None)
+            while self.nbytes > self.memory_budget_bytes and len(self._groups) > 1:
+                evicted, _ = self._groups.popitem(last=False)
+                self.evictions += 1
+                logger.debug(f'Evicted group {evicted} from the vector index mirror')
+            return group
+
+    async def search(
+        self,
+        kind: str,
+        driver: Any,
+        group_ids: Sequence[str],
+        vector: Sequence[float],
+        limit: int,
+        min_score: float,
+    ) -> Optional[List[Tuple[str, float]]]:
+        """Return the best (uuid, score) pairs across the groups, or None if a group is not mirrored."""
+        groups = []
+        for group_id in dict.fromkeys(group_ids):
+            group = await self.get_group(driver, group_id)
+            if group is None:
+                self.fallbacks += 1
+                return None
+            groups.append(group)
+        query = _unit_rows(vector)[0]
+        hits: List[Tuple[str, float]] = []
+        for group in groups:
+            hits.extend(group.indexes[kind].search(query, limit, min_score))
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        self.searches[kind] += 1
+        return hits[:limit]
+
+    def apply_episode(self, group_id: str, nodes: Sequence[EntityNode], edges: Sequence[EntityEdge]) -> None:
+        """Bring a loaded group up to date with the nodes and edges saved by an episode.
+
+        If some saved node or edge has no embedding the group is dropped and reloaded lazily.
+        """
+        group = self._groups.get(group_id)
+        if group is None:
+            return
+        nodes = [node for node in nodes if node.group_id == group_id]
+        edges = [edge for edge in edges if edge.group_id == group_id]
+        if any(node.name_embedding is None for node in nodes) or any(edge.fact_embedding is None for edge in edges):
+            self.invalidate(group_id)
+            return
+        try:
+            group.indexes['nodes'].upsert([node.uuid for node in nodes], [node.name_embedding for node in nodes])
+            group.indexes['edges'].upsert([edge.uuid for edge in edges], [edge.fact_embedding for edge in edges])
+        except ValueError as e:
+            logger.warning(f'Dropping group {group_id} from the vector index mirror: {e}')
+            self.invalidate(group_id)
+            return
+        self.updates += 1
+
+    def remove(self, group_id: str, kind: str, uuids: Sequence[str]) -> None:
+        """Remove deleted nodes or edges from a loaded group."""
+        group = self._groups.get(group_id)
+        if group is not None:
+            group.indexes[kind].remove(uuids)
+
+    def invalidate(self, group_id: str) -> None:
+        """Drop a group; it is reloaded on its next search."""
+        self._groups.pop(group_id, None)
+        self._oversized.pop(group_id, None)
+
+    def clear(self) -> None:
+        """Drop all groups."""
+        self._groups.clear()
+        self._oversized.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the mirror."""
+        return {
+            'groups': len(self._groups),
+            'vectors': {
+                kind: sum(len(group.indexes[kind]) for group in self._groups.values()) for kind in KINDS
+            },
+            'memory_bytes': self.nbytes,
+            'memory_budget_bytes': self.memory_budget_bytes,
+            'oversized_groups': len(self._oversized),
+            'searches': dict(self.searches),
+            'fallbacks': self.fallbacks,
+            'loads': self.loads,
+            'load_seconds': round(self.load_seconds, 3),
+            'evictions': self.evictions,
+            'updates': self.updates,
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the counters (loaded groups are kept)."""
+        self.searches = {kind: 0 for kind in KINDS}
+        self.fallbacks = 0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.evictions = 0
+        self.updates = 0
+
+    def prometheus_lines(self) -> List[str]:
+        """Render the mirror counters in the Prometheus text format."""
+        lines = prometheus_header(
+            'graphiti_vector_index_searches_total', 'counter', 'Similarity searches answered by the in-process index.'
+        )
+        for kind in KINDS:
+            lines.append(f'graphiti_vector_index_searches_total{format_labels({"kind": kind})} {self.searches[kind]}')
+        lines += prometheus_header(
+            'graphiti_vector_index_fallbacks_total', 'counter', 'Similarity searches sent to Neo4j instead.'
+        )
+        lines.append(f'graphiti_vector_index_fallbacks_total {self.fallbacks}')
+        lines += prometheus_header('graphiti_vector_index_memory_bytes', 'gauge', 'Bytes of mirrored vectors.')
+        lines.append(f'graphiti_vector_index_memory_bytes {self.nbytes}')
+        lines += prometheus_header('graphiti_vector_index_groups', 'gauge', 'Groups held in the mirror.')
+        lines.append(f'graphiti_vector_index_groups {len(self._groups)}')
+        return lines
+
+
+# Mirror used by the installed similarity searches (None sends every search to Neo4j)
+_active_mirror: Optional[VectorIndexMirror] = None
+
+_original_node_similarity_search = graphiti_search_module.node_similarity_search
+_original_edge_similarity_search = graphiti_search_module.edge_similarity_search
+
+
+def _unfiltered(search_filter: SearchFilters) -> bool:
+    return not any(value for value in search_filter.model_dump().values())
+
+
+def _limit_and_min_score(args: tuple, kwargs: dict) -> Tuple[int, float]:
+    # limit and min_score follow group_ids in both similarity search signatures
+    limit = args[0] if len(args) > 0 else kwargs.get('limit', RELEVANT_SCHEMA_LIMIT)
+    min_score = args[1] if len(args) > 1 else kwargs.get('min_score', DEFAULT_MIN_SCORE)
+    return int(limit), float(min_score)
+
+
+async def _node_similarity_search(driver, search_vector, search_filter, group_ids=None, *args, **kwargs):
+    mirror = _active_mirror
+    if mirror is not None and group_ids and search_vector and _unfiltered(search_filter):
+        limit, min_score = _limit_and_min_score(args, kwargs)
+        hits = await mirror.search('nodes', driver, group_ids, search_vector, limit, min_score)
+        if hits is not None:
+            nodes = {node.uuid: node for node in await EntityNode.get_by_uuids(driver, [u for u, _ in hits])}
+            return [nodes[u] for u, _ in hits if u in nodes]
+    return await _original_node_similarity_search(driver, search_vector, search_filter, group_ids, *args, **kwargs)
+
+
+async def _edge_similarity_search(
+    driver, search_vector, source_node_uuid, target_node_uuid, search_filter, group_ids=None, *args, **kwargs
+):
+    mirror = _active_mirror
+    if (
+        mirror is not None
+        and group_ids
+        and search_vector
+        and source_node_uuid is None
+        and target_node_uuid is None
+        and _unfiltered(search_filter)
+    ):
+        limit, min_score = _limit_and_min_score(args, kwargs)
+        hits = await mirror.search('edges', driver, group_ids, search_vector, limit, min_score)
+        if hits is not None:
+            edges = {edge.uuid: edge for edge in await EntityEdge.get_by_uuids(driver, [u for u, _ in hits])}
+            return [edges[u] for u, _ in hits if u in edges]
+    return await _original_edge_similarity_search(
+        driver, search_vector, source_node_uuid, target_node_uuid, search_filter, group_ids, *args, **kwargs
+    )
+
+
+def install_vector_index(mirror: Optional[VectorIndexMirror]) -> None:
+    """Route graphiti-core's node and fact similarity searches through the mirror (None to disable)."""
+    global _active_mirror
+    _active_mirror = mirror
+    graphiti_search_module.node_similarity_search = _node_similarity_search
+    graphiti_search_module.edge_similarity_search = _edge_similarity_search
@@ -0,0 +1,58 @@
+"""
+Unit tests for the context bundle module.
+Tests deduplication of entities and facts and round-robin packing into a token budget.
+"""
+from mcp_server.context_bundle import dedupe_results, item_tokens, pack_context
+
+
+def count_chars(text):
+    return len(text)
+
+
+class TestDedupeResults:
+    """Tests for duplicate removal."""
+
+    def test_duplicates_by_uuid_and_normalized_text(self):
+        """The first (best-ranked) item is kept; names differing in case or spacing are duplicates."""
+        items = [
+            {'uuid': 'a', 'name': 'Alice Smith'},
+            {'uuid': 'b', 'name': 'alice  smith'},
+            {'uuid': 'a', 'name': 'Other'},
+            {'uuid': 'c', 'name': 'Bob'},
+        ]
+        assert [item['uuid'] for item in dedupe_results(items, 'name')] == ['a', 'c']
+
+    def test_items_without_text_compare_by_uuid(self):
+        """Projected items lacking the text field are only deduplicated by uuid."""
+        items = [{'uuid': 'a'}, {'uuid': 'b'}, {'uuid': 'a'}]
+        assert dedupe_results(items, 'fact') == [{'uuid': 'a'}, {'uuid': 'b'}]
+
+
+class TestPackContext:
+    """Tests for token-budgeted packing."""
+
+    def test_sections_take_turns(self):
+        """A tight budget keeps the top item of every section before any second items."""
+        sections = {
+            'entities': [{'uuid': 'e1'}, {'uuid': 'e2'}],
+            'facts': [{'uuid': 'f1'}, {'uuid': 'f2'}],
+            'episodes': [{'uuid': 'p1'}],
+        }
+        per_item = item_tokens({'uuid': 'e1'}, count_chars)
+        packed = pack_context(sections, per_item * 4, count_chars)
+
+        assert packed.sections == {
+            'entities': [{'uuid': 'e1'}, {'uuid': 'e2'}],
+            'facts': [{'uuid': 'f1'}],
+            'episodes': [{'uuid': 'p1'}],
+        }
+        assert packed.dropped == {'entities': 0, 'facts': 1, 'episodes': 0}
+        assert packed.tokens == per_item * 4
+
+    def test_oversized_item_is_skipped_for_smaller_ones(self):
+        """An item larger than the remaining budget is dropped without stopping the packing."""
+        sections = {'facts': [{'uuid': 'f1', 'fact': 'x' * 100}, {'uuid': 'f2', 'fact': 'short'}]}
+        packed = pack_context(sections, 40, count_chars)
+        assert [item['uuid'] for item in packed.sections['facts']] == ['f2']
+        assert packed.dropped == {'facts': 1}
+        assert packed.tokens <= 40
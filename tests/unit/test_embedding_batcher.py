@@ -0,0 +1,123 @@
+"""
+Unit tests for the embedding batcher module.
+Tests request coalescing, fan-out, size-triggered flushes, error propagation and the
+isolation of failing inputs.
+"""
+import asyncio
+
+import pytest
+from graphiti_core.embedder.client import EmbedderClient
+
+from mcp_server.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingEmbedder(EmbedderClient):
+    """Embedder recording each batch it receives."""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def create(self, input_data):
+        raise AssertionError('single calls should be batched')
+
+    async def create_batch(self, input_data_list):
+        self.batches.append(list(input_data_list))
+        if self.fail:
+            raise RuntimeError('provider down')
+        return [[float(len(text))] for text in input_data_list]
+
+
+class TestEmbeddingBatcher:
+    """Tests for the micro-batcher."""
+
+    def test_concurrent_requests_share_one_call(self):
+        """Requests arriving within the window become one deduplicated provider call."""
+        inner = RecordingEmbedder()
+        batcher = EmbeddingBatcher(inner, max_batch_size=64, max_wait_ms=5)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.create(input_data=['a']),
+                batcher.create(input_data=['bb']),
+                batcher.create_batch(['a', 'ccc']),
+            )
+
+        single_a, single_bb, batch = asyncio.run(run())
+        assert inner.batches == [['a', 'bb', 'ccc']]
+        assert single_a == [1.0] and single_bb == [2.0] and batch == [[1.0], [3.0]]
+        assert batcher.stats()['requests_per_provider_call'] == 3
+
+    def test_full_batch_flushes_immediately(self):
+        """Reaching max_batch_size sends the batch without waiting for the window."""
+        inner = RecordingEmbedder()
+        batcher = EmbeddingBatcher(inner, max_batch_size=2, max_wait_ms=10_000)
+
+        async def run():
+            return await asyncio.wait_for(
+                asyncio.gather(batcher.create(input_data=['a']), batcher.create(input_data=['b'])), timeout=1
+            )
+
+        asyncio.run(run())
+        assert inner.batches == [['a', 'b']]
+
+    def test_errors_reach_every_caller(self):
+        """A failed provider call fails all requests in the batch."""
+        batcher = EmbeddingBatcher(RecordingEmbedder(fail=True), max_wait_ms=1)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.create(input_data=['a']), batcher.create(input_data=['b']), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    def test_short_response_fails_every_caller(self):
+        """A provider returning fewer vectors than texts fails the batch instead of leaving callers waiting."""
+        inner = RecordingEmbedder()
+
+        async def short_batch(input_data_list):
+            return []
+
+        inner.create_batch = short_batch
+        batcher = EmbeddingBatcher(inner, max_wait_ms=1)
+
+        async def run():
+            return await asyncio.wait_for(
+                asyncio.gather(
+                    batcher.create(input_data=['a']), batcher.create(input_data=['b']), return_exceptions=True
+                ),
+                timeout=1,
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(result, ValueError) for result in results)
+
+    def test_bad_input_fails_only_its_caller(self):
+        """A rejected batch is retried text by text; the other callers still get their vectors."""
+        inner = RecordingEmbedder()
+        accept = inner.create_batch
+
+        async def reject_empty(input_data_list):
+            if '' in input_data_list:
+                inner.batches.append(list(input_data_list))
+                raise ValueError('empty input')
+            return await accept(input_data_list)
+
+        inner.create_batch = reject_empty
+        batcher = EmbeddingBatcher(inner, max_wait_ms=1)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.create(input_data=['a']),
+                batcher.create(input_data=['']),
+                batcher.create(input_data=['bb']),
+                return_exceptions=True,
+            )
+
+        single_a, empty, single_bb = asyncio.run(run())
+        assert single_a == [1.0] and single_bb == [2.0]
+        assert isinstance(empty, ValueError)
+        assert inner.batches[0] == ['a', '', 'bb'] and sorted(inner.batches[1:]) == [[''], ['a'], ['bb']]
+        assert batcher.stats()['split_batches'] == 1 and batcher.stats()['provider_calls'] == 4
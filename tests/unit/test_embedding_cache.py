@@ -0,0 +1,101 @@
+"""
+Unit tests for the embedding cache module.
+Tests key normalization, LRU/disk hits, in-flight sharing and persistence.
+"""
+import asyncio
+
+import pytest
+
+from graphiti_core.embedder.client import EmbedderClient
+
+from mcp_server.embedding_cache import CachingEmbedder, cache_key, normalize_text
+
+
+class CountingEmbedder(EmbedderClient):
+    """Embedder returning a vector derived from the text length and counting calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, input_data):
+        self.calls.append(list(input_data))
+        await asyncio.sleep(0)
+        return [float(len(input_data[0])), 1.0, 0.0]
+
+    async def create_batch(self, input_data_list):
+        self.calls.append(list(input_data_list))
+        return [[float(len(text)), 1.0, 0.0] for text in input_data_list]
+
+
+class TestKeys:
+    """Tests for normalization and cache keys."""
+
+    def test_whitespace_variants_share_a_key(self):
+        """Texts differing only in whitespace map to the same key."""
+        assert normalize_text('  Alice \n  Smith ') == 'Alice Smith'
+        assert cache_key('m', 3, normalize_text('Alice\nSmith')) == cache_key('m', 3, 'Alice Smith')
+
+    def test_model_is_part_of_the_key(self):
+        """The same text embedded by another model is a different entry."""
+        assert cache_key('a', 3, 'x') != cache_key('b', 3, 'x')
+
+
+class TestCachingEmbedder:
+    """Tests for the caching wrapper."""
+
+    def test_repeated_texts_hit_the_cache(self):
+        """Single and batch lookups reuse cached vectors and only embed misses."""
+        inner = CountingEmbedder()
+        cache = CachingEmbedder(inner, model='m', embedding_dim=3)
+
+        async def run():
+            await cache.create(input_data=['Alice'])
+            await cache.create(input_data=['Alice '])
+            return await cache.create_batch(['Alice', 'Bob', 'Bob'])
+
+        vectors = asyncio.run(run())
+        assert inner.calls == [['Alice'], ['Bob']]
+        assert vectors[1] == vectors[2]
+        stats = cache.stats()
+        assert stats['misses'] == 2 and stats['memory_hits'] == 2
+
+    def test_concurrent_misses_share_one_call(self):
+        """Concurrent requests for the same text wait for a single embedding call."""
+        inner = CountingEmbedder()
+        cache = CachingEmbedder(inner, model='m', embedding_dim=3)
+
+        async def run():
+            return await asyncio.gather(*(cache.create(input_data=['query']) for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert len(inner.calls) == 1
+        assert all(result == results[0] for result in results)
+
+    def test_disk_store_survives_restart(self, tmp_path):
+        """Vectors written to the memory-mapped store are served after reopening."""
+        first = CachingEmbedder(CountingEmbedder(), model='m', embedding_dim=3, disk_dir=str(tmp_path))
+        asyncio.run(first.create_batch(['Alice', 'Bob']))
+        first.close()
+
+        inner = CountingEmbedder()
+        second = CachingEmbedder(inner, model='m', embedding_dim=3, disk_dir=str(tmp_path))
+        vector = asyncio.run(second.create(input_data=['Bob']))
+        assert vector == [3.0, 1.0, 0.0]
+        assert inner.calls == []
+        assert second.stats()['disk_hits'] == 1
+
+    def test_reduced_precision_disk_store(self, tmp_path):
+        """float16 and int8 stores keep the vector direction."""
+        for dtype in ('float16', 'int8'):
+            first = CachingEmbedder(
+                CountingEmbedder(), model='m', embedding_dim=3, disk_dir=str(tmp_path), disk_dtype=dtype
+            )
+            asyncio.run(first.create_batch(['Alice']))
+            first.close()
+
+            second = CachingEmbedder(
+                CountingEmbedder(), model='m', embedding_dim=3, disk_dir=str(tmp_path), disk_dtype=dtype
+            )
+            vector = asyncio.run(second.create(input_data=['Alice']))
+            scale = vector[0] / 5.0
+            assert vector == pytest.approx([5.0 * scale, 1.0 * scale, 0.0], abs=1e-2)
@@ -0,0 +1,84 @@
+"""
+Unit tests for the embedding profile module.
+Tests the dimensions request parameter and the batched re-embed migration.
+"""
+import asyncio
+from types import SimpleNamespace
+
+from graphiti_core.embedder.openai import OpenAIEmbedderConfig
+
+from mcp_server.embedding_profile import DimensionedOpenAIEmbedder, reembed_group
+
+
+class FakeEmbeddings:
+    """Stand-in for AsyncOpenAI.embeddings recording request parameters."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        inputs = kwargs['input'] if isinstance(kwargs['input'], list) else [kwargs['input']]
+        dim = kwargs.get('dimensions', 8)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[1.0] * dim) for _ in inputs])
+
+
+class FakeDriver:
+    """Driver serving entity rows for the select query and recording writes."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.writes = []
+
+    async def execute_query(self, query, **params):
+        if 'UNWIND $rows' in query:
+            self.writes.append(params['rows'])
+            return [], None, None
+        if ':Entity)' not in query.split('WHERE')[0] or 'RELATES_TO' in query:
+            return [], None, None
+        selected = [row for row in self.rows if row['uuid'] > params['after']][: params['batch_size']]
+        return selected, None, None
+
+
+class FakeEmbedder:
+    async def create_batch(self, texts):
+        return [[0.5] * 4 for _ in texts]
+
+
+class TestDimensionedEmbedder:
+    """Tests for the dimensions request parameter."""
+
+    def test_dimensions_sent_for_text_embedding_3(self):
+        """text-embedding-3 models are asked for shortened vectors."""
+        embeddings = FakeEmbeddings()
+        embedder = DimensionedOpenAIEmbedder(
+            config=OpenAIEmbedderConfig(embedding_model='text-embedding-3-small', embedding_dim=4),
+            client=SimpleNamespace(embeddings=embeddings),
+            dimensions=4,
+        )
+        assert len(asyncio.run(embedder.create(input_data=['x']))) == 4
+        assert embeddings.requests[0]['dimensions'] == 4
+
+    def test_other_models_truncate_locally(self):
+        """Models without server-side shortening do not receive the parameter."""
+        embeddings = FakeEmbeddings()
+        embedder = DimensionedOpenAIEmbedder(
+            config=OpenAIEmbedderConfig(embedding_model='nomic-embed-text', embedding_dim=4),
+            client=SimpleNamespace(embeddings=embeddings),
+            dimensions=4,
+        )
+        assert len(asyncio.run(embedder.create_batch(['x', 'y']))[0]) == 4
+        assert 'dimensions' not in embeddings.requests[0]
+
+
+class TestReembedGroup:
+    """Tests for the batched migration."""
+
+    def test_pages_through_entities(self):
+        """Entities are re-embedded in uuid-ordered batches."""
+        rows = [{'uuid': f'u{i}', 'text': f'name {i}'} for i in range(5)]
+        driver = FakeDriver(rows)
+        counts = asyncio.run(reembed_group(driver, FakeEmbedder(), 'g', dimension=4, batch_size=2))
+        assert counts['Entity'] == 5
+        assert [len(batch) for batch in driver.writes] == [2, 2, 1]
+        assert driver.writes[0][0] == {'uuid': 'u0', 'embedding': [0.5] * 4}
@@ -0,0 +1,111 @@
+"""
+Unit tests for the fact lookup module.
+Tests endpoint resolution by UUID or name, the generated edge lookup and the split of
+facts into currently valid and historical ones.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from neo4j.time import DateTime
+
+from mcp_server.fact_lookup import facts_between, facts_between_query, relation_name
+
+CREATED = DateTime.from_native(datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+
+def node_record(uuid, name, **extra):
+    return {
+        'uuid': uuid,
+        'name': name,
+        'group_id': 'g',
+        'summary': '',
+        'created_at': CREATED,
+        'labels': ['Entity'],
+        'attributes': {},
+        **extra,
+    }
+
+
+def edge_record(uuid, invalid_at=None):
+    return {
+        'edge': {
+            'uuid': uuid,
+            'group_id': 'g',
+            'name': 'WORKS_AT',
+            'fact': f'fact {uuid}',
+            'episodes': [],
+            'created_at': CREATED,
+            'expired_at': None,
+            'valid_at': CREATED,
+            'invalid_at': invalid_at,
+            'source_node_uuid': 'a',
+            'target_node_uuid': 'b',
+            'attributes': {'fact_embedding': [0.1]},
+        }
+    }
+
+
+class FakeDriver:
+    """Driver answering UUID lookups, name lookups and the edge lookup in turn."""
+
+    def __init__(self, edges):
+        self.edges = edges
+        self.calls = []
+
+    async def execute_query(self, query, **params):
+        self.calls.append((query, params))
+        if 'uuids' in params:
+            return [node_record('a', 'Alice')], None, None
+        if 'lookups' in params:
+            return [node_record('b', 'Acme', lookup_name='acme')], None, None
+        return self.edges, None, None
+
+
+class TestFactsBetween:
+    """Tests for facts between two entities."""
+
+    def test_resolves_names_and_filters_query(self):
+        """A UUID that is not found is looked up by name; relation and validity reach the query."""
+        driver = FakeDriver([edge_record('e1')])
+        found = asyncio.run(facts_between(driver, 'a', 'acme', ['g'], relation='works at'))
+
+        assert [node.uuid for node in found.source_nodes] == ['a']
+        assert [node.uuid for node in found.target_nodes] == ['b']
+        assert [edge.uuid for edge in found.facts] == ['e1'] and found.historical == []
+        assert 'fact_embedding' not in found.facts[0].attributes
+        query, params = driver.calls[-1]
+        assert params['relation'] == 'WORKS_AT' and params['target_uuids'] == ['b']
+        assert 'r.expired_at IS NULL' in query
+
+    def test_historical_facts_are_split(self):
+        """With include_historical no validity filter is applied and invalidated facts are kept apart."""
+        past = DateTime.from_native(datetime(2025, 6, 1, tzinfo=timezone.utc))
+        driver = FakeDriver([edge_record('e1'), edge_record('e2', invalid_at=past)])
+        found = asyncio.run(facts_between(driver, 'a', 'acme', ['g'], include_historical=True))
+
+        assert [edge.uuid for edge in found.facts] == ['e1']
+        assert [edge.uuid for edge in found.historical] == ['e2']
+        assert 'as_of' not in driver.calls[-1][1]
+
+    def test_unresolved_entity_skips_edge_lookup(self):
+        """Without both endpoints no edge query is run."""
+        driver = FakeDriver([])
+
+        async def no_names(query, **params):
+            driver.calls.append((query, params))
+            return ([node_record('a', 'Alice')] if 'uuids' in params else []), None, None
+
+        driver.execute_query = no_names
+        found = asyncio.run(facts_between(driver, 'a', 'nobody', ['g']))
+        assert found.target_nodes == [] and found.facts == []
+        assert len(driver.calls) == 2
+
+    def test_validation_and_helpers(self):
+        """Empty entities and out-of-range limits are rejected; relations are normalized."""
+        with pytest.raises(ValueError):
+            asyncio.run(facts_between(FakeDriver([]), ' ', 'b', ['g']))
+        with pytest.raises(ValueError):
+            asyncio.run(facts_between(FakeDriver([]), 'a', 'b', ['g'], max_facts=0))
+        assert relation_name('works-at') == 'WORKS_AT'
+        assert 'r.name = $relation' not in facts_between_query(False, None)
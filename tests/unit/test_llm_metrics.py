@@ -0,0 +1,103 @@
+"""
+Unit tests for the LLM metrics module.
+Tests histogram bookkeeping, cost estimation and the instrumented client wrapper.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from graphiti_core.prompts.models import Message
+from pydantic import BaseModel
+
+from mcp_server.llm_metrics import InstrumentedLLMClient, LLMStats, parse_pricing
+from mcp_server.metrics import Histogram
+
+
+class EdgeDuplicate(BaseModel):
+    """Same name as the graphiti-core dedupe_edges response model."""
+    duplicate: bool = False
+
+
+class FakeCompletions:
+    """Stand-in for AsyncOpenAI.chat.completions that fails a configurable number of times."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+
+    async def create(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ValueError('transient')
+        return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=10))
+
+
+class FakeLLMClient:
+    """Minimal LLM client that retries like graphiti-core's OpenAI clients."""
+
+    def __init__(self, failures: int = 0):
+        self.config = None
+        self.model = 'gpt-4o-mini'
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(failures)))
+
+    async def generate_response(self, messages, response_model=None, max_tokens=None, model_size=None):
+        for _ in range(3):
+            try:
+                await self.client.chat.completions.create(model=self.model, messages=[])
+                return {'duplicate': False}
+            except ValueError:
+                continue
+        raise RuntimeError('exhausted')
+
+
+class TestHistogram:
+    """Tests for the histogram primitive."""
+
+    def test_observe_and_quantile(self):
+        """Observations land in the right bucket and quantiles use bucket bounds."""
+        histogram = Histogram(buckets=(10, 100))
+        for value in (1, 2, 50, 500):
+            histogram.observe(value)
+        assert histogram.cumulative() == [('10', 2), ('100', 3), ('+Inf', 4)]
+        assert histogram.quantile(0.5) == 10
+        assert histogram.quantile(1.0) == 500
+
+
+class TestLLMStats:
+    """Tests for stats aggregation."""
+
+    def test_cost_uses_provider_prefix_fallback(self):
+        """OpenRouter model names fall back to the unprefixed price."""
+        stats = LLMStats()
+        assert stats.estimate_cost('openai/gpt-4o', 1_000_000, 0) == pytest.approx(2.5)
+        assert stats.estimate_cost('unknown-model', 10, 10) is None
+
+    def test_parse_pricing(self):
+        """Pricing entries may contain slashes in the model name."""
+        assert parse_pricing('qwen/qwen-3-32b=0.1:0.3,bad') == {'qwen/qwen-3-32b': (0.1, 0.3)}
+
+
+class TestInstrumentedLLMClient:
+    """Tests for the instrumented client wrapper."""
+
+    def test_records_tokens_and_retries(self):
+        """Usage and retry attempts are attributed to the prompt type and model."""
+        stats = LLMStats()
+        client = InstrumentedLLMClient(FakeLLMClient(failures=1), stats)
+        asyncio.run(client.generate_response([Message(role='user', content='x')], EdgeDuplicate))
+
+        entry = stats.snapshot()['prompts'][0]
+        assert entry['prompt_type'] == 'dedupe_edges'
+        assert entry['model'] == 'gpt-4o-mini'
+        assert entry['retries'] == 1
+        assert entry['prompt_tokens'] == 1000
+
+    def test_records_error_class(self):
+        """Failed calls are counted with their exception class."""
+        stats = LLMStats()
+        client = InstrumentedLLMClient(FakeLLMClient(failures=5), stats)
+        with pytest.raises(RuntimeError):
+            asyncio.run(client.generate_response([Message(role='user', content='x')]))
+
+        entry = stats.snapshot()['prompts'][0]
+        assert entry['errors'] == 1
+        assert entry['error_classes'] == {'RuntimeError': 1}
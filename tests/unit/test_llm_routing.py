@@ -0,0 +1,87 @@
+"""
+Unit tests for the LLM model routing module.
+Tests small/large tiering and per-prompt-type overrides.
+"""
+from enum import Enum
+
+from pydantic import BaseModel
+
+from mcp_server.llm_routing import (
+    ModelRouter,
+    PROMPT_TYPE_ATTRIBUTES,
+    PROMPT_TYPE_TEXT,
+    get_prompt_type,
+    parse_model_overrides,
+)
+
+
+class ModelSize(Enum):
+    """Stand-in for graphiti_core.llm_client.config.ModelSize."""
+    small = 'small'
+    medium = 'medium'
+
+
+class NodeResolutions(BaseModel):
+    """Same name as the graphiti-core dedupe_nodes response model."""
+
+
+class BugReport(BaseModel):
+    """A custom entity type used for attribute extraction."""
+
+
+class TestPromptTypes:
+    """Tests for prompt type detection."""
+
+    def test_known_response_model(self):
+        """Known graphiti-core response models map to their prompt type."""
+        assert get_prompt_type(NodeResolutions) == 'dedupe_nodes'
+
+    def test_custom_entity_model(self):
+        """Unknown response models are treated as attribute extraction."""
+        assert get_prompt_type(BugReport) == PROMPT_TYPE_ATTRIBUTES
+
+    def test_no_response_model(self):
+        """Calls without a response model are plain text prompts."""
+        assert get_prompt_type(None) == PROMPT_TYPE_TEXT
+
+
+class TestParseOverrides:
+    """Tests for parsing LLM_MODEL_OVERRIDES."""
+
+    def test_parse_pairs(self):
+        """Comma-separated pairs are parsed with whitespace stripped."""
+        result = parse_model_overrides(' dedupe_nodes=small, extract_nodes = gpt-4o ')
+        assert result == {'dedupe_nodes': 'small', 'extract_nodes': 'gpt-4o'}
+
+    def test_malformed_pairs_ignored(self):
+        """Entries without a prompt type or model are skipped."""
+        assert parse_model_overrides('dedupe_nodes,=gpt-4o,summarize_nodes=') == {}
+
+    def test_empty_spec(self):
+        """An unset spec yields no overrides."""
+        assert parse_model_overrides(None) == {}
+
+
+class TestModelRouter:
+    """Tests for model selection."""
+
+    def test_small_calls_use_small_model(self):
+        """Calls tagged small route to the small model."""
+        router = ModelRouter(model='gpt-4o', small_model='gpt-4o-mini')
+        assert router.select(ModelSize.small, NodeResolutions) == 'gpt-4o-mini'
+        assert router.select(ModelSize.medium, NodeResolutions) == 'gpt-4o'
+
+    def test_small_falls_back_to_model(self):
+        """Without a small model, every call uses the default model."""
+        router = ModelRouter(model='gpt-4o')
+        assert router.select(ModelSize.small, None) == 'gpt-4o'
+
+    def test_override_beats_tag(self):
+        """Per-prompt overrides take precedence over the size tag."""
+        router = ModelRouter(
+            model='gpt-4o',
+            small_model='gpt-4o-mini',
+            overrides={'dedupe_nodes': 'large', 'extract_attributes': 'o3-mini'},
+        )
+        assert router.select(ModelSize.small, NodeResolutions) == 'gpt-4o'
+        assert router.select(ModelSize.small, BugReport) == 'o3-mini'
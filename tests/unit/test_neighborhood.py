@@ -0,0 +1,131 @@
+"""
+Unit tests for the neighborhood expansion module.
+Tests fan-out cap validation, the generated traversal query and the conversion of the
+traversal result into nodes, hops and edges.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from neo4j.time import DateTime
+
+from mcp_server.neighborhood import (
+    MAX_DEPTH,
+    build_neighborhood_query,
+    edge_validity_clause,
+    expand_neighborhood,
+    fanout_per_hop,
+)
+
+CREATED = datetime(2025, 1, 1, tzinfo=timezone.utc)
+DB_CREATED = DateTime.from_native(CREATED)
+
+
+class FakeDriver:
+    """Driver recording the traversal query and returning one prepared record."""
+
+    def __init__(self, record):
+        self.record = record
+        self.calls = []
+
+    async def execute_query(self, query, **params):
+        self.calls.append((query, params))
+        return [self.record], None, None
+
+
+def node_record(uuid, hop):
+    return {
+        'uuid': uuid,
+        'name': uuid.upper(),
+        'group_id': 'g',
+        'summary': '',
+        'created_at': DB_CREATED,
+        'labels': ['Entity'],
+        'attributes': {'uuid': uuid, 'name_embedding': [0.1], 'team': 'core'},
+        'hop': hop,
+    }
+
+
+def edge_record(uuid, source, target):
+    return {
+        'uuid': uuid,
+        'group_id': 'g',
+        'name': 'WORKS_WITH',
+        'fact': f'{source} works with {target}',
+        'episodes': [],
+        'created_at': DB_CREATED,
+        'expired_at': None,
+        'valid_at': None,
+        'invalid_at': None,
+        'source_node_uuid': source,
+        'target_node_uuid': target,
+        'attributes': {'uuid': uuid, 'fact_embedding': [0.2]},
+    }
+
+
+class TestFanoutPerHop:
+    """Tests for fan-out cap expansion."""
+
+    def test_single_cap_and_short_list_are_expanded(self):
+        """One cap applies to every hop; a short list repeats its last cap."""
+        assert fanout_per_hop(5, 3) == [5, 5, 5]
+        assert fanout_per_hop([20, 5], 3) == [20, 5, 5]
+
+    def test_out_of_range_values_are_rejected(self):
+        """Depth, list length and cap values are bounded."""
+        with pytest.raises(ValueError):
+            fanout_per_hop(5, MAX_DEPTH + 1)
+        with pytest.raises(ValueError):
+            fanout_per_hop([5, 5], 1)
+        with pytest.raises(ValueError):
+            fanout_per_hop(0, 1)
+
+
+class TestNeighborhoodQuery:
+    """Tests for the generated traversal query."""
+
+    def test_one_capped_subquery_per_hop(self):
+        """Each hop limits its edges by its own fan-out parameter and returns every frontier."""
+        query = build_neighborhood_query(2, None)
+        assert query.count('LIMIT $fanout_') == 2
+        assert '$fanout_1' in query and '$fanout_2' in query
+        assert 'hop: 0' in query and 'hop: 2' in query
+        assert '$as_of' not in query
+
+    def test_validity_clause_for_current_and_historical_edges(self):
+        """Current edges must also be unexpired; historical edges only need their validity range."""
+        assert 'expired_at IS NULL' in edge_validity_clause('r', 'as_of', current_only=True)
+        assert 'expired_at' not in edge_validity_clause('r', 'as_of', current_only=False)
+
+
+class TestExpandNeighborhood:
+    """Tests for running the traversal and reading its result."""
+
+    def test_result_nodes_hops_edges_and_missing_seeds(self):
+        """Hops come from the record, embeddings are dropped and unknown seeds are reported."""
+        driver = FakeDriver(
+            {'nodes': [node_record('a', 0), node_record('b', 1)], 'edges': [edge_record('e1', 'a', 'b')]}
+        )
+        result = asyncio.run(expand_neighborhood(driver, ['a', 'x', 'a'], depth=2, max_per_node=[10, 3]))
+
+        assert [node.uuid for node in result.nodes] == ['a', 'b']
+        assert result.hops == {'a': 0, 'b': 1}
+        assert result.nodes[0].attributes == {'team': 'core'}
+        assert result.edges[0].attributes == {}
+        assert result.missing_uuids == ['x']
+
+        _, params = driver.calls[0]
+        assert params['node_uuids'] == ['a', 'x']
+        assert params['fanout_1'] == 10 and params['fanout_2'] == 3
+        assert 'as_of' in params
+
+    def test_as_of_and_include_invalid(self):
+        """as_of is passed to the query; include_invalid drops the validity predicate."""
+        driver = FakeDriver({'nodes': [], 'edges': []})
+        asyncio.run(expand_neighborhood(driver, ['a'], as_of=CREATED))
+        query, params = driver.calls[0]
+        assert params['as_of'] == CREATED and 'expired_at IS NULL' not in query
+
+        asyncio.run(expand_neighborhood(driver, ['a'], include_invalid=True))
+        query, params = driver.calls[1]
+        assert 'as_of' not in params and '$as_of' not in query
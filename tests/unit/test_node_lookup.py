@@ -0,0 +1,104 @@
+"""
+Unit tests for the node lookup module.
+Tests lookups by UUID in request order, the query built for each name matching mode and
+the validation of lookup lists.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from neo4j.time import DateTime
+
+from mcp_server.node_lookup import (
+    MAX_LOOKUPS,
+    fetch_nodes_by_uuids,
+    find_by_name_query,
+    match_nodes_by_name,
+    name_fulltext_query,
+)
+
+DB_CREATED = DateTime.from_native(datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+
+class FakeDriver:
+    """Driver recording the lookup query and returning prepared records."""
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    async def execute_query(self, query, **params):
+        self.calls.append((query, params))
+        return self.records, None, None
+
+
+def node_record(uuid, name, **extra):
+    return {
+        'uuid': uuid,
+        'name': name,
+        'group_id': 'g',
+        'summary': '',
+        'created_at': DB_CREATED,
+        'labels': ['Entity'],
+        'attributes': {'uuid': uuid, 'name': name, 'name_embedding': [0.1]},
+        **extra,
+    }
+
+
+class TestFetchNodesByUuids:
+    """Tests for lookups by UUID."""
+
+    def test_request_order_and_missing(self):
+        """Nodes follow the requested order; duplicates are looked up once and absent UUIDs reported."""
+        driver = FakeDriver([node_record('b', 'B'), node_record('a', 'A')])
+        nodes, missing = asyncio.run(fetch_nodes_by_uuids(driver, ['a', 'c', 'b', 'a']))
+
+        assert [node.uuid for node in nodes] == ['a', 'b']
+        assert missing == ['c']
+        assert driver.calls[0][1]['uuids'] == ['a', 'c', 'b']
+        assert 'UNWIND $uuids' in driver.calls[0][0]
+
+    def test_validation(self):
+        """Empty and oversized lookup lists are rejected before querying."""
+        driver = FakeDriver([])
+        with pytest.raises(ValueError):
+            asyncio.run(fetch_nodes_by_uuids(driver, ['', ' ']))
+        with pytest.raises(ValueError):
+            asyncio.run(fetch_nodes_by_uuids(driver, [str(i) for i in range(MAX_LOOKUPS + 1)]))
+        assert driver.calls == []
+
+
+class TestMatchNodesByName:
+    """Tests for lookups by name."""
+
+    def test_query_per_mode(self):
+        """Case-sensitive modes compare n.name directly; case-insensitive ones go through the fulltext index."""
+        assert 'n.name = lookup.name' in find_by_name_query(False, False)
+        assert 'n.name STARTS WITH lookup.name' in find_by_name_query(False, True)
+        insensitive = find_by_name_query(True, True)
+        assert 'db.index.fulltext.queryNodes' in insensitive
+        assert 'toLower(n.name) STARTS WITH toLower(lookup.name)' in insensitive
+
+    def test_fulltext_query(self):
+        """Names become a lowercased phrase, or word prefixes, restricted to the groups."""
+        assert name_fulltext_query('Auth Service', False, ['g']) == '(group_id:"g") AND name:"auth service"'
+        assert name_fulltext_query('Auth Serv', True, ['g', 'h']) == (
+            '(group_id:"g" OR group_id:"h") AND name:(auth AND serv*)'
+        )
+
+    def test_matches_grouped_by_name(self):
+        """Records are grouped under the name they matched; names without records map to empty lists."""
+        driver = FakeDriver(
+            [
+                node_record('a', 'Alice', lookup_name='alice'),
+                node_record('b', 'ALICE', lookup_name='alice'),
+            ]
+        )
+        matches = asyncio.run(match_nodes_by_name(driver, ['alice', 'bob'], ['g'], case_insensitive=True))
+
+        assert [node.uuid for node in matches['alice']] == ['a', 'b']
+        assert matches['bob'] == []
+        params = driver.calls[0][1]
+        assert params['lookups'][0] == {'name': 'alice', 'query': '(group_id:"g") AND name:"alice"'}
+        with pytest.raises(ValueError):
+            asyncio.run(match_nodes_by_name(driver, ['alice'], ['g'], limit=0))
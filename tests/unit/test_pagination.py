@@ -0,0 +1,139 @@
+"""
+Unit tests for the pagination module.
+Tests cursor encoding, ranked snapshot paging and expiry, and keyset episode pages.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from mcp_server.pagination import (
+    InvalidCursorError,
+    RankedResultStore,
+    decode_cursor,
+    encode_cursor,
+    get_episode_page,
+)
+
+
+class TestCursors:
+    """Tests for cursor encoding."""
+
+    def test_round_trip(self):
+        """Cursors decode to the fields they were built from."""
+        cursor = encode_cursor('search_facts', s='abc', o=10)
+        assert '=' not in cursor
+        assert decode_cursor(cursor, 'search_facts') == {'s': 'abc', 'o': 10}
+
+    def test_rejects_other_tool_and_garbage(self):
+        """Cursors of another tool and malformed strings are rejected."""
+        cursor = encode_cursor('search_facts', s='abc', o=10)
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, 'search_nodes')
+        with pytest.raises(InvalidCursorError):
+            decode_cursor('not a cursor!', 'search_nodes')
+
+
+class TestRankedResultStore:
+    """Tests for ranked snapshot paging."""
+
+    def test_pages_cover_snapshot(self):
+        """Following cursors walks the ranking once, in order."""
+        store = RankedResultStore()
+        uuids = [f'u{i}' for i in range(7)]
+        cursor = store.first_page('search_nodes', uuids, 3)
+        pages = []
+        while cursor:
+            page, cursor = store.page('search_nodes', cursor, 3)
+            pages.append(page)
+        assert pages == [['u3', 'u4', 'u5'], ['u6']]
+        assert store.stats()['pages_served'] == 2
+
+    def test_single_page_needs_no_snapshot(self):
+        """Rankings that fit the first page produce no cursor."""
+        store = RankedResultStore()
+        assert store.first_page('search_nodes', ['a', 'b'], 5) is None
+        assert len(store) == 0
+
+    def test_expired_and_evicted_snapshots(self):
+        """Cursors of expired or evicted snapshots are rejected and not live."""
+        store = RankedResultStore(max_snapshots=1, ttl_seconds=0)
+        cursor = store.first_page('search_facts', ['a', 'b'], 1)
+        assert not store.is_live(cursor)
+        with pytest.raises(InvalidCursorError):
+            store.page('search_facts', cursor, 1)
+
+        store.ttl_seconds = 60
+        first = store.first_page('search_facts', ['a', 'b'], 1)
+        second = store.first_page('search_facts', ['c', 'd'], 1)
+        assert not store.is_live(first) and store.is_live(second) and store.is_live(None)
+
+
+class FakeDriver:
+    """Driver returning canned episode records and recording query parameters."""
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    async def execute_query(self, query, **params):
+        self.calls.append((query, params))
+        return self.records[: params['limit']], None, None
+
+
+def episode_record(index: int):
+    # The Neo4j driver returns neo4j.time.DateTime; graphiti-core also accepts ISO strings
+    created_at = (datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=index)).isoformat()
+    return {
+        'content': f'episode {index}',
+        'created_at': created_at,
+        'valid_at': created_at,
+        'uuid': f'uuid-{index}',
+        'name': f'Episode {index}',
+        'group_id': 'g',
+        'source_description': '',
+        'source': 'text',
+        'entity_edges': [],
+    }
+
+
+class TestEpisodePages:
+    """Tests for keyset episode pagination."""
+
+    def test_next_cursor_carries_keyset(self):
+        """A full page returns a cursor positioned at its last (oldest) episode."""
+        driver = FakeDriver([episode_record(i) for i in (5, 4, 3)])
+        episodes, cursor = asyncio.run(get_episode_page(driver, 'g', 2))
+        assert [e.uuid for e in episodes] == ['uuid-5', 'uuid-4']
+        assert driver.calls[0][1]['limit'] == 3
+
+        fields = decode_cursor(cursor, 'get_episodes')
+        assert fields['g'] == 'g' and fields['u'] == 'uuid-4'
+
+        asyncio.run(get_episode_page(driver, 'g', 2, cursor))
+        query, params = driver.calls[1]
+        assert '$created_at' in query
+        assert params['uuid'] == 'uuid-4'
+        assert params['created_at'] == episodes[-1].created_at
+
+    def test_last_page_and_group_mismatch(self):
+        """A short page has no cursor; a cursor from another group is rejected."""
+        driver = FakeDriver([episode_record(1)])
+        episodes, cursor = asyncio.run(get_episode_page(driver, 'g', 2))
+        assert len(episodes) == 1 and cursor is None
+
+        other = encode_cursor('get_episodes', g='other', t='2025-01-01T00:00:00+00:00', u='x')
+        with pytest.raises(InvalidCursorError):
+            asyncio.run(get_episode_page(driver, 'g', 2, other))
+
+    def test_time_range_source_filters_and_no_content(self):
+        """Time bounds and source filters become query conditions; content can be left out."""
+        driver = FakeDriver([episode_record(1)])
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2025, 1, 2, tzinfo=timezone.utc)
+        asyncio.run(get_episode_page(driver, 'g', 10, start=start, end=end, sources=['message'], include_content=False))
+        query, params = driver.calls[0]
+        assert 'e.created_at >= $start' in query and 'e.created_at < $end' in query
+        assert 'e.source IN $sources' in query and 'source_description' not in params
+        assert "'' AS content" in query
+        assert params['start'] == start and params['end'] == end and params['sources'] == ['message']
@@ -0,0 +1,64 @@
+"""
+Unit tests for the projection module.
+Tests field validation, compact defaults, text truncation and projected serialization.
+"""
+from datetime import datetime, timezone
+
+import pytest
+from graphiti_core.nodes import EpisodeType, EpisodicNode
+
+from mcp_server.projection import FULL_PROJECTION, build_projection, truncate_text
+
+
+class TestBuildProjection:
+    """Tests for building projections from tool parameters."""
+
+    def test_defaults_to_full_projection(self):
+        """Without fields or compact every field is serialized and nothing is truncated."""
+        projection = build_projection('nodes', None, False, 100)
+        assert projection is FULL_PROJECTION
+        assert projection.includes('attributes') and projection.include_set() is None
+        assert projection.truncate('x' * 500) == 'x' * 500
+
+    def test_compact_and_explicit_fields(self):
+        """Compact mode picks the compact set and the budget; explicit fields take precedence."""
+        compact = build_projection('facts', None, True, 100)
+        assert compact.includes('fact') and not compact.includes('episodes')
+        assert compact.text_limit == 100
+
+        chosen = build_projection('facts', ['uuid', 'fact'], False, 100)
+        assert chosen.include_set() == {'uuid', 'fact'} and chosen.text_limit is None
+        assert chosen.cache_params() == {'fields': ['fact', 'uuid'], 'text_limit': None}
+
+    def test_unknown_field_rejected(self):
+        """Fields that do not exist for the kind are reported with the available ones."""
+        with pytest.raises(ValueError, match='fact_embedding'):
+            build_projection('facts', ['uuid', 'fact_embedding'])
+
+
+class TestTruncation:
+    """Tests for text truncation."""
+
+    def test_truncates_at_word_boundary(self):
+        """Long text is cut within budget at a space and marked with an ellipsis."""
+        text = 'alpha beta gamma delta epsilon'
+        short = truncate_text(text, 20)
+        assert short == 'alpha beta gamma…'
+        assert len(short) <= 20
+        assert truncate_text(text, 100) == text
+        assert truncate_text(None, 10) is None
+
+    def test_projected_episode_serialization(self):
+        """Excluded episode fields are not serialized and content is truncated in compact mode."""
+        episode = EpisodicNode(
+            name='Episode',
+            group_id='g',
+            source=EpisodeType.text,
+            source_description='',
+            content='word ' * 200,
+            valid_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        )
+        projection = build_projection('episodes', None, True, 50)
+        result = episode.model_dump(mode='json', include=projection.include_set())
+        assert set(result) == {'uuid', 'name', 'created_at', 'content'}
+        assert len(projection.truncate(result['content'])) <= 50
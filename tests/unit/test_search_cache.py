@@ -0,0 +1,194 @@
+"""
+Unit tests for the search result cache module.
+Tests key normalization, generation-based invalidation, TTL expiry, the shared backend level
+and near-duplicate query reuse.
+"""
+import asyncio
+
+from mcp_server.search_cache import SearchResultCache, SemanticQueryIndex
+
+
+class FakeBackend:
+    """In-memory stand-in for the Redis backend."""
+
+    def __init__(self, fail: bool = False):
+        self.values = {}
+        self.counters = {}
+        self.fail = fail
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError('redis down')
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        self.values[key] = value
+
+    async def generations(self, names):
+        if self.fail:
+            raise ConnectionError('redis down')
+        return [self.counters.get(name, 0) for name in names]
+
+    async def bump(self, name):
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    async def close(self):
+        pass
+
+
+PARAMS = {'query': 'Who is Alice?', 'group_ids': ['a', 'b'], 'max_nodes': 10, 'center_node_uuid': None}
+
+
+class TestSearchResultCache:
+    """Tests for the in-process level and invalidation."""
+
+    def test_key_ignores_group_order_and_whitespace(self):
+        """Equivalent calls share a key; a different limit does not."""
+        cache = SearchResultCache()
+
+        async def run():
+            key = await cache.make_key('search_nodes', PARAMS)
+            same = await cache.make_key(
+                'search_nodes', {**PARAMS, 'query': '  Who   is Alice? ', 'group_ids': ['b', 'a']}
+            )
+            other = await cache.make_key('search_nodes', {**PARAMS, 'max_nodes': 5})
+            other_tool = await cache.make_key('search_facts', PARAMS)
+            return key, same, other, other_tool
+
+        key, same, other, other_tool = asyncio.run(run())
+        assert key == same
+        assert len({key, other, other_tool}) == 3
+
+    def test_hit_returns_copy(self):
+        """Cached responses are returned as fresh copies."""
+        cache = SearchResultCache()
+
+        async def run():
+            key = await cache.make_key('search_nodes', PARAMS)
+            assert await cache.get(key) is None
+            await cache.put(key, {'message': 'ok', 'nodes': [{'uuid': '1'}]})
+            first = await cache.get(key)
+            first['nodes'].clear()
+            return await cache.get(key)
+
+        assert asyncio.run(run()) == {'message': 'ok', 'nodes': [{'uuid': '1'}]}
+        stats = cache.stats()
+        assert stats['memory_hits'] == 2 and stats['misses'] == 1 and stats['stores'] == 1
+
+    def test_invalidation_is_per_group(self):
+        """Bumping a searched group changes the key; bumping another group does not."""
+        cache = SearchResultCache()
+
+        async def run():
+            key = await cache.make_key('search_nodes', PARAMS)
+            await cache.put(key, {'nodes': []})
+            await cache.invalidate(['unrelated'])
+            unchanged = await cache.make_key('search_nodes', PARAMS)
+            await cache.invalidate(['b'])
+            changed = await cache.make_key('search_nodes', PARAMS)
+            return key, unchanged, changed
+
+        key, unchanged, changed = asyncio.run(run())
+        assert unchanged == key
+        assert changed != key
+
+    def test_invalidate_all(self):
+        """Clearing the graph invalidates every group and drops the local entries."""
+        cache = SearchResultCache()
+
+        async def run():
+            key = await cache.make_key('search_nodes', PARAMS)
+            await cache.put(key, {'nodes': []})
+            await cache.invalidate_all()
+            return key, await cache.make_key('search_nodes', PARAMS)
+
+        key, new_key = asyncio.run(run())
+        assert new_key != key
+        assert cache.stats()['entries'] == 0
+
+    def test_ttl_and_capacity(self):
+        """Entries expire after the TTL and the LRU stays within capacity."""
+        cache = SearchResultCache(max_entries=2, ttl_seconds=0)
+
+        async def run():
+            await cache.put('k1', 1)
+            expired = await cache.get('k1')
+            cache.ttl_seconds = 60
+            for key in ('k1', 'k2', 'k3'):
+                await cache.put(key, key)
+            return expired, await cache.get('k1'), await cache.get('k3')
+
+        expired, evicted, kept = asyncio.run(run())
+        assert expired is None and evicted is None and kept == 'k3'
+        assert cache.stats()['entries'] == 2
+
+
+class TestSharedBackend:
+    """Tests for the shared second level."""
+
+    def test_replicas_share_results_and_generations(self):
+        """A result stored by one replica is served by another until a write invalidates it."""
+        backend = FakeBackend()
+        replica_a = SearchResultCache(backend=backend)
+        replica_b = SearchResultCache(backend=backend)
+
+        async def run():
+            key = await replica_a.make_key('search_facts', PARAMS)
+            await replica_a.put(key, {'facts': ['x']})
+            shared = await replica_b.get(await replica_b.make_key('search_facts', PARAMS))
+            await replica_a.invalidate(['a'])
+            after_write = await replica_b.make_key('search_facts', PARAMS)
+            return shared, key, after_write
+
+        shared, key, after_write = asyncio.run(run())
+        assert shared == {'facts': ['x']}
+        assert replica_b.stats()['shared_hits'] == 1
+        assert after_write != key
+
+    def test_backend_outage_bypasses_cache(self):
+        """When the backend is unreachable no key is produced, so searches run uncached."""
+        cache = SearchResultCache(backend=FakeBackend(fail=True))
+
+        key = asyncio.run(cache.make_key('search_nodes', PARAMS))
+        assert key is None
+        assert cache.stats()['backend_errors'] == 1
+
+
+class TestSemanticReuse:
+    """Tests for near-duplicate query matching."""
+
+    def test_index_threshold_and_ring_buffer(self):
+        """Only vectors above the threshold match, and old queries are overwritten."""
+        index = SemanticQueryIndex(threshold=0.9, max_per_scope=2)
+        index.add('scope', [1.0, 0.0], 'k1')
+        assert index.find('scope', [0.99, 0.05])[0] == 'k1'
+        assert index.find('scope', [0.0, 1.0]) is None
+        assert index.find('other-scope', [1.0, 0.0]) is None
+        index.add('scope', [0.0, 1.0], 'k2')
+        index.add('scope', [0.7, 0.7], 'k3')
+        assert len(index) == 2
+        assert index.find('scope', [1.0, 0.0]) is None
+
+    def test_paraphrase_served_within_scope(self):
+        """A near-duplicate query gets the cached result; other groups and stale generations do not."""
+        cache = SearchResultCache(semantic=SemanticQueryIndex(threshold=0.95))
+
+        async def run():
+            keys = await cache.make_keys('search_facts', PARAMS)
+            await cache.put(keys.key, {'facts': ['x']}, scope=keys.scope, query_vector=[1.0, 0.0, 0.0])
+            paraphrase = await cache.make_keys('search_facts', {**PARAMS, 'query': 'Who is Alice'})
+            exact = await cache.get(paraphrase.key)
+            similar = await cache.get_similar(paraphrase.scope, [0.98, 0.1, 0.0])
+            other = await cache.make_keys('search_facts', {**PARAMS, 'group_ids': ['c']})
+            elsewhere = await cache.get_similar(other.scope, [1.0, 0.0, 0.0])
+            await cache.invalidate(['a'])
+            after_write = await cache.make_keys('search_facts', PARAMS)
+            stale = await cache.get_similar(after_write.scope, [1.0, 0.0, 0.0])
+            return exact, similar, elsewhere, stale
+
+        exact, similar, elsewhere, stale = asyncio.run(run())
+        assert exact is None
+        assert similar == {'facts': ['x']}
+        assert elsewhere is None and stale is None
+        stats = cache.stats()
+        assert stats['semantic_hits'] == 1 and stats['hit_rate'] == 1.0
@@ -0,0 +1,76 @@
+"""
+Unit tests for the search decay module.
+Tests importance levels, the blended decay score and the re-ordering of ranked candidates.
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from mcp_server.search_decay import NEUTRAL_IMPORTANCE, DecayPolicy, decay_scores, importance_of, rescore
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def candidate(uuid, age_days, **attributes):
+    return SimpleNamespace(uuid=uuid, created_at=NOW - timedelta(days=age_days), attributes=attributes)
+
+
+def uuids(candidates):
+    return [c.uuid for c in candidates]
+
+
+class TestDecayPolicy:
+    """Tests for policy validation."""
+
+    def test_invalid_policies(self):
+        """Non-positive half-lives and weights adding up to more than 1 are rejected."""
+        with pytest.raises(ValueError):
+            DecayPolicy(half_life_days=0)
+        with pytest.raises(ValueError):
+            DecayPolicy(recency_weight=0.8, importance_weight=0.3)
+        with pytest.raises(ValueError):
+            DecayPolicy().with_half_life('soon')
+        assert DecayPolicy().with_half_life(7).half_life_days == 7.0
+
+
+class TestDecayScores:
+    """Tests for the blended score."""
+
+    def test_half_life_and_importance(self):
+        """Recency halves every half-life; unknown times get no recency."""
+        policy = DecayPolicy(half_life_days=10, recency_weight=1.0, importance_weight=0.0)
+        now = NOW.timestamp()
+        timestamps = np.array([now, now - 10 * 86400, np.nan])
+        scores = decay_scores(timestamps, np.zeros(3), policy, now)
+        assert scores == pytest.approx([1.0, 0.5, 0.0])
+
+        assert importance_of({'importance_level': 'Critical'}) == 1.0
+        assert importance_of({'severity': 'low'}) == 0.25
+        assert importance_of({'importance_level': 'unknown'}) == NEUTRAL_IMPORTANCE
+
+
+class TestRescore:
+    """Tests for re-ordering ranked candidates."""
+
+    def test_recent_candidate_moves_up(self):
+        """A slightly less relevant but recent candidate overtakes an old one."""
+        ranked = [candidate('old', 365), candidate('recent', 1), candidate('older', 400)]
+        policy = DecayPolicy(half_life_days=30, recency_weight=0.5, importance_weight=0.0)
+        order = rescore(ranked, lambda c: c.created_at, lambda c: c.attributes, policy, now=NOW)
+        assert uuids(order) == ['recent', 'old', 'older']
+
+    def test_importance_breaks_even_recency(self):
+        """With equal ages the more important candidate ranks first; without weights the order is kept."""
+        ranked = [candidate('low', 5, importance_level='low'), candidate('critical', 5, importance_level='critical')]
+        policy = DecayPolicy(recency_weight=0.0, importance_weight=0.6)
+        assert uuids(rescore(ranked, lambda c: c.created_at, lambda c: c.attributes, policy, now=NOW)) == [
+            'critical',
+            'low',
+        ]
+        neutral = DecayPolicy(recency_weight=0.0, importance_weight=0.0)
+        assert uuids(rescore(ranked, lambda c: c.created_at, lambda c: c.attributes, neutral, now=NOW)) == [
+            'low',
+            'critical',
+        ]
@@ -0,0 +1,197 @@
+"""
+Unit tests for the search filter pushdown module.
+Tests label and attribute validation, typed values, time ranges, the generated Cypher
+predicates, the filtered node fulltext search and attribute index statements.
+"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
+import pytest
+from graphiti_core.search import search as graphiti_search_module
+from graphiti_core.search import search_utils
+from graphiti_core.search.search_filters import SearchFilters
+from neo4j.time import DateTime
+from pydantic import BaseModel, Field
+
+from mcp_server.search_filters import (
+    FilterError,
+    attribute_index_statements,
+    build_edge_filters,
+    build_node_filters,
+    ensure_attribute_indexes,
+    install_filter_pushdown,
+    node_fulltext_query,
+    node_pushdown_query,
+)
+
+
+class BugReport(BaseModel):
+    severity: Optional[str] = Field(None, description='Severity of the bug')
+    occurrences: int = Field(0, description='Times the bug was seen')
+
+
+ENTITY_TYPES = {'BugReport': BugReport}
+
+
+@pytest.fixture
+def pushdown(monkeypatch):
+    """Install the filter pushdown for one test; graphiti-core's constructors are restored after it."""
+    for name in ('node_search_filter_query_constructor', 'edge_search_filter_query_constructor'):
+        monkeypatch.setattr(search_utils, name, getattr(search_utils, name))
+    monkeypatch.setattr(graphiti_search_module, 'node_fulltext_search', graphiti_search_module.node_fulltext_search)
+    install_filter_pushdown()
+
+
+class FakeDriver:
+    """Driver recording the search query and returning prepared records."""
+
+    provider = 'neo4j'
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    async def execute_query(self, cypher_query_, **params):
+        self.calls.append((cypher_query_, params))
+        return self.records, None, None
+
+
+class TestBuildNodeFilters:
+    """Tests for translating tool parameters into node filters."""
+
+    def test_labels_and_typed_attributes(self):
+        """Labels are deduplicated and typed attribute values are validated against the model."""
+        filters = build_node_filters(
+            labels=['BugReport', 'Preference', 'BugReport'],
+            attribute_filters=[{'entity': 'BugReport', 'property': 'occurrences', 'op': '>=', 'value': '3'}],
+            entity_types=ENTITY_TYPES,
+        )
+        assert filters.node_labels == ['BugReport', 'Preference']
+        predicate = filters.attribute_predicates[0]
+        assert (predicate.property, predicate.op, predicate.value) == ('occurrences', '>=', 3)
+
+    def test_invalid_filters_rejected(self):
+        """Injection attempts, unknown types, attributes, operators and bad values are rejected."""
+        with pytest.raises(FilterError):
+            build_node_filters(labels=['Entity) DETACH DELETE n //'])
+        with pytest.raises(FilterError, match='Unknown entity type'):
+            build_node_filters(attribute_filters=[{'entity': 'Nope', 'property': 'x', 'value': 1}])
+        with pytest.raises(FilterError, match='no attribute'):
+            build_node_filters(
+                attribute_filters=[{'entity': 'BugReport', 'property': 'owner', 'value': 'a'}],
+                entity_types=ENTITY_TYPES,
+            )
+        with pytest.raises(FilterError, match='Unknown operator'):
+            build_node_filters(attribute_filters=[{'property': 'status', 'op': '=~', 'value': '.*'}])
+        with pytest.raises(FilterError, match='Invalid value'):
+            build_node_filters(
+                attribute_filters=[{'entity': 'BugReport', 'property': 'occurrences', 'value': 'many'}],
+                entity_types=ENTITY_TYPES,
+            )
+        with pytest.raises(FilterError, match='ISO 8601'):
+            build_node_filters(created_after='yesterday')
+
+
+class TestPushdownQuery:
+    """Tests for the generated Cypher predicates."""
+
+    def test_node_predicates_and_parameters(self):
+        """Time ranges and attribute predicates become parameterized predicates on n."""
+        filters = build_node_filters(
+            attribute_filters=[
+                {'entity': 'BugReport', 'property': 'severity', 'value': 'high'},
+                {'property': 'status', 'op': 'in', 'value': ['open', 'triaged']},
+            ],
+            created_after='2025-01-01',
+            entity_types=ENTITY_TYPES,
+        )
+        query, params = node_pushdown_query(filters)
+        assert 'n.created_at >= $pushdown_created_at_0_0' in query
+        assert '(n:BugReport AND n.severity = $pushdown_attr_0)' in query
+        assert 'n.status IN $pushdown_attr_1' in query
+        assert params['pushdown_created_at_0_0'] == datetime(2025, 1, 1, tzinfo=timezone.utc)
+        assert params['pushdown_attr_1'] == ['open', 'triaged']
+
+    def test_installed_constructor_keeps_label_filter(self, pushdown):
+        """After installation graphiti-core node searches get labels plus the pushed-down predicates."""
+        install_filter_pushdown()
+        filters = build_node_filters(labels=['BugReport'], created_before='2025-06-01T00:00:00Z')
+        query, params = search_utils.node_search_filter_query_constructor(filters)
+        assert query.startswith(' AND n:BugReport')
+        assert 'n.created_at < $pushdown_created_at_0_0' in query and len(params) == 1
+
+    def test_fulltext_filters_before_limit(self, pushdown):
+        """Filtered node fulltext searches read deeper and filter the hits before limiting them."""
+        created = DateTime.from_native(datetime(2025, 1, 1, tzinfo=timezone.utc))
+        record = {
+            'uuid': 'n1',
+            'name': 'Login bug',
+            'group_id': 'g',
+            'created_at': created,
+            'summary': '',
+            'labels': ['Entity', 'BugReport'],
+            'attributes': {},
+        }
+        driver = FakeDriver([record])
+        filters = build_node_filters(labels=['BugReport'])
+        nodes = asyncio.run(graphiti_search_module.node_fulltext_search(driver, 'login', filters, ['g'], 5))
+
+        assert [node.uuid for node in nodes] == ['n1']
+        query, params = driver.calls[0]
+        assert query.index('n:BugReport') < query.index('LIMIT $limit')
+        assert params['limit'] == 5 and params['fulltext_limit'] == 100
+
+    def test_unfiltered_fulltext_is_unchanged(self, pushdown, monkeypatch):
+        """Without filters the search goes to graphiti-core's own fulltext search."""
+        calls = []
+
+        async def original(driver, query, search_filter, group_ids, limit):
+            calls.append(limit)
+            return []
+
+        monkeypatch.setattr('mcp_server.search_filters._original_node_fulltext_search', original)
+        asyncio.run(graphiti_search_module.node_fulltext_search(FakeDriver([]), 'login', SearchFilters(), ['g'], 5))
+        assert calls == [5]
+        assert 'fulltext_limit' not in node_fulltext_query('falkordb', ' AND n:BugReport')
+
+    def test_edge_time_ranges(self):
+        """Fact searches use the created_at/valid_at filters graphiti-core already supports."""
+        filters = build_edge_filters(created_after='2025-01-01', valid_before='2025-02-01')
+        assert filters.created_at[0][0].comparison_operator.value == '>='
+        assert filters.valid_at[0][0].comparison_operator.value == '<'
+        assert filters.invalid_at is None
+
+    def test_edge_as_of_pushdown(self, pushdown):
+        """as_of becomes a validity predicate of fact searches; without it the query is unchanged."""
+        filters = build_edge_filters(as_of='2025-03-01T00:00:00Z')
+        query, params = search_utils.edge_search_filter_query_constructor(filters)
+        assert '(r.valid_at IS NULL OR r.valid_at <= $pushdown_as_of)' in query
+        assert '(r.invalid_at IS NULL OR r.invalid_at > $pushdown_as_of)' in query
+        assert params == {'pushdown_as_of': datetime(2025, 3, 1, tzinfo=timezone.utc)}
+        assert search_utils.edge_search_filter_query_constructor(build_edge_filters()) == ('', {})
+        with pytest.raises(FilterError):
+            build_edge_filters(as_of='yesterday')
+
+
+class TestAttributeIndexes:
+    """Tests for attribute index creation."""
+
+    def test_statements_and_failures(self):
+        """One idempotent index per entity attribute; failing statements are skipped."""
+        statements = attribute_index_statements(ENTITY_TYPES)
+        assert statements == [
+            'CREATE INDEX attr_bugreport_severity IF NOT EXISTS FOR (n:BugReport) ON (n.severity)',
+            'CREATE INDEX attr_bugreport_occurrences IF NOT EXISTS FOR (n:BugReport) ON (n.occurrences)',
+        ]
+
+        class FlakyDriver:
+            def __init__(self):
+                self.calls = 0
+
+            async def execute_query(self, query, **params):
+                self.calls += 1
+                if self.calls == 1:
+                    raise RuntimeError('index failed')
+
+        assert asyncio.run(ensure_attribute_indexes(FlakyDriver(), ENTITY_TYPES)) == 1
@@ -0,0 +1,162 @@
+"""
+Unit tests for reranker selection and search stage timing.
+Tests the rerank policy, shared search configs, per-request stage timings and the
+aggregated stage latencies with the slow search log.
+"""
+import asyncio
+
+import pytest
+from graphiti_core.search.search_config import EdgeReranker, NodeReranker
+from graphiti_core.search.search_config_recipes import NODE_HYBRID_SEARCH_RRF
+
+from mcp_server.search_recipes import RerankPolicy, RerankStats, get_search_config, ranking_depth
+from mcp_server.search_timing import (
+    SearchLatencyStats,
+    TimedCrossEncoder,
+    add_timing,
+    collect_timings,
+    stage,
+    timed,
+)
+
+
+class TestRerankPolicy:
+    """Tests for resolving the reranker of a call."""
+
+    def test_defaults(self):
+        """Calls without a reranker get the policy default, or node_distance with a center node."""
+        policy = RerankPolicy(default='mmr')
+        assert policy.resolve(None) == 'mmr'
+        assert policy.resolve(None, center_node_uuid='n1') == 'node_distance'
+        assert policy.resolve('Cross_Encoder') == 'cross_encoder'
+
+    def test_rejections(self):
+        """Unknown, disallowed and center-less node_distance rerankers are rejected."""
+        policy = RerankPolicy(allowed=['rrf', 'mmr', 'cross_encoder'])
+        with pytest.raises(ValueError, match='Unknown reranker'):
+            policy.resolve('bm25')
+        with pytest.raises(ValueError, match='disabled'):
+            policy.resolve('node_distance', center_node_uuid='n1')
+        policy.disable('cross_encoder')
+        with pytest.raises(ValueError, match='disabled'):
+            policy.resolve('cross_encoder')
+        assert RerankPolicy().resolve(None, center_node_uuid='n1') == 'node_distance'
+        with pytest.raises(ValueError, match='center_node_uuid'):
+            RerankPolicy().resolve('node_distance')
+        with pytest.raises(ValueError):
+            RerankPolicy(default='cross_encoder', allowed=['rrf'])
+
+
+class TestRankingDepth:
+    """Tests for the number of results ranked by a first page."""
+
+    def test_cross_encoder_ranks_only_the_page(self):
+        """Per-candidate model rerankers rank the page whatever the number of pages."""
+        assert ranking_depth('cross_encoder', 10, 3, 50) == 10
+
+    def test_pages_capped_by_depth(self):
+        """Other rerankers rank a few pages, at most max_depth but at least one page."""
+        assert ranking_depth('rrf', 10, 3, 50) == 30
+        assert ranking_depth('rrf', 20, 3, 50) == 50
+        assert ranking_depth('rrf', 80, 3, 50) == 80
+        assert ranking_depth('rrf', 10, 1, 50) == 10
+
+
+class TestSearchConfigs:
+    """Tests for the shared search configs."""
+
+    def test_built_once_without_touching_recipes(self):
+        """Configs are cached per (kind, reranker, limit) and the library recipes keep their limit."""
+        original_limit = NODE_HYBRID_SEARCH_RRF.limit
+        config = get_search_config('nodes', 'rrf', 77)
+        assert get_search_config('nodes', 'rrf', 77) is config
+        assert config.limit == 77 and NODE_HYBRID_SEARCH_RRF.limit == original_limit
+        assert config.node_config.reranker == NodeReranker.rrf
+        assert get_search_config('facts', 'mmr', 77).edge_config.reranker == EdgeReranker.mmr
+
+    def test_rerank_stats(self):
+        """Latencies are kept per reranker and exported as a histogram."""
+        stats = RerankStats()
+        stats.observe('rrf', 0.2)
+        stats.observe('cross_encoder', 120.0)
+        snapshot = stats.stats()
+        assert set(snapshot['latency']) == {'rrf', 'cross_encoder'}
+        assert any('reranker="cross_encoder"' in line for line in stats.prometheus_lines())
+
+
+class TestTimings:
+    """Tests for per-request stage timings."""
+
+    def test_scopes_are_per_task(self):
+        """Timings land in the scope of the task that opened it, including gathered subtasks."""
+        slow = timed('rerank', lambda: sum(range(1000)))
+
+        async def search(repeat):
+            with collect_timings() as timings:
+                await asyncio.gather(*(asyncio.sleep(0, result=slow()) for _ in range(repeat)))
+                add_timing('other', 1.0)
+            return timings
+
+        async def run():
+            return await asyncio.gather(search(1), search(3))
+
+        first, second = asyncio.run(run())
+        assert first['other'] == 1.0 and second['other'] == 1.0
+        assert 0 < first['rerank'] and 'rerank' in second
+        add_timing('rerank', 5.0)  # outside a scope: ignored
+
+    def test_cross_encoder_time_counts_as_rerank(self):
+        """The cross encoder wrapper delegates and records its ranking time."""
+
+        class Inner:
+            async def rank(self, query, passages):
+                await asyncio.sleep(0.01)
+                return [(passage, 1.0) for passage in passages]
+
+        async def run():
+            with collect_timings() as timings:
+                ranked = await TimedCrossEncoder(Inner()).rank('q', ['a', 'b'])
+            return ranked, timings
+
+        ranked, timings = asyncio.run(run())
+        assert ranked == [('a', 1.0), ('b', 1.0)]
+        assert timings['rerank'] >= 10
+
+    def test_nested_scopes_add_to_enclosing_scope(self):
+        """An inner scope sees its own stages; the enclosing scope gets them too."""
+        with collect_timings() as outer:
+            add_timing('embed', 2.0)
+            with collect_timings() as inner:
+                add_timing('rerank', 3.0)
+                with stage('format'):
+                    pass
+        assert inner.keys() == {'rerank', 'format'}
+        assert outer['embed'] == 2.0 and outer['rerank'] == 3.0 and 'format' in outer
+
+
+class TestSearchLatencyStats:
+    """Tests for aggregated stage latencies and the slow search log."""
+
+    def test_stages_per_tool_and_group_with_total(self):
+        """Each stage and the total are recorded under the tool and its sorted group set."""
+        stats = SearchLatencyStats(slow_ms=0)
+        stats.observe('search_facts', ['b', 'a'], {'embed': 4.0, 'rerank': 1.0}, 9.0)
+        latency = stats.stats()['latency']['search_facts']['a,b']
+        assert set(latency) == {'embed', 'rerank', 'total'}
+        assert latency['total']['count'] == 1
+        assert stats.stats()['slow_searches'] == 0
+        assert any('stage="embed"' in line for line in stats.prometheus_lines())
+
+    def test_slow_searches_are_kept_and_groups_bounded(self):
+        """Searches over the threshold are logged; group sets beyond the limit count as other."""
+        stats = SearchLatencyStats(slow_ms=100, max_groups=1, max_slow=1)
+        assert not stats.observe('search_nodes', ['g1'], {}, 50.0)
+        assert stats.observe('search_nodes', ['g2'], {'similarity': 120.0}, 150.0, query='slow query')
+        assert stats.observe('search_nodes', ['g1'], {}, 300.0)
+
+        snapshot = stats.stats()
+        assert set(snapshot['latency']['search_nodes']) == {'g1', 'other'}
+        assert snapshot['slow_searches'] == 2
+        assert [entry['total_ms'] for entry in snapshot['recent_slow']] == [300.0]
+        stats.reset_stats()
+        assert stats.stats()['latency'] == {} and stats.stats()['recent_slow'] == []
@@ -0,0 +1,130 @@
+"""
+Unit tests for the search stream module.
+Tests candidate hand-off from wrapped graphiti-core search methods, partial results and
+progress of one streamed search, and the time-to-first-result statistics.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from graphiti_core.search import search as graphiti_search_module
+
+from mcp_server.search_stream import (
+    CANDIDATE_FUNCTIONS,
+    ProgressiveResults,
+    StreamStats,
+    install_candidate_streaming,
+    stream_candidates,
+)
+
+
+def candidates(*uuids):
+    return [SimpleNamespace(uuid=uuid) for uuid in uuids]
+
+
+class Recorder:
+    """Collects partial results and progress reports."""
+
+    def __init__(self):
+        self.partials = []
+        self.progress = []
+
+    async def send(self, partial):
+        self.partials.append(partial)
+
+    async def report(self, progress, total):
+        self.progress.append((progress, total))
+
+
+def make_stream(recorder, limit=10):
+    return ProgressiveResults('facts', lambda edge: {'uuid': edge.uuid}, limit, recorder.send, recorder.report)
+
+
+@pytest.fixture(autouse=True)
+def restore_search_functions(monkeypatch):
+    """Restore graphiti-core's search functions after each test installs the streaming wrappers."""
+    for name in CANDIDATE_FUNCTIONS:
+        monkeypatch.setattr(graphiti_search_module, name, getattr(graphiti_search_module, name))
+
+
+class TestCandidateStreaming:
+    """Tests for the wrapped graphiti-core search functions."""
+
+    def test_candidates_reach_listener_only_inside_scope(self, monkeypatch):
+        """Results are returned unchanged and passed to the listener of the current scope."""
+
+        async def fulltext(*args, **kwargs):
+            return candidates('a', 'b')
+
+        monkeypatch.setattr(graphiti_search_module, 'edge_fulltext_search', fulltext)
+        install_candidate_streaming()
+        install_candidate_streaming()
+        received = []
+
+        async def listener(kind, method, results):
+            received.append((kind, method, [r.uuid for r in results]))
+
+        async def run():
+            with stream_candidates(listener):
+                inside = await graphiti_search_module.edge_fulltext_search()
+            await graphiti_search_module.edge_fulltext_search()
+            return inside
+
+        assert [r.uuid for r in asyncio.run(run())] == ['a', 'b']
+        assert received == [('facts', 'fulltext', ['a', 'b'])]
+
+    def test_listener_failure_does_not_fail_search(self, monkeypatch):
+        """A listener error (e.g. a closed session) is logged and the search goes on."""
+
+        async def similarity(*args, **kwargs):
+            return candidates('a')
+
+        monkeypatch.setattr(graphiti_search_module, 'edge_similarity_search', similarity)
+        install_candidate_streaming()
+
+        async def broken(kind, method, results):
+            raise ConnectionError('closed')
+
+        async def run():
+            with stream_candidates(broken):
+                return await graphiti_search_module.edge_similarity_search()
+
+        assert len(asyncio.run(run())) == 1
+
+
+class TestProgressiveResults:
+    """Tests for the listener of one streamed search."""
+
+    def test_partials_send_new_candidates_and_progress(self):
+        """Each method sends only unseen candidates (capped at limit); progress counts methods."""
+        recorder = Recorder()
+        stream = make_stream(recorder, limit=2)
+        stream.expect_stages(2)
+
+        async def run():
+            await stream('facts', 'fulltext', candidates('a', 'b', 'c'))
+            await stream('nodes', 'fulltext', candidates('x'))
+            await stream('facts', 'similarity', candidates('a', 'b'))
+            return await stream.finish()
+
+        total_ms = asyncio.run(run())
+        assert recorder.partials[0]['facts'] == [{'uuid': 'a'}, {'uuid': 'b'}]
+        assert recorder.partials[0]['partial'] is True and recorder.partials[0]['stage'] == 'fulltext'
+        assert len(recorder.partials) == 1
+        assert recorder.progress == [(1, 3), (2, 3), (3, 3)]
+        assert stream.first_result_ms is not None and stream.first_result_ms <= total_ms
+
+
+class TestStreamStats:
+    """Tests for time-to-first-result statistics."""
+
+    def test_first_result_defaults_to_total(self):
+        """A stream without partial results counts its total time as time to first result."""
+        stats = StreamStats()
+        stats.observe('search_facts', 12.0, 80.0)
+        stats.observe('search_facts', None, 40.0)
+        snapshot = stats.stats()['search_facts']
+        assert snapshot['first_result']['count'] == 2 and snapshot['total']['count'] == 2
+        assert 'graphiti_search_first_result_ms_count{tool="search_facts"} 2' in '\n'.join(stats.prometheus_lines())
+        stats.reset_stats()
+        assert stats.stats() == {}
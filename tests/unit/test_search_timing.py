@@ -0,0 +1,182 @@
+"""
+Unit tests for the search timing module.
+Tests nested timing scopes, the timed wrappers and their installation, per-group latency
+statistics with the slow search log, and the server tools reporting them.
+"""
+import asyncio
+import importlib
+import logging
+
+import pytest
+from graphiti_core.search import search as graphiti_search_module
+from graphiti_core.search import search_utils
+
+from mcp_server import search_filters as search_filters_module
+from mcp_server import vector_index as vector_index_module
+from mcp_server.search_stream import CANDIDATE_FUNCTIONS
+from mcp_server.search_timing import (
+    RERANK_FUNCTIONS,
+    SEARCH_METHOD_STAGES,
+    SearchLatencyStats,
+    add_timing,
+    collect_timings,
+    install_search_timing,
+    stage,
+    timed,
+)
+
+
+class TestCollectTimings:
+    """Tests for timing scopes."""
+
+    def test_inner_scope_adds_to_outer(self):
+        """Stages of a closed inner scope are added to the enclosing one."""
+        with collect_timings() as outer:
+            add_timing('embed', 2.0)
+            with collect_timings() as inner:
+                add_timing('embed', 3.0)
+                add_timing('rerank', 1.0)
+            assert inner == {'embed': 3.0, 'rerank': 1.0}
+        assert outer == {'embed': 5.0, 'rerank': 1.0}
+
+    def test_no_scope_is_a_noop(self):
+        """Timings outside any scope are dropped; stage() measures the block."""
+        add_timing('embed', 1.0)
+        with collect_timings() as timings:
+            with stage('format'):
+                pass
+        assert list(timings) == ['format'] and timings['format'] >= 0
+
+
+class TestTimed:
+    """Tests for the timed wrappers."""
+
+    def test_sync_and_async_functions(self):
+        """Both kinds of functions keep their result and add their time, even when raising."""
+
+        def fulltext(value):
+            return value * 2
+
+        async def similarity(value):
+            if value is None:
+                raise RuntimeError('no vector')
+            return value + 1
+
+        timed_fulltext = timed('fulltext', fulltext)
+        timed_similarity = timed('similarity', similarity)
+        assert asyncio.iscoroutinefunction(timed_similarity)
+        assert timed_fulltext.__wrapped_stage__ == 'fulltext' and timed_fulltext.__name__ == 'fulltext'
+
+        with collect_timings() as timings:
+            assert timed_fulltext(2) == 4
+            assert asyncio.run(timed_similarity(1)) == 2
+            with pytest.raises(RuntimeError):
+                asyncio.run(timed_similarity(None))
+        assert set(timings) == {'fulltext', 'similarity'}
+
+    def test_install_is_idempotent(self, monkeypatch):
+        """Installing twice wraps each search function once."""
+        originals = {}
+        for name in [*SEARCH_METHOD_STAGES, *RERANK_FUNCTIONS]:
+
+            async def original(*args, **kwargs):
+                return []
+
+            originals[name] = original
+            monkeypatch.setattr(graphiti_search_module, name, original)
+
+        install_search_timing()
+        install_search_timing()
+        for name, original in originals.items():
+            wrapped = getattr(graphiti_search_module, name)
+            assert wrapped.__wrapped__ is original
+        assert graphiti_search_module.node_bfs_search.__wrapped_stage__ == 'bfs'
+        assert graphiti_search_module.rrf.__wrapped_stage__ == 'rerank'
+
+
+class TestSearchLatencyStats:
+    """Tests for per-group latencies and the slow search log."""
+
+    def test_groups_beyond_limit_are_other(self):
+        """Group sets past max_groups share the "other" label; known sets keep their own."""
+        stats = SearchLatencyStats(slow_ms=0, max_groups=2)
+        for group_ids in (['b', 'a'], ['c'], ['d'], ['a', 'b'], []):
+            stats.observe('search_nodes', group_ids, {'embed': 1.0}, 5.0)
+
+        latency = stats.stats()['latency']['search_nodes']
+        assert set(latency) == {'a,b', 'c', 'other'}
+        assert latency['a,b']['total']['count'] == 2
+        assert latency['other']['embed']['count'] == 2
+
+    def test_slow_searches_are_logged_and_kept(self, caplog):
+        """Only searches at or over the threshold are counted, kept and logged with their stages."""
+        stats = SearchLatencyStats(slow_ms=100, max_slow=1)
+        with caplog.at_level(logging.WARNING, logger='mcp_server.search_timing'):
+            assert not stats.observe('search_facts', ['g'], {'embed': 10.0}, 50.0, 'fast')
+            assert stats.observe('search_facts', ['g'], {'embed': 80.0}, 120.0, 'first slow')
+            assert stats.observe('search_facts', ['g'], {'rerank': 150.0}, 200.0, 'second slow')
+
+        snapshot = stats.stats()
+        assert snapshot['slow_searches'] == 2
+        assert [entry['query'] for entry in snapshot['recent_slow']] == ['second slow']
+        assert snapshot['recent_slow'][0]['stages'] == {'rerank': 150.0}
+        assert 'rerank=150.0ms' in caplog.text and "'fast'" not in caplog.text
+
+        lines = stats.prometheus_lines()
+        assert 'graphiti_search_slow_total 2' in lines
+        assert any('stage="rerank"' in line and 'group="g"' in line for line in lines)
+        stats.reset_stats()
+        assert stats.stats()['latency'] == {} and stats.stats()['slow_searches'] == 0
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """The server module, importable with development settings, with fresh latency statistics."""
+    monkeypatch.setenv('GRAPHITI_ENV', 'dev')
+    module = importlib.import_module('graphiti_mcp_server')
+    monkeypatch.setattr(module, 'search_latency', SearchLatencyStats(slow_ms=0))
+    return module
+
+
+class TestServerReporting:
+    """Tests for the stage latencies reported by the server."""
+
+    def test_search_stats_and_metrics(self, server):
+        """get_search_stats and get_metrics report the recorded stages; reset clears them."""
+        server.search_latency.observe('search_facts', ['g'], {'embed': 4.0, 'fulltext': 12.0}, 20.0)
+
+        metrics = asyncio.run(server.get_metrics())
+        assert 'graphiti_search_slow_total 0' in metrics
+        assert any('tool="search_facts"' in line and 'stage="fulltext"' in line for line in metrics.splitlines())
+
+        stats = asyncio.run(server.get_search_stats(reset=True))
+        assert set(stats['stages']['latency']['search_facts']['g']) == {'embed', 'fulltext', 'total'}
+        assert 'decay' in stats
+        assert asyncio.run(server.get_search_stats())['stages']['latency'] == {}
+
+
+class TestStartupOrder:
+    """Tests for the search function wrappers installed at startup."""
+
+    def test_replacements_are_timed_and_streamed(self, server, monkeypatch):
+        """The vector index and filtered fulltext searches that replace graphiti-core's are still timed and streamed."""
+        for name in {*SEARCH_METHOD_STAGES, *RERANK_FUNCTIONS, *CANDIDATE_FUNCTIONS}:
+            monkeypatch.setattr(graphiti_search_module, name, getattr(graphiti_search_module, name))
+        monkeypatch.setattr(
+            graphiti_search_module, 'node_fulltext_search', search_filters_module._original_node_fulltext_search
+        )
+        for name in ('node_search_filter_query_constructor', 'edge_search_filter_query_constructor'):
+            monkeypatch.setattr(search_utils, name, getattr(search_utils, name))
+        monkeypatch.setattr(vector_index_module, '_active_mirror', None)
+        monkeypatch.setattr(server, 'vector_index', None)
+        monkeypatch.setattr(server.config, 'vector_index_enabled', True)
+
+        server.install_search_wrappers()
+        for name in ('node_similarity_search', 'edge_similarity_search'):
+            func = getattr(graphiti_search_module, name)
+            assert func.__candidate_stream__
+            assert func.__wrapped__.__wrapped_stage__ == 'similarity'
+            assert func.__wrapped__.__wrapped__ is getattr(vector_index_module, f'_{name}')
+        assert vector_index_module._active_mirror is server.vector_index is not None
+        fulltext = graphiti_search_module.node_fulltext_search
+        assert fulltext.__wrapped__.__wrapped__ is search_filters_module._node_fulltext_search_with_pushdown
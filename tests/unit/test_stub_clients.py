@@ -0,0 +1,102 @@
+"""
+Unit tests for the stub LLM, embedder and reranker clients.
+Tests determinism, schema validity and the latency spec parser.
+"""
+import asyncio
+from typing import Optional
+
+import pytest
+from graphiti_core.prompts.models import Message
+from pydantic import BaseModel, Field
+
+from mcp_server.stub_clients import (
+    LatencyModel,
+    StubCrossEncoder,
+    StubEmbedder,
+    StubLLMClient,
+    hash_embedding,
+)
+
+
+class ExtractedEntity(BaseModel):
+    name: str
+    entity_type_id: int
+
+
+class ExtractedEntities(BaseModel):
+    """Same name as the graphiti-core extract_nodes response model."""
+    extracted_entities: list[ExtractedEntity]
+
+
+class BugReport(BaseModel):
+    """A custom entity type with required and optional attributes."""
+    severity: str = Field(...)
+    component: Optional[str] = None
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+class TestLatencyModel:
+    """Tests for latency spec parsing and sampling."""
+
+    def test_parse_and_sample(self):
+        """Specs parse into distributions and seeded samples are reproducible."""
+        assert LatencyModel.parse('fixed:25').sample_ms() == 25
+        first = [LatencyModel.parse('lognormal:100:0.5', seed=7).sample_ms() for _ in range(2)]
+        assert first[0] == first[1] > 0
+        assert LatencyModel.parse(None).sample_ms() == 0
+
+    def test_invalid_spec(self):
+        """Unknown distributions and wrong parameter counts are rejected."""
+        with pytest.raises(ValueError):
+            LatencyModel.parse('poisson:3')
+        with pytest.raises(ValueError):
+            LatencyModel.parse('uniform:10')
+
+
+class TestStubLLMClient:
+    """Tests for the stub LLM client."""
+
+    def test_extracts_capitalized_entities(self):
+        """Entity extraction picks capitalized words from the current message."""
+        client = StubLLMClient()
+        messages = [Message(role='user', content='<CURRENT MESSAGE>\nAlice met Bob in Paris.\n</CURRENT MESSAGE>')]
+        result = asyncio.run(client.generate_response(messages, ExtractedEntities))
+        assert [e['name'] for e in result['extracted_entities']] == ['Alice', 'Bob', 'Paris']
+
+    def test_custom_model_is_schema_valid_and_deterministic(self):
+        """Other response models get schema defaults that depend only on the prompt."""
+        client = StubLLMClient()
+        messages = [Message(role='user', content='classify this')]
+        first = asyncio.run(client.generate_response(messages, BugReport))
+        second = asyncio.run(client.generate_response(messages, BugReport))
+        assert first == second
+        assert BugReport(**first).component is None
+
+
+class TestStubEmbedder:
+    """Tests for hash-derived embeddings."""
+
+    def test_embeddings_are_unit_vectors_and_deterministic(self):
+        """The same text always maps to the same normalized vector."""
+        embedder = StubEmbedder(embedding_dim=64)
+        vector = asyncio.run(embedder.create('Alice met Bob'))
+        assert len(vector) == 64
+        assert vector == hash_embedding('Alice met Bob', 64)
+        assert _cosine(vector, vector) == pytest.approx(1.0)
+
+    def test_shared_words_are_closer(self):
+        """Texts sharing words are more similar than unrelated texts."""
+        base = hash_embedding('alice works at acme')
+        assert _cosine(base, hash_embedding('alice joined acme')) > _cosine(base, hash_embedding('weather in paris'))
+
+
+class TestStubCrossEncoder:
+    """Tests for the word-overlap reranker."""
+
+    def test_rank_orders_by_overlap(self):
+        """Passages sharing more words with the query rank first."""
+        ranked = asyncio.run(StubCrossEncoder().rank('alice acme', ['paris weather', 'alice at acme']))
+        assert ranked[0][0] == 'alice at acme'
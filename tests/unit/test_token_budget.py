@@ -0,0 +1,110 @@
+"""
+Unit tests for the LLM token budget module.
+Tests token count caching, context window checks, truncation and the length retry.
+"""
+import asyncio
+from types import SimpleNamespace
+
+from mcp_server.token_budget import (
+    PromptBudget,
+    TokenCounter,
+    parse_context_windows,
+    send_with_budget,
+)
+
+
+def _request(content: str, max_tokens: int = 1000, model: str = 'small-model') -> dict:
+    return {
+        'model': model,
+        'messages': [
+            {'role': 'system', 'content': 'You extract entities.'},
+            {'role': 'user', 'content': content},
+        ],
+        'max_tokens': max_tokens,
+    }
+
+
+class TestParseContextWindows:
+    """Tests for parsing LLM_CONTEXT_WINDOWS."""
+
+    def test_parse_entries(self):
+        """Model names may contain slashes; malformed entries are skipped."""
+        result = parse_context_windows('qwen/qwen-3-32b=32768, bad, x=notanumber')
+        assert result == {'qwen/qwen-3-32b': 32768}
+
+
+class TestTokenCounter:
+    """Tests for the cached token counter."""
+
+    def test_counts_are_cached_by_content(self):
+        """Counting the same text twice is served from the cache."""
+        counter = TokenCounter()
+        first = counter.count('hello world ' * 50, 'gpt-4o-mini')
+        second = counter.count('hello world ' * 50, 'gpt-4o-mini')
+        assert first == second > 0
+        assert counter.hits == 1 and counter.misses == 1
+
+    def test_cache_is_bounded(self):
+        """The least recently used entries are evicted."""
+        counter = TokenCounter(cache_size=2)
+        for text in ('a', 'b', 'c'):
+            counter.count(text, 'gpt-4o-mini')
+        assert len(counter._cache) == 2
+
+
+class TestPromptBudget:
+    """Tests for preflight budget enforcement."""
+
+    def test_request_within_budget_is_unchanged(self):
+        """Requests that fit are passed through untouched."""
+        budget = PromptBudget(context_windows={'small-model': 10_000})
+        request = _request('short episode')
+        assert budget.apply(request) is request
+
+    def test_output_budget_is_clamped(self):
+        """max_tokens is lowered when the prompt fits but prompt + output does not."""
+        budget = PromptBudget(context_windows={'small-model': 4_000}, safety_margin=0)
+        request = budget.apply(_request('word ' * 500, max_tokens=8_000))
+        prompt_tokens = budget.counter.count_messages(request['messages'], 'small-model')
+        assert request['max_tokens'] == 4_000 - prompt_tokens
+        assert budget.clamped == 1 and budget.truncated == 0
+
+    def test_oversized_prompt_is_truncated(self):
+        """The largest message is cut from the middle, keeping its start and end."""
+        budget = PromptBudget(context_windows={'small-model': 2_000}, safety_margin=0, min_output_tokens=500)
+        content = 'START ' + 'filler text ' * 2_000 + ' END'
+        request = budget.apply(_request(content, max_tokens=500))
+
+        user_content = request['messages'][1]['content']
+        assert user_content.startswith('START') and user_content.endswith('END')
+        assert 'truncated' in user_content
+        assert request['max_tokens'] == 500
+        assert budget.counter.count_messages(request['messages'], 'small-model') + 500 <= 2_000 + 10
+        assert budget.truncated == 1
+
+    def test_provider_prefix_is_ignored(self):
+        """OpenRouter-style model names fall back to the short name."""
+        budget = PromptBudget()
+        assert budget.context_window('openai/gpt-4o-mini') == 128_000
+
+
+class TestSendWithBudget:
+    """Tests for the length retry."""
+
+    def test_structured_output_cut_off_is_retried(self):
+        """A structured response stopped at max_tokens is retried with a larger budget."""
+        budget = PromptBudget(context_windows={'small-model': 100_000})
+        calls = []
+
+        async def send(**request):
+            calls.append(request['max_tokens'])
+            finish_reason = 'length' if len(calls) == 1 else 'stop'
+            return SimpleNamespace(choices=[SimpleNamespace(finish_reason=finish_reason)])
+
+        request = _request('episode', max_tokens=1000)
+        request['response_format'] = {'type': 'json_object'}
+        response = asyncio.run(send_with_budget(budget, send, request))
+
+        assert calls == [1000, 2000]
+        assert response.choices[0].finish_reason == 'stop'
+        assert budget.length_retries == 1
@@ -0,0 +1,169 @@
+"""
+Unit tests for the vector index mirror module.
+Tests flat index search and updates, lazy group loading, memory-budget eviction, episode
+updates and the routing of graphiti-core similarity searches through the mirror.
+"""
+import asyncio
+
+import numpy as np
+from graphiti_core.edges import EntityEdge
+from graphiti_core.nodes import EntityNode
+from graphiti_core.search import search as graphiti_search_module
+from graphiti_core.search.search_filters import SearchFilters
+
+from mcp_server.vector_index import FlatVectorIndex, VectorIndexMirror, install_vector_index
+
+
+class FakeDriver:
+    """Driver answering the mirror's count and load queries from per-group vectors."""
+
+    def __init__(self, groups):
+        self.groups = groups
+        self.loads = []
+
+    async def execute_query(self, query, **params):
+        group = self.groups.get(params.get('group_id'), {'nodes': {}, 'edges': {}})
+        if 'count(n)' in query:
+            return [{'nodes': len(group['nodes']), 'edges': len(group['edges'])}], None, None
+        kind = 'nodes' if 'name_embedding' in query else 'edges'
+        self.loads.append((params['group_id'], kind))
+        records = [{'uuid': uuid, 'embedding': vector} for uuid, vector in group[kind].items()]
+        return records, None, None
+
+
+def vectors(count, dim=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return {f'n{i}': rng.normal(size=dim).tolist() for i in range(count)}
+
+
+class TestFlatVectorIndex:
+    """Tests for the exact in-memory index."""
+
+    def test_search_matches_neo4j_scoring(self):
+        """Scores are normalized cosine similarity, best first, above min_score."""
+        index = FlatVectorIndex()
+        index.upsert(['a', 'b', 'c'], [[1, 0], [0, 1], [-1, 0]])
+        hits = index.search(np.array([1.0, 0.0], dtype=np.float32), 3, 0.4)
+        assert [uuid for uuid, _ in hits] == ['a', 'b']
+        assert hits[0][1] == 1.0 and abs(hits[1][1] - 0.5) < 1e-6
+
+    def test_upsert_replaces_and_remove(self):
+        """Upserting a known uuid replaces its vector; removed uuids are no longer found."""
+        index = FlatVectorIndex()
+        index.upsert(['a', 'b'], [[1, 0], [0, 1]])
+        index.upsert(['a'], [[0, 1]])
+        assert len(index) == 2
+        index.remove(['b', 'unknown'])
+        assert index.search(np.array([0.0, 1.0], dtype=np.float32), 5, 0.9) == [('a', 1.0)]
+
+
+class TestVectorIndexMirror:
+    """Tests for per-group loading, eviction and updates."""
+
+    def test_lazy_load_once_and_fallback_for_large_groups(self):
+        """A group is loaded on first search only; oversized groups fall back to Neo4j."""
+        driver = FakeDriver({'small': {'nodes': vectors(3), 'edges': {}}, 'big': {'nodes': vectors(10), 'edges': {}}})
+        mirror = VectorIndexMirror(max_group_vectors=5)
+
+        async def run():
+            query = driver.groups['small']['nodes']['n1']
+            first = await mirror.search('nodes', driver, ['small'], query, 2, 0.0)
+            await mirror.search('nodes', driver, ['small'], query, 2, 0.0)
+            big = await mirror.search('nodes', driver, ['big'], query, 2, 0.0)
+            return first, big
+
+        first, big = asyncio.run(run())
+        assert first[0][0] == 'n1' and len(first) == 2
+        assert big is None
+        assert driver.loads == [('small', 'nodes'), ('small', 'edges')]
+        assert mirror.stats()['fallbacks'] == 1 and mirror.stats()['searches']['nodes'] == 2
+
+    def test_memory_budget_evicts_least_recently_used(self):
+        """Loading a group beyond the budget evicts the least recently searched group."""
+        groups = {name: {'nodes': vectors(4, seed=i), 'edges': {}} for i, name in enumerate('abc')}
+        driver = FakeDriver(groups)
+        # Each group holds 4 float32 vectors of 4 dimensions (64 bytes); two fit the budget
+        mirror = VectorIndexMirror(memory_budget_bytes=128)
+
+        async def run():
+            for name in ('a', 'b', 'a', 'c'):
+                await mirror.search('nodes', driver, [name], [1, 0, 0, 0], 1, 0.0)
+
+        asyncio.run(run())
+        assert len(mirror) == 2 and mirror.stats()['evictions'] == 1
+        assert mirror.nbytes <= 128
+        assert set(mirror._groups) == {'a', 'c'}
+
+    def test_episode_updates_loaded_group(self):
+        """Nodes and edges saved by an episode are searchable without a reload."""
+        driver = FakeDriver({'g': {'nodes': vectors(2), 'edges': {}}})
+        mirror = VectorIndexMirror()
+        node = EntityNode(name='Alice', group_id='g', labels=['Entity'], name_embedding=[0, 0, 0, 1])
+        edge = EntityEdge(
+            group_id='g',
+            source_node_uuid=node.uuid,
+            target_node_uuid=node.uuid,
+            name='KNOWS',
+            fact='Alice knows Alice',
+            fact_embedding=[0, 1, 0, 0],
+            created_at=node.created_at,
+        )
+
+        async def run():
+            await mirror.get_group(driver, 'g')
+            mirror.apply_episode('g', [node], [edge])
+            nodes = await mirror.search('nodes', driver, ['g'], [0, 0, 0, 1], 1, 0.0)
+            edges = await mirror.search('edges', driver, ['g'], [0, 1, 0, 0], 1, 0.0)
+            return nodes, edges
+
+        nodes, edges = asyncio.run(run())
+        assert nodes[0][0] == node.uuid and edges[0][0] == edge.uuid
+        assert len(driver.loads) == 2
+
+        node.name_embedding = None
+        mirror.apply_episode('g', [node], [])
+        assert len(mirror) == 0
+
+    def test_prometheus_lines(self):
+        """The counters render in the Prometheus text format, with one search series per kind."""
+        driver = FakeDriver({'g': {'nodes': vectors(3), 'edges': {}}})
+        mirror = VectorIndexMirror()
+        asyncio.run(mirror.search('nodes', driver, ['g'], [1, 0, 0, 0], 1, 0.0))
+
+        text = '\n'.join(mirror.prometheus_lines())
+        assert 'graphiti_vector_index_searches_total{kind="nodes"} 1' in text
+        assert 'graphiti_vector_index_searches_total{kind="edges"} 0' in text
+        assert 'graphiti_vector_index_groups 1' in text
+
+
+class TestInstalledSearch:
+    """Tests for routing graphiti-core similarity searches through the mirror."""
+
+    def test_unfiltered_search_hydrates_from_driver(self, monkeypatch):
+        """Unfiltered group searches use the mirror and hydrate by uuid; filtered ones fall back."""
+        driver = FakeDriver({'g': {'nodes': {'n0': [1, 0], 'n1': [0, 1]}, 'edges': {}}})
+        mirror = VectorIndexMirror()
+        hydrated = []
+
+        async def get_by_uuids(drv, uuids):
+            hydrated.append(list(uuids))
+            return [EntityNode(uuid=uuid, name=uuid, group_id='g', labels=['Entity']) for uuid in uuids]
+
+        async def neo4j_search(*args, **kwargs):
+            return ['neo4j']
+
+        monkeypatch.setattr(EntityNode, 'get_by_uuids', get_by_uuids)
+        monkeypatch.setattr('mcp_server.vector_index._original_node_similarity_search', neo4j_search)
+        monkeypatch.setattr(graphiti_search_module, 'node_similarity_search', graphiti_search_module.node_similarity_search)
+        monkeypatch.setattr(graphiti_search_module, 'edge_similarity_search', graphiti_search_module.edge_similarity_search)
+        install_vector_index(mirror)
+        try:
+            search = graphiti_search_module.node_similarity_search
+            mirrored = asyncio.run(search(driver, [0.0, 1.0], SearchFilters(), ['g'], 5, 0.6))
+            filtered = asyncio.run(search(driver, [0.0, 1.0], SearchFilters(node_labels=['Preference']), ['g'], 5, 0.6))
+        finally:
+            install_vector_index(None)
+
+        assert [node.uuid for node in mirrored] == ['n1']
+        assert hydrated == [['n1']]
+        assert filtered == ['neo4j']